@@ -0,0 +1 @@
+"""Performance benchmarks for AutoMonitor (not collected by pytest)"""
@@ -0,0 +1,133 @@
+"""
+Archive insert and search latency at scale.
+
+Builds a synthetic archive of ``--rows`` articles spread over ``--days`` days
+(Zipf-distributed vocabulary, so common and rare terms behave like real
+headlines) in a temporary file. It reports bulk insert throughput and then
+search latency for a set of queries, with and without a one-week recency
+filter:
+
+- ``rare``     a term in a handful of articles
+- ``common``   a term in a few percent of all articles
+- ``two``      two common terms (both required)
+- ``prefix``   the common term's first four characters
+- ``*_week``   the same queries limited to the last seven days
+
+Each run is printed and appended to ``benchmarks/results/archive.jsonl``.
+
+Usage::
+
+    python -m benchmarks.archive [--rows 1000000] [--days 180] [--repeat 20]
+"""
+import argparse
+import itertools
+import json
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from benchmarks.startup import ROOT, git_commit
+from src.utils.archive import ArticleArchive
+
+RESULTS_FILE = Path(__file__).parent / 'results' / 'archive.jsonl'
+VOCABULARY = 50000
+BATCH = 1000  # articles per add(), like one large feed
+
+
+def vocabulary(seed: int = 7) -> List[str]:
+    """VOCABULARY distinct lower-case words, most frequent first."""
+    rng = random.Random(seed)
+    words = {}
+    while len(words) < VOCABULARY:
+        words[''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))] = None
+    return list(words)
+
+
+def build(archive: ArticleArchive, words: List[str], rows: int, days: float, seed: int = 7) -> float:
+    """Fill ``archive``; returns rows inserted per second."""
+    rng = random.Random(seed)
+    cumulative = list(itertools.accumulate(1 / (rank + 1) for rank in range(VOCABULARY)))
+    start = time.time() - days * 86400
+    step = days * 86400 / max(rows // BATCH, 1)
+    started = time.perf_counter()
+    for batch in range(0, rows, BATCH):
+        now = start + (batch // BATCH) * step
+        articles = [
+            {'title': ' '.join(rng.choices(words, cum_weights=cumulative, k=8)),
+             'description': ' '.join(rng.choices(words, cum_weights=cumulative, k=25)),
+             'url': f'https://bench{n % 97}.example/{n}',
+             'published_ts': now}
+            for n in range(batch, min(batch + BATCH, rows))
+        ]
+        archive.add('Bench', articles, now=now)
+    return rows / (time.perf_counter() - started)
+
+
+def measure(archive: ArticleArchive, words: List[str], repeat: int) -> dict:
+    """Median and p95 search latency (ms) per query."""
+    week = time.time() - 7 * 86400
+    common = next(w for w in words[20:] if len(w) >= 5)
+    queries = {
+        'rare': (words[-3], None),
+        'common': (common, None),
+        'two': (f"{common} {words[40]}", None),
+        'prefix': (common[:4] + '*', None),
+    }
+    queries.update({f'{name}_week': (q, week) for name, (q, _) in list(queries.items())})
+    results = {}
+    for name, (query, since) in queries.items():
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            archive.search(query, since=since)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        results[name] = {'median_ms': round(statistics.median(timings), 2),
+                         'p95_ms': round(timings[int(0.95 * (len(timings) - 1))], 2)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--days', type=float, default=180)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--no-record', action='store_true', help="don't append to the results file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = ArticleArchive(Path(tmp) / 'archive.db')
+        print(f"Building a {args.rows}-article archive...", file=sys.stderr)
+        words = vocabulary()
+        rate = build(archive, words, args.rows, args.days)
+        size = archive.stats()['bytes']
+        queries = measure(archive, words, args.repeat)
+        archive.close()
+
+    record = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'rows': args.rows,
+        'insert_rows_per_s': round(rate),
+        'size_mib': round(size / 2 ** 20, 1),
+        'queries': queries,
+    }
+    print(f"insert: {record['insert_rows_per_s']} rows/s, {record['size_mib']} MiB")
+    print(f"{'query':14} {'median ms':>10} {'p95 ms':>10}")
+    for name, r in queries.items():
+        print(f"{name:14} {r['median_ms']:10.2f} {r['p95_ms']:10.2f}")
+
+    if not args.no_record:
+        RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(RESULTS_FILE, 'a', encoding='utf-8') as fh:
+            fh.write(json.dumps(record) + '\n')
+        print(f"Recorded in {RESULTS_FILE.relative_to(ROOT)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,432 @@
+"""
+Local stand-in for the Telegram Bot API.
+
+Implements the methods AutoMonitor uses or may use - ``getMe``,
+``sendMessage``, ``sendPhoto``, ``sendMediaGroup`` and ``editMessageText`` /
+``editMessageCaption`` / ``editMessageMedia`` / ``editMessageReplyMarkup`` -
+with Bot API shaped responses, plus the failure modes that matter under
+load:
+
+- per-call latency (``latency`` +/- ``jitter`` seconds)
+- flood control: each chat gets ``chat_rate`` messages per second and the
+  bot ``global_rate`` overall; beyond that the server answers 429 with
+  ``parameters.retry_after``
+- random 5xx responses with probability ``error_rate``
+
+Point the bot at it with ``TELEGRAM_API_BASE=http://127.0.0.1:<port>``.
+
+Usage::
+
+    python -m benchmarks.fake_telegram serve [--port 8081] [--latency 0.05] [--error-rate 0.01]
+    python -m benchmarks.fake_telegram load [--messages 2000] [--chats 4] [--senders 4]
+"""
+import argparse
+import json
+import math
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+BOT_ID = 123456789
+
+
+class _Bucket:
+    """Token bucket: ``rate`` tokens per second, bursts up to ``max(rate, 1)``."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self, n: int = 1) -> float:
+        """Consume ``n`` tokens; return 0, or the seconds until they'd be available."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= n:
+            self.tokens -= n
+            return 0.0
+        return (n - self.tokens) / self.rate
+
+
+class FakeTelegramServer(ThreadingHTTPServer):
+    """In-process fake Bot API; inspect ``messages`` and ``stats`` after a run."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, token: Optional[str] = None,
+                 latency: float = 0.0, jitter: float = 0.0, chat_rate: float = 20.0,
+                 global_rate: float = 30.0, error_rate: float = 0.0, seed: Optional[int] = None):
+        super().__init__((host, port), _BotApiHandler)
+        self.token = token
+        self.latency = latency
+        self.jitter = jitter
+        self.chat_rate = chat_rate
+        self.global_rate = global_rate
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.messages: Dict[int, Dict[int, Dict]] = defaultdict(dict)
+        self.stats: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._chat_buckets: Dict[int, _Bucket] = {}
+        self._global_bucket = _Bucket(global_rate) if global_rate else None
+        self._next_id: Dict[int, int] = defaultdict(int)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'FakeTelegramServer':
+        threading.Thread(target=self.serve_forever, kwargs={'poll_interval': 0.05},
+                         name='fake-telegram', daemon=True).start()
+        return self
+
+    # -- behaviour -------------------------------------------------------
+
+    def delay(self) -> float:
+        if not self.latency and not self.jitter:
+            return 0.0
+        return max(self.latency + self.random.uniform(-self.jitter, self.jitter), 0.0)
+
+    def throttle(self, chat_id: int, count: int) -> int:
+        """Apply flood control; returns retry_after seconds (0 = allowed)."""
+        with self._lock:
+            waits = []
+            if self.chat_rate:
+                bucket = self._chat_buckets.setdefault(chat_id, _Bucket(self.chat_rate))
+                waits.append(bucket.take(count))
+            if self._global_bucket is not None and not any(waits):
+                waits.append(self._global_bucket.take(count))
+            wait = max(waits, default=0.0)
+            return math.ceil(wait) if wait else 0
+
+    def fail(self) -> bool:
+        return self.error_rate > 0 and self.random.random() < self.error_rate
+
+    def store(self, chat_id: int, fields: Dict) -> Dict:
+        with self._lock:
+            self._next_id[chat_id] += 1
+            message_id = self._next_id[chat_id]
+            message = {
+                'message_id': message_id,
+                'sender_chat': {'id': chat_id, 'type': 'channel', 'title': f'Channel {chat_id}'},
+                'chat': {'id': chat_id, 'type': 'channel', 'title': f'Channel {chat_id}'},
+                'date': int(time.time()),
+                **fields,
+            }
+            self.messages[chat_id][message_id] = message
+            return message
+
+    def edit(self, chat_id: int, message_id: int, fields: Dict) -> Optional[Dict]:
+        with self._lock:
+            message = self.messages.get(chat_id, {}).get(message_id)
+            if message is None:
+                return None
+            message.update(fields, edit_date=int(time.time()))
+            return message
+
+    def sent_count(self) -> int:
+        with self._lock:
+            return sum(len(m) for m in self.messages.values())
+
+    def clear(self) -> int:
+        """Forget stored messages (ids keep counting); returns how many were dropped."""
+        with self._lock:
+            dropped = sum(len(m) for m in self.messages.values())
+            self.messages.clear()
+            return dropped
+
+
+def _photo_sizes(file_key: str) -> List[Dict]:
+    return [
+        {'file_id': f'{file_key}-{w}', 'file_unique_id': f'{file_key}{w}',
+         'width': w, 'height': w * 9 // 16, 'file_size': w * 120}
+        for w in (90, 320, 800, 1280)
+    ]
+
+
+class ApiError(Exception):
+    def __init__(self, code: int, description: str, parameters: Optional[Dict] = None):
+        super().__init__(description)
+        self.code = code
+        self.description = description
+        self.parameters = parameters
+
+
+class _BotApiHandler(BaseHTTPRequestHandler):
+    server: FakeTelegramServer
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+    # Send headers and body in one segment; avoids 40ms Nagle/delayed-ACK stalls
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def log_message(self, *args):
+        pass
+
+    # -- plumbing --------------------------------------------------------
+
+    def _params(self) -> Dict:
+        parts = urlsplit(self.path)
+        params = dict(parse_qsl(parts.query))
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            raw = self.rfile.read(length)
+            if 'json' in (self.headers.get('Content-Type') or ''):
+                params.update(json.loads(raw or b'{}'))
+            else:
+                params.update(parse_qsl(raw.decode('utf-8')))
+        return params
+
+    def _reply(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self):
+        server = self.server
+        path = urlsplit(self.path).path.strip('/')
+        token, _, method = path.partition('/')
+        params = self._params()
+        delay = server.delay()
+        if delay:
+            time.sleep(delay)
+
+        with server._lock:
+            server.stats['requests'] += 1
+        try:
+            if not token.startswith('bot') or (server.token and token[3:] != server.token):
+                raise ApiError(401, 'Unauthorized')
+            if server.fail():
+                raise ApiError(502, 'Bad Gateway')
+            handler = getattr(self, f'_api_{method}', None)
+            if handler is None:
+                raise ApiError(404, 'Not Found')
+            result = handler(params)
+        except ApiError as e:
+            with server._lock:
+                server.stats[str(e.code)] += 1
+            payload = {'ok': False, 'error_code': e.code, 'description': e.description}
+            headers = {}
+            if e.parameters:
+                payload['parameters'] = e.parameters
+                if 'retry_after' in e.parameters:
+                    headers['Retry-After'] = str(e.parameters['retry_after'])
+            self._reply(e.code, payload, headers)
+            return
+        with server._lock:
+            server.stats[method] += 1
+        self._reply(200, {'ok': True, 'result': result})
+
+    # -- helpers ---------------------------------------------------------
+
+    @staticmethod
+    def _require(params: Dict, *names: str):
+        for name in names:
+            if params.get(name) in (None, ''):
+                raise ApiError(400, f'Bad Request: {name} is empty')
+
+    def _chat(self, params: Dict, count: int = 1) -> int:
+        self._require(params, 'chat_id')
+        try:
+            chat_id = int(params['chat_id'])
+        except (TypeError, ValueError):
+            raise ApiError(400, 'Bad Request: chat not found')
+        retry_after = self.server.throttle(chat_id, count)
+        if retry_after:
+            raise ApiError(429, f'Too Many Requests: retry after {retry_after}',
+                           {'retry_after': retry_after})
+        return chat_id
+
+    @staticmethod
+    def _check_length(text: str, limit: int, what: str):
+        if len(text) > limit:
+            raise ApiError(400, f'Bad Request: {what} is too long')
+
+    # -- methods ---------------------------------------------------------
+
+    def _api_getMe(self, params: Dict) -> Dict:
+        return {'id': BOT_ID, 'is_bot': True, 'first_name': 'AutoMonitor (fake)',
+                'username': 'automonitor_fake_bot', 'can_join_groups': True,
+                'can_read_all_group_messages': False, 'supports_inline_queries': False}
+
+    def _api_sendMessage(self, params: Dict) -> Dict:
+        self._require(params, 'text')
+        self._check_length(params['text'], 4096, 'message')
+        chat_id = self._chat(params)
+        return self.server.store(chat_id, {'text': params['text']})
+
+    def _api_sendPhoto(self, params: Dict) -> Dict:
+        self._require(params, 'photo')
+        caption = params.get('caption') or ''
+        self._check_length(caption, 1024, 'message caption')
+        chat_id = self._chat(params)
+        fields = {'photo': _photo_sizes(str(abs(hash(params['photo']))))}
+        if caption:
+            fields['caption'] = caption
+        return self.server.store(chat_id, fields)
+
+    def _api_sendMediaGroup(self, params: Dict) -> List[Dict]:
+        self._require(params, 'media')
+        media = params['media']
+        if isinstance(media, str):
+            media = json.loads(media)
+        if not 2 <= len(media) <= 10:
+            raise ApiError(400, 'Bad Request: wrong number of media in the album')
+        chat_id = self._chat(params, count=len(media))
+        group_id = str(self.server.random.getrandbits(63))
+        messages = []
+        for item in media:
+            fields = {'media_group_id': group_id,
+                      'photo': _photo_sizes(str(abs(hash(item.get('media', '')))))}
+            if item.get('caption'):
+                self._check_length(item['caption'], 1024, 'message caption')
+                fields['caption'] = item['caption']
+            messages.append(self.server.store(chat_id, fields))
+        return messages
+
+    def _edit(self, params: Dict, fields: Dict) -> Dict:
+        self._require(params, 'message_id')
+        chat_id = self._chat(params)
+        message = self.server.edit(chat_id, int(params['message_id']), fields)
+        if message is None:
+            raise ApiError(400, 'Bad Request: message to edit not found')
+        return message
+
+    def _api_editMessageText(self, params: Dict) -> Dict:
+        self._require(params, 'text')
+        self._check_length(params['text'], 4096, 'message')
+        return self._edit(params, {'text': params['text']})
+
+    def _api_editMessageCaption(self, params: Dict) -> Dict:
+        caption = params.get('caption') or ''
+        self._check_length(caption, 1024, 'message caption')
+        return self._edit(params, {'caption': caption})
+
+    def _api_editMessageMedia(self, params: Dict) -> Dict:
+        self._require(params, 'media')
+        media = params['media']
+        if isinstance(media, str):
+            media = json.loads(media)
+        return self._edit(params, {'photo': _photo_sizes(str(abs(hash(media.get('media', '')))))})
+
+    def _api_editMessageReplyMarkup(self, params: Dict) -> Dict:
+        markup = params.get('reply_markup') or {}
+        if isinstance(markup, str):
+            markup = json.loads(markup)
+        return self._edit(params, {'reply_markup': markup})
+
+
+# ----------------------------------------------------------------------
+# Load test
+# ----------------------------------------------------------------------
+
+def run_load(messages: int, chats: int, senders: int, server: FakeTelegramServer,
+             photo_share: float = 0.5) -> Dict:
+    """Push ``messages`` articles through ``TelegramClient.deliver`` against ``server``."""
+    from src.config.settings import Settings
+    from src.telegram.client import TelegramClient
+    from src.utils import metrics
+
+    settings = Settings()
+    settings.TELEGRAM_BOT_TOKEN = 'load-test'
+    settings.TELEGRAM_API_BASE = server.base_url
+    client = TelegramClient(settings)
+    if not client._bot_ready():
+        raise RuntimeError('fake Bot API did not answer getMe')
+
+    rate_limited_before = sum(v for _, _, v in metrics.TELEGRAM_RATE_LIMITED.samples())
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def send(i: int) -> Tuple[bool, float]:
+        article = {'title': f'Load test story {i}', 'url': f'https://example.com/{i}',
+                   'description': 'Synthetic article body. ' * 8,
+                   'image': f'https://cdn.example.com/{i}.jpg' if (i % 100) < photo_share * 100 else None}
+        chat_id = -1001000000000 - (i % chats)
+        started = time.perf_counter()
+        ok = client.deliver(chat_id, 'Load', article, client._format_article('Load', article))
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+        return ok, elapsed
+
+    started = time.perf_counter()
+    # One sender per chat mirrors the pipeline; more senders stress flood control
+    with ThreadPoolExecutor(max_workers=senders) as pool:
+        results = list(pool.map(send, range(messages)))
+    elapsed = time.perf_counter() - started
+
+    delivered = sum(1 for ok, _ in results if ok)
+    latencies.sort()
+    return {
+        'messages': messages,
+        'delivered': delivered,
+        'seconds': round(elapsed, 3),
+        'per_minute': round(delivered / elapsed * 60, 1) if elapsed else 0.0,
+        'rate_limited': int(sum(v for _, _, v in metrics.TELEGRAM_RATE_LIMITED.samples())
+                            - rate_limited_before),
+        'server_5xx': server.stats.get('502', 0),
+        'p50_ms': round(statistics.median(latencies) * 1000, 1),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name in ('serve', 'load'):
+        p = sub.add_parser(name)
+        p.add_argument('--latency', type=float, default=0.0, help='seconds per API call')
+        p.add_argument('--jitter', type=float, default=0.0)
+        p.add_argument('--chat-rate', type=float, default=20.0,
+                       help='messages per second per chat before 429 (0 = unlimited)')
+        p.add_argument('--global-rate', type=float, default=30.0,
+                       help='messages per second overall before 429 (0 = unlimited)')
+        p.add_argument('--error-rate', type=float, default=0.0, help='probability of a 502')
+        p.add_argument('--seed', type=int)
+    sub.choices['serve'].add_argument('--host', default='127.0.0.1')
+    sub.choices['serve'].add_argument('--port', type=int, default=8081)
+    load = sub.choices['load']
+    load.add_argument('--messages', type=int, default=2000)
+    load.add_argument('--chats', type=int, default=4)
+    load.add_argument('--senders', type=int, default=4)
+    args = parser.parse_args()
+
+    options = dict(latency=args.latency, jitter=args.jitter, chat_rate=args.chat_rate,
+                   global_rate=args.global_rate, error_rate=args.error_rate, seed=args.seed)
+    if args.command == 'serve':
+        server = FakeTelegramServer(args.host, args.port, **options)
+        print(f"Fake Bot API listening; set TELEGRAM_API_BASE={server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    server = FakeTelegramServer(**options).start()
+    result = run_load(args.messages, args.chats, args.senders, server)
+    server.shutdown()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
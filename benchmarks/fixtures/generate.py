@@ -0,0 +1,160 @@
+"""
+Regenerate the benchmark feed corpus.
+
+The corpus mirrors the shapes of the feeds in ``src/config/feeds.yaml``:
+RSS 2.0 with HTML descriptions and ``media:content`` (news sites), Atom with
+``<content type="html">`` and inline ``<img>`` (blogs), and bare link
+aggregators.  Titles are drawn from a fixed pool of stories with reworded
+variants, so dedup sees realistic near-duplicates.  Output is deterministic
+(fixed seed) and gzip-compressed to keep the checkout small.
+
+Usage::
+
+    python -m benchmarks.fixtures.generate
+"""
+import gzip
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+HERE = Path(__file__).parent
+
+SUBJECTS = [
+    'OpenAI', 'Google DeepMind', 'Anthropic', 'Hugging Face', 'NASA', 'ESA', 'CERN',
+    'Apple', 'Microsoft', 'Nvidia', 'AMD', 'Intel', 'the Pentagon', 'NATO', 'Ukraine',
+    'Taiwan', 'Rust', 'Python', 'Linux', 'SpaceX', 'Boeing', 'Lockheed Martin', 'MIT',
+    'Stanford researchers', 'the EU', 'Japan', 'India', 'Tesla', 'Samsung', 'TSMC',
+]
+VERBS = [
+    'unveils', 'announces', 'releases', 'delays', 'confirms', 'cancels', 'tests',
+    'publishes', 'expands', 'acquires', 'launches', 'warns about', 'open-sources',
+]
+OBJECTS = [
+    'a new reasoning model', 'its next-generation GPU', 'a quantum error-correction milestone',
+    'a hypersonic missile test', 'a Mars sample-return plan', 'a 2nm chip process',
+    'a major security patch', 'new export controls', 'a fusion energy record',
+    'a drone defense system', 'an open-weight language model', 'a satellite constellation',
+    'a battery breakthrough', 'a climate model upgrade', 'a protein-folding dataset',
+]
+REWORDS = [
+    '{s} {v} {o}', '{s} {v} {o} ahead of schedule', 'Report: {s} {v} {o}',
+    '{s} {v} {o}, sources say', 'Exclusive: {s} {v} {o}', '{s} officially {v} {o}',
+]
+LOREM = (
+    'The announcement follows months of speculation across the industry. '
+    'Analysts expect the move to reshape competition over the coming year. '
+    'Officials declined to comment on the timeline. '
+    'Early benchmarks suggest substantial gains over the previous generation. '
+    'Critics argue that the long-term costs remain unclear. '
+    'The company said more details would be shared at its developer conference. '
+)
+
+
+def _story(rng: random.Random) -> tuple:
+    return rng.choice(SUBJECTS), rng.choice(VERBS), rng.choice(OBJECTS)
+
+
+def _entries(rng: random.Random, count: int, site: str):
+    start = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    stories = [_story(rng) for _ in range(max(count // 3, 1))]
+    for i in range(count):
+        s, v, o = rng.choice(stories)
+        title = rng.choice(REWORDS).format(s=s, v=v, o=o)
+        title = title[0].upper() + title[1:]
+        sentences = LOREM.split('. ')
+        body = '. '.join(rng.sample(sentences, k=rng.randint(2, len(sentences) - 1)))
+        published = start - timedelta(minutes=17 * i + rng.randint(0, 16))
+        yield {
+            'title': title,
+            'link': f'https://{site}/{published:%Y/%m/%d}/story-{i}',
+            'body': body,
+            'author': rng.choice(['Jane Doe', 'A. Researcher', 'Staff', 'Newsroom', '']),
+            'published': published,
+            'image': f'https://cdn.{site}/img/{i}.jpg' if rng.random() < 0.7 else '',
+        }
+
+
+def rss(rng: random.Random, count: int, site: str) -> str:
+    items = []
+    for e in _entries(rng, count, site):
+        html = f'<p><strong>{e["title"]}.</strong> {e["body"]}</p><p><a href="{e["link"]}">Read more</a></p>'
+        media = (f'<media:content url="{e["image"]}" medium="image" type="image/jpeg"/>'
+                 if e['image'] else '')
+        items.append(
+            f'<item><title>{escape(e["title"])}</title><link>{e["link"]}</link>'
+            f'<guid isPermaLink="true">{e["link"]}</guid>'
+            f'<dc:creator>{escape(e["author"])}</dc:creator>'
+            f'<pubDate>{e["published"]:%a, %d %b %Y %H:%M:%S} +0000</pubDate>'
+            f'<description>{escape(html)}</description>{media}'
+            f'<category>News</category></item>'
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/" '
+        'xmlns:media="http://search.yahoo.com/mrss/"><channel>'
+        f'<title>{site}</title><link>https://{site}/</link><description>Latest news</description>'
+        '<lastBuildDate>Thu, 01 Oct 2026 00:00:00 +0000</lastBuildDate><ttl>30</ttl>'
+        + ''.join(items) + '</channel></rss>\n'
+    )
+
+
+def atom(rng: random.Random, count: int, site: str) -> str:
+    entries = []
+    for e in _entries(rng, count, site):
+        img = f'<img src="{e["image"]}" alt=""/>' if e['image'] else ''
+        html = f'{img}<p>{e["body"]}</p>'
+        entries.append(
+            f'<entry><title>{escape(e["title"])}</title>'
+            f'<link rel="alternate" href="{e["link"]}"/><id>{e["link"]}</id>'
+            f'<updated>{e["published"]:%Y-%m-%dT%H:%M:%SZ}</updated>'
+            f'<author><name>{escape(e["author"] or "Blog")}</name></author>'
+            f'<content type="html">{escape(html)}</content></entry>'
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">'
+        f'<title>{site} blog</title><link href="https://{site}/"/><id>https://{site}/</id>'
+        '<updated>2026-10-01T00:00:00Z</updated>' + ''.join(entries) + '</feed>\n'
+    )
+
+
+def links(rng: random.Random, count: int, site: str) -> str:
+    """Aggregator style (Hacker News): title + link + comments, no body."""
+    items = [
+        f'<item><title>{escape(e["title"])}</title><link>{e["link"]}</link>'
+        f'<pubDate>{e["published"]:%a, %d %b %Y %H:%M:%S} +0000</pubDate>'
+        f'<comments>https://{site}/item?id={i}</comments>'
+        f'<description><![CDATA[<a href="https://{site}/item?id={i}">Comments</a>]]></description></item>'
+        for i, e in enumerate(_entries(rng, count, site))
+    ]
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>'
+        f'<title>{site}</title><link>https://{site}/</link><description>Links</description>'
+        + ''.join(items) + '</channel></rss>\n'
+    )
+
+
+# name -> (builder, entries, site)
+CORPUS = {
+    'links_30.xml': (links, 30, 'news.example.com'),
+    'rss_50.xml': (rss, 50, 'tech.example.com'),
+    'atom_200.xml': (atom, 200, 'research.example.org'),
+    'rss_1000.xml': (rss, 1000, 'wire.example.net'),
+    'rss_10000.xml': (rss, 10000, 'archive.example.net'),
+}
+
+
+def main():
+    for name, (builder, count, site) in CORPUS.items():
+        rng = random.Random(f'{name}:{count}')
+        data = builder(rng, count, site).encode('utf-8')
+        path = HERE / f'{name}.gz'
+        # mtime=0 keeps the compressed bytes reproducible
+        with gzip.GzipFile(path, 'wb', mtime=0) as fh:
+            fh.write(data)
+        print(f'{path.name}: {count} entries, {len(data) / 1024:.0f} KiB raw, '
+              f'{path.stat().st_size / 1024:.0f} KiB gzipped')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,313 @@
+"""
+Offline record / replay of feed traffic for end-to-end cycle benchmarks.
+
+``record`` fetches every configured feed once and stores the raw response
+(status, caching headers, gzipped body) and its latency under
+``data/replay/``.  ``replay`` serves those recordings from a local HTTP
+server - optionally sleeping for the recorded latency - rewrites the feed
+configuration to point at it and runs full ``AutoMonitor.run_scrapers``
+cycles.  Delivery goes to the local fake Bot API
+(``benchmarks.fake_telegram``), so no request leaves the machine and runs are
+repeatable.
+
+Each replay run prints per-cycle timings and a stage breakdown taken from
+``src.utils.metrics`` and appends a summary to
+``benchmarks/results/replay.jsonl``.
+
+Usage::
+
+    python -m benchmarks.replay record [--dir data/replay]
+    python -m benchmarks.replay replay [--cycles 3] [--latency recorded|none] [--latency-scale 1.0]
+                                       [--telegram-latency 0.05] [--telegram-error-rate 0]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+from unittest.mock import patch
+
+import yaml
+
+from benchmarks.fake_telegram import FakeTelegramServer
+from benchmarks.startup import ROOT, git_commit
+
+DEFAULT_DIR = ROOT / 'data' / 'replay'
+RESULTS_FILE = Path(__file__).parent / 'results' / 'replay.jsonl'
+MANIFEST = 'manifest.json'
+# Response headers the scraper looks at (caching hints, content type)
+KEPT_HEADERS = ('Content-Type', 'Cache-Control', 'Expires', 'ETag', 'Last-Modified', 'Date')
+REPLAY_CHANNEL_BASE = -1000000000000
+
+
+def _key(url: str) -> str:
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+
+
+# ----------------------------------------------------------------------
+# Record
+# ----------------------------------------------------------------------
+
+def record(directory: Path) -> None:
+    """Fetch every configured feed once and store the responses."""
+    from src.config.feeds import load_config
+    from src.config.settings import get_settings
+    from src.scrapers.base_scraper import get_session
+    from src.scrapers.registry import ScraperRegistry
+
+    settings = get_settings()
+    config = load_config()
+    registry = ScraperRegistry(config.categories, settings)
+    bodies = directory / 'bodies'
+    bodies.mkdir(parents=True, exist_ok=True)
+
+    manifest = {'recorded': time.strftime('%Y-%m-%dT%H:%M:%S'), 'feeds': {}}
+    for category in config.categories.values():
+        # Same request headers as a live cycle
+        headers = registry[category.key].headers
+        for feed in category.feeds:
+            key = _key(feed.url)
+            entry = {'category': category.key, 'key': key}
+            started = time.perf_counter()
+            try:
+                response = get_session().get(
+                    feed.url, headers=headers, timeout=feed.timeout or settings.REQUEST_TIMEOUT
+                )
+                entry['latency'] = round(time.perf_counter() - started, 4)
+                entry['status'] = response.status_code
+                entry['headers'] = {h: response.headers[h] for h in KEPT_HEADERS if h in response.headers}
+                (bodies / f'{key}.gz').write_bytes(gzip.compress(response.content, mtime=0))
+                print(f"{response.status_code} {entry['latency']:6.2f}s "
+                      f"{len(response.content) / 1024:8.0f} KiB  {feed.url}")
+            except Exception as e:
+                entry['latency'] = round(time.perf_counter() - started, 4)
+                entry['error'] = str(e) or type(e).__name__
+                print(f"ERR {entry['latency']:6.2f}s  {feed.url}: {entry['error']}")
+            manifest['feeds'][feed.url] = entry
+
+    (directory / MANIFEST).write_text(json.dumps(manifest, indent=2) + '\n', encoding='utf-8')
+    print(f"Recorded {len(manifest['feeds'])} feeds to {directory}")
+
+
+# ----------------------------------------------------------------------
+# Replay server
+# ----------------------------------------------------------------------
+
+class ReplayServer(ThreadingHTTPServer):
+    """Serves recorded feeds at ``/feed/<key>``."""
+
+    daemon_threads = True
+
+    def __init__(self, directory: Path, latency_scale: float = 0.0):
+        super().__init__(('127.0.0.1', 0), _ReplayHandler)
+        manifest = json.loads((directory / MANIFEST).read_text(encoding='utf-8'))
+        self.feeds: Dict[str, Dict] = {e['key']: e for e in manifest['feeds'].values()}
+        self.urls: Dict[str, str] = {url: e['key'] for url, e in manifest['feeds'].items()}
+        self.bodies = directory / 'bodies'
+        self.latency_scale = latency_scale
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def feed_url(self, original: str) -> Optional[str]:
+        key = self.urls.get(original)
+        return f'{self.base_url}/feed/{key}' if key else None
+
+    def start(self) -> 'ReplayServer':
+        threading.Thread(target=self.serve_forever, name='replay-http', daemon=True).start()
+        return self
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    server: ReplayServer
+
+    def do_GET(self):
+        if not self.path.startswith('/feed/'):
+            self.send_error(404)
+            return
+        key = self.path[len('/feed/'):]
+        entry = self.server.feeds.get(key)
+        if entry is None:
+            self.send_error(404)
+            return
+        if self.server.latency_scale:
+            time.sleep(entry['latency'] * self.server.latency_scale)
+        if 'error' in entry:
+            self.send_error(502, entry['error'][:100])
+            return
+        body = gzip.decompress((self.server.bodies / f'{key}.gz').read_bytes())
+        self.send_response(entry['status'])
+        for name, value in entry.get('headers', {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def write_replay_config(server: ReplayServer, path: Path) -> int:
+    """Copy the feed configuration with every recorded feed pointed at ``server``."""
+    from src.config.feeds import load_config
+
+    config = load_config()
+    categories = {}
+    feeds_total = 0
+    for i, (key, cat) in enumerate(config.categories.items(), start=1):
+        feeds = []
+        for feed in cat.feeds:
+            url = server.feed_url(feed.url)
+            if url:
+                feeds.append({**feed.model_dump(exclude_none=True), 'url': url})
+        feeds_total += len(feeds)
+        categories[key] = {
+            'name': cat.name, 'emoji': cat.emoji, 'label': cat.label, 'enabled': cat.enabled,
+            'channel': cat.channel or REPLAY_CHANNEL_BASE - i, 'feeds': feeds,
+        }
+    path.write_text(yaml.safe_dump({'categories': categories}, allow_unicode=True), encoding='utf-8')
+    return feeds_total
+
+
+# ----------------------------------------------------------------------
+# Replay
+# ----------------------------------------------------------------------
+
+def _stage_totals() -> Dict[str, float]:
+    from src.utils import metrics
+
+    def hist_sum(hist) -> float:
+        return sum(value for name, _, value in hist.samples() if name.endswith('_sum'))
+
+    return {
+        'fetch_s': hist_sum(metrics.FEED_FETCH_SECONDS),
+        'dedup_s': hist_sum(metrics.DEDUP_SECONDS),
+        'format_s': hist_sum(metrics.FORMAT_SECONDS),
+        'send_s': hist_sum(metrics.TELEGRAM_SEND_SECONDS),
+    }
+
+
+@contextmanager
+def offline_monitor(feeds_file: Path, state_dir: Path, telegram: FakeTelegramServer) -> Iterator:
+    """An ``AutoMonitor`` reading ``feeds_file`` and delivering to ``telegram``; state in ``state_dir``."""
+    env = {
+        'FEEDS_FILE': str(feeds_file),
+        'LOG_FILE': str(state_dir / 'replay.log'),
+        'ENABLE_LLM_DEDUP': 'false',
+        'TELEGRAM_BOT_TOKEN': 'replay',
+        'TELEGRAM_API_BASE': telegram.base_url,
+        'CONFIG_POLL_INTERVAL': '0',
+        'ARCHIVE_PATH': str(state_dir / 'archive.db'),
+    }
+    with patch.dict(os.environ, env), \
+            patch('src.main.SENT_CACHE_FILE', state_dir / 'sent_cache.json'):
+        from src.config.settings import get_settings
+        from src.main import AutoMonitor
+
+        # Settings may already have been read from the real environment
+        settings = get_settings()
+        settings.ENABLE_LLM_DEDUP = False
+        settings.CONFIG_POLL_INTERVAL = 0
+        settings.TELEGRAM_BOT_TOKEN = 'replay'
+        settings.TELEGRAM_API_BASE = telegram.base_url
+        settings.ARCHIVE_PATH = str(state_dir / 'archive.db')
+
+        monitor = AutoMonitor()
+        monitor.scheduler.state_file = state_dir / 'feed_schedule.json'
+        monitor.health.state_file = state_dir / 'feed_health.json'
+        yield monitor
+
+
+def replay(directory: Path, cycles: int, latency_scale: float, telegram: FakeTelegramServer) -> Dict:
+    server = ReplayServer(directory, latency_scale).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        feeds_file = tmp_path / 'feeds.yaml'
+        feeds_total = write_replay_config(server, feeds_file)
+
+        with offline_monitor(feeds_file, tmp_path, telegram) as monitor:
+            runs = []
+            for n in range(cycles):
+                # Every cycle starts cold: all feeds due, nothing sent yet
+                monitor.scheduler.feeds.clear()
+                monitor.health.feeds.clear()
+                monitor.sent_urls.clear()
+                before = _stage_totals()
+                calls_before = telegram.sent_count()
+                started = time.perf_counter()
+                monitor.run_scrapers()
+                elapsed = time.perf_counter() - started
+                after = _stage_totals()
+                run = {'cycle_s': round(elapsed, 4),
+                       'messages': telegram.sent_count() - calls_before}
+                run.update({k: round(after[k] - before[k], 4) for k in after})
+                runs.append(run)
+                print(f"cycle {n + 1}: {run['cycle_s']:.2f}s  fetch {run['fetch_s']:.2f}s "
+                      f"(summed)  dedup {run['dedup_s']:.3f}s  format {run['format_s']:.3f}s  "
+                      f"send {run['send_s']:.3f}s  messages {run['messages']}")
+    server.shutdown()
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'feeds': feeds_total,
+        'cycles': cycles,
+        'latency_scale': latency_scale,
+        'median_cycle_s': round(statistics.median(r['cycle_s'] for r in runs), 4),
+        'median_dedup_s': round(statistics.median(r['dedup_s'] for r in runs), 4),
+        'median_send_s': round(statistics.median(r['send_s'] for r in runs), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    rec = sub.add_parser('record', help='fetch every configured feed and store the responses')
+    rec.add_argument('--dir', type=Path, default=DEFAULT_DIR)
+    rep = sub.add_parser('replay', help='run full cycles against the recorded responses')
+    rep.add_argument('--dir', type=Path, default=DEFAULT_DIR)
+    rep.add_argument('--cycles', type=int, default=3)
+    rep.add_argument('--latency', choices=('recorded', 'none'), default='recorded',
+                     help='sleep for each feed\'s recorded latency before answering')
+    rep.add_argument('--latency-scale', type=float, default=1.0)
+    rep.add_argument('--telegram-latency', type=float, default=0.05,
+                     help='seconds per fake Bot API call')
+    rep.add_argument('--telegram-error-rate', type=float, default=0.0,
+                     help='probability of a 502 from the fake Bot API')
+    rep.add_argument('--no-record', action='store_true', help="don't append to the results file")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record(args.dir)
+        return
+
+    if not (args.dir / MANIFEST).exists():
+        sys.exit(f"No recording in {args.dir}; run `python -m benchmarks.replay record` first")
+    scale = args.latency_scale if args.latency == 'recorded' else 0.0
+    telegram = FakeTelegramServer(latency=args.telegram_latency, error_rate=args.telegram_error_rate,
+                                  chat_rate=0, global_rate=0).start()
+    try:
+        result = replay(args.dir, args.cycles, scale, telegram)
+    finally:
+        telegram.shutdown()
+    print(f"median cycle: {result['median_cycle_s']:.2f}s over {result['feeds']} feeds")
+    if not args.no_record:
+        RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(RESULTS_FILE, 'a', encoding='utf-8') as fh:
+            fh.write(json.dumps(result) + '\n')
+        print(f"Recorded in {RESULTS_FILE.relative_to(ROOT)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+"""
+Soak test: thousands of back-to-back cycles, checking that resource use stays flat.
+
+Runs full ``AutoMonitor.run_scrapers`` cycles with no sleep in between. Feeds
+come from a local server built on the fixture corpus, and delivery goes to the
+fake Bot API (``benchmarks.fake_telegram``). The feed server rewrites article
+links every other request. That way each category keeps getting new stories
+to dedup, format and send, and then a cycle of nothing new. The sent-URL
+deques, the scheduler and the health state all see real churn.
+
+Every ``--sample-every`` cycles the harness runs ``gc.collect()`` and records:
+
+- ``rss_kib``         resident set size (``/proc/self/statm``)
+- ``fds``             open file descriptors
+- ``threads``         live Python threads
+- ``objects``         objects tracked by the garbage collector
+- ``feedparser_dicts`` / ``soups``
+                      live ``FeedParserDict`` / ``BeautifulSoup`` instances
+- ``sent_urls``       URLs held across the per-category sent deques
+- ``log_handlers``    handlers attached to any logger
+
+The first ``--warmup`` cycles are excluded, because caches, pools and the
+sent deques fill up during them. After warmup, a metric counts as trending
+upward when the median of the last third of samples exceeds the median of
+the first third by more than that metric's allowance. Any such trend fails
+the run (exit status 1).
+
+Usage::
+
+    python -m benchmarks.soak [--cycles 2000] [--sample-every 50] [--warmup 200]
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+from benchmarks.fake_telegram import FakeTelegramServer
+from benchmarks.replay import REPLAY_CHANNEL_BASE, offline_monitor
+from benchmarks.stages import load_corpus
+from benchmarks.startup import ROOT, git_commit
+
+RESULTS_FILE = Path(__file__).parent / 'results' / 'soak.jsonl'
+# category -> fixture feeds it polls
+CATEGORIES = {
+    'soak_news': ('links_30', 'rss_50'),
+    'soak_research': ('atom_200',),
+    'soak_wire': ('rss_50',),
+}
+# metric -> (absolute allowance, allowance relative to the early median)
+ALLOWANCES: Dict[str, Tuple[float, float]] = {
+    'rss_kib': (4096, 0.05),
+    'fds': (2, 0.0),
+    'threads': (1, 0.0),
+    'objects': (2000, 0.02),
+    'feedparser_dicts': (0, 0.0),
+    'soups': (0, 0.0),
+    'sent_urls': (0, 0.0),
+    'log_handlers': (0, 0.0),
+}
+
+
+class _SoakFeedServer(ThreadingHTTPServer):
+    """Serves fixture feeds at ``/<category>/<name>``; links change every other request."""
+
+    daemon_threads = True
+
+    def __init__(self, corpus: Dict[str, bytes]):
+        super().__init__(('127.0.0.1', 0), _SoakFeedHandler)
+        self.corpus = corpus
+        self.requests: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def start(self) -> '_SoakFeedServer':
+        threading.Thread(target=self.serve_forever, name='soak-http', daemon=True).start()
+        return self
+
+
+class _SoakFeedHandler(BaseHTTPRequestHandler):
+    server: _SoakFeedServer
+
+    def do_GET(self):
+        body = self.server.corpus.get(self.path.rsplit('/', 1)[-1])
+        if body is None:
+            self.send_error(404)
+            return
+        with self.server.lock:
+            count = self.server.requests.get(self.path, 0)
+            self.server.requests[self.path] = count + 1
+        body = body.replace(b'/story-', b'/e%d-story-' % (count // 2))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def write_soak_config(server: _SoakFeedServer, path: Path) -> None:
+    categories = {
+        key: {
+            'name': key.replace('_', ' ').title(),
+            'channel': REPLAY_CHANNEL_BASE - i,
+            'feeds': [{'url': f'{server.base_url}/{key}/{name}'} for name in feeds],
+        }
+        for i, (key, feeds) in enumerate(CATEGORIES.items(), start=1)
+    }
+    path.write_text(yaml.safe_dump({'categories': categories}), encoding='utf-8')
+
+
+# ----------------------------------------------------------------------
+# Resource sampling
+# ----------------------------------------------------------------------
+
+def _rss_kib() -> Optional[float]:
+    try:
+        with open('/proc/self/statm') as fh:
+            pages = int(fh.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _open_fds() -> Optional[int]:
+    for directory in ('/proc/self/fd', '/dev/fd'):
+        try:
+            return len(os.listdir(directory))
+        except OSError:
+            continue
+    return None
+
+
+def sample(monitor) -> Dict[str, float]:
+    """Current resource readings (metrics the platform can't report are left out)."""
+    import feedparser
+    from bs4 import BeautifulSoup
+
+    gc.collect()
+    objects = gc.get_objects()
+    loggers = [logging.getLogger()] + [
+        lg for lg in list(logging.Logger.manager.loggerDict.values()) if isinstance(lg, logging.Logger)
+    ]
+    readings = {
+        'rss_kib': _rss_kib(),
+        'fds': _open_fds(),
+        'threads': threading.active_count(),
+        'objects': len(objects),
+        'feedparser_dicts': sum(1 for o in objects if type(o) is feedparser.FeedParserDict),
+        'soups': sum(1 for o in objects if type(o) is BeautifulSoup),
+        'sent_urls': sum(len(urls) for urls in monitor.sent_urls.values()),
+        'log_handlers': sum(len(lg.handlers) for lg in loggers),
+    }
+    del objects
+    return {name: value for name, value in readings.items() if value is not None}
+
+
+def trends(samples: List[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """Early vs late medians per metric, flagged when growth exceeds the allowance."""
+    third = max(len(samples) // 3, 1)
+    result = {}
+    for name, (absolute, relative) in ALLOWANCES.items():
+        values = [s[name] for s in samples if name in s]
+        if len(values) < 3:
+            continue
+        early = statistics.median(values[:third])
+        late = statistics.median(values[-third:])
+        allowed = max(absolute, relative * early)
+        result[name] = {'early': early, 'late': late, 'allowed': allowed,
+                        'growing': late - early > allowed}
+    return result
+
+
+# ----------------------------------------------------------------------
+# Soak
+# ----------------------------------------------------------------------
+
+def soak(cycles: int, sample_every: int, warmup: int) -> Dict:
+    """Run ``cycles`` accelerated cycles and return the samples and per-metric trends."""
+    corpus = load_corpus()
+    names = {name for feeds in CATEGORIES.values() for name in feeds}
+    server = _SoakFeedServer({name: corpus[name] for name in names}).start()
+    telegram = FakeTelegramServer(chat_rate=0, global_rate=0).start()
+    samples: List[Dict[str, float]] = []
+    messages = 0
+    started = time.perf_counter()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            feeds_file = tmp_path / 'feeds.yaml'
+            write_soak_config(server, feeds_file)
+            with offline_monitor(feeds_file, tmp_path, telegram) as monitor:
+                # Nothing to wait for: a window closes as soon as the fetches do
+                monitor.settings.DEDUP_WINDOW_SECONDS = 0.01
+                for n in range(1, cycles + 1):
+                    # Fast-forward the clock: every feed is due again
+                    for state in monitor.scheduler.feeds.values():
+                        state.next_due = 0.0
+                    monitor.run_scrapers()
+                    # The fake Bot API keeps every message; don't count its memory
+                    messages += telegram.clear()
+                    if n > warmup and (n - warmup) % sample_every == 0:
+                        reading = sample(monitor)
+                        reading['cycle'] = n
+                        samples.append(reading)
+                        print(f"cycle {n:6d}: " + '  '.join(
+                            f'{k} {v:.0f}' for k, v in reading.items() if k != 'cycle'), flush=True)
+    finally:
+        telegram.shutdown()
+        server.shutdown()
+        server.server_close()
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'cycles': cycles,
+        'warmup': warmup,
+        'seconds': round(time.perf_counter() - started, 1),
+        'messages': messages,
+        'samples': samples,
+        'trends': trends(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--cycles', type=int, default=2000)
+    parser.add_argument('--sample-every', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=200,
+                        help='cycles to run before the first sample (caches and sent deques fill up)')
+    parser.add_argument('--no-record', action='store_true', help="don't append to the results file")
+    args = parser.parse_args()
+    if args.cycles - args.warmup < 3 * args.sample_every:
+        sys.exit('Need at least three samples after warmup; raise --cycles or lower --sample-every')
+
+    # Cycle logs at INFO would dominate the run time
+    from src.config.settings import get_settings
+    get_settings().LOG_LEVEL = 'WARNING'
+    result = soak(args.cycles, args.sample_every, args.warmup)
+
+    print(f"\n{result['cycles']} cycles in {result['seconds']:.0f}s, {result['messages']} messages")
+    print(f"{'metric':18} {'early':>12} {'late':>12} {'allowed':>10}")
+    for name, t in result['trends'].items():
+        flag = '  GROWING' if t['growing'] else ''
+        print(f"{name:18} {t['early']:12.0f} {t['late']:12.0f} {t['allowed']:10.0f}{flag}")
+
+    if not args.no_record:
+        RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        summary = {k: v for k, v in result.items() if k != 'samples'}
+        with open(RESULTS_FILE, 'a', encoding='utf-8') as fh:
+            fh.write(json.dumps(summary) + '\n')
+        print(f"Recorded in {RESULTS_FILE.relative_to(ROOT)}")
+
+    growing = [name for name, t in result['trends'].items() if t['growing']]
+    if growing:
+        print(f"\nResource use trending upward: {', '.join(growing)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
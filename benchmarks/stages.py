@@ -0,0 +1,270 @@
+"""
+Per-stage throughput benchmark over the fixture corpus.
+
+Runs each hot stage on the gzipped feeds in ``benchmarks/fixtures`` (small
+aggregator feeds up to a 10k-entry archive) and reports items/second and
+peak traced memory:
+
+- ``parse``          ``BaseScraper.extract_articles_from_feed`` against a local
+                     HTTP server (fetch + streaming parse + article building)
+- ``clean_html``     ``BaseScraper._clean_html`` on every entry description
+- ``extract_image``  ``BaseScraper._extract_image`` on every parsed entry
+- ``dedup``          the production fuzzy dedup and candidate strategies
+- ``format``         ``TelegramClient._format_article`` on every article
+
+Results are compared with ``benchmarks/results/baseline.json``; ``--check``
+fails when a stage is slower or uses more memory than the baseline allows.
+
+Usage::
+
+    python -m benchmarks.stages [--repeat 3] [--only parse] [--quick] [--check]
+    python -m benchmarks.stages --save-baseline
+
+A full run takes a few minutes, most of it in the 10k-entry feed (traced
+for memory); ``--quick`` leaves out fixtures over 1 MiB.
+"""
+import argparse
+import gc
+import gzip
+import json
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from difflib import SequenceMatcher
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.startup import ROOT, git_commit
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+BASELINE_FILE = Path(__file__).parent / 'results' / 'baseline.json'
+DEDUP_SIZES = (50, 200, 500)
+QUICK_MAX_BYTES = 1024 * 1024
+
+
+def load_corpus(directory: Path = FIXTURES) -> Dict[str, bytes]:
+    """Fixture name -> raw feed bytes (``*.xml.gz`` or plain ``*.xml``)."""
+    corpus = {}
+    for path in sorted(directory.glob('*.xml*')):
+        data = path.read_bytes()
+        name = path.name
+        if name.endswith('.gz'):
+            data, name = gzip.decompress(data), name[:-3]
+        corpus[name[:-4]] = data
+    return corpus
+
+
+class _CorpusHandler(BaseHTTPRequestHandler):
+    corpus: Dict[str, bytes] = {}
+
+    def do_GET(self):
+        body = self.corpus.get(self.path.strip('/'))
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+# ----------------------------------------------------------------------
+# Dedup strategies
+# ----------------------------------------------------------------------
+
+def _greedy(titles: List[str], similar: Callable[[str, str], bool]) -> List[List[int]]:
+    used = [False] * len(titles)
+    groups = []
+    for i in range(len(titles)):
+        if used[i]:
+            continue
+        group = [i]
+        used[i] = True
+        for j in range(i + 1, len(titles)):
+            if not used[j] and similar(titles[i], titles[j]):
+                group.append(j)
+                used[j] = True
+        groups.append(group)
+    return groups
+
+
+def dedup_fuzzy_prefiltered(titles: List[str], threshold: float) -> List[List[int]]:
+    """Same grouping as production, but skip ratio() when the cheap upper bounds rule it out."""
+    lowered = [t.lower().strip() for t in titles]
+
+    def similar(a: str, b: str) -> bool:
+        matcher = SequenceMatcher(None, a, b)
+        return (matcher.real_quick_ratio() >= threshold
+                and matcher.quick_ratio() >= threshold
+                and matcher.ratio() >= threshold)
+
+    return _greedy(lowered, similar)
+
+
+def dedup_token_jaccard(titles: List[str], threshold: float = 0.5) -> List[List[int]]:
+    """Word-set Jaccard similarity; not equivalent to the production grouping."""
+    tokens = {}
+    for t in titles:
+        tokens[t] = frozenset(re.findall(r'\w+', t.lower()))
+
+    def similar(a: str, b: str) -> bool:
+        ta, tb = tokens[a], tokens[b]
+        return bool(ta or tb) and len(ta & tb) / len(ta | tb) >= threshold
+
+    return _greedy(titles, similar)
+
+
+# ----------------------------------------------------------------------
+# Harness
+# ----------------------------------------------------------------------
+
+def measure(fn: Callable[[], int], repeat: int) -> Dict[str, float]:
+    """Best-of-``repeat`` wall time, then one traced run for peak memory."""
+    best = float('inf')
+    items = 0
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        items = fn()
+        best = min(best, time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'items': items,
+        'seconds': round(best, 6),
+        'items_per_s': round(items / best, 1) if best else 0.0,
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def build_cases(corpus: Dict[str, bytes], base_url: str) -> List[Tuple[str, Callable[[], int]]]:
+    import feedparser
+    from src.config.feeds import parse_categories
+    from src.config.settings import get_settings
+    from src.scrapers.registry import ScraperRegistry
+    from src.telegram.client import TelegramClient
+    from src.utils.deduplicator import ArticleDeduplicator
+
+    settings = get_settings()
+    feeds = [{'url': f'{base_url}/{name}', 'max_articles': 100000} for name in corpus]
+    registry = ScraperRegistry(
+        parse_categories({'categories': {'bench': {'name': 'Bench', 'feeds': feeds}}}), settings
+    )
+    scraper = registry['bench']
+
+    # Skip __init__: no getMe round trip, _format_article only needs settings
+    client = TelegramClient.__new__(TelegramClient)
+    client.settings = settings
+
+    parsed = {name: feedparser.parse(data) for name, data in corpus.items()}
+    articles = {name: scraper.extract_articles_from_feed(f'{base_url}/{name}') for name in corpus}
+
+    cases = []
+    for name in corpus:
+        url = f'{base_url}/{name}'
+        entries = parsed[name].entries
+        summaries = [e.get('summary', '') for e in entries]
+        cases.append((f'parse/{name}', lambda url=url: len(scraper.extract_articles_from_feed(url))))
+        cases.append((f'clean_html/{name}',
+                      lambda s=summaries: sum(1 for text in s if scraper._clean_html(text) is not None)))
+        cases.append((f'extract_image/{name}',
+                      lambda es=entries: sum(1 for e in es if scraper._extract_image(e) or True)))
+        cases.append((f'format/{name}',
+                      lambda arts=articles[name]: sum(1 for a in arts if client._format_article('Bench', a))))
+
+    # Dedup on a window of the largest non-archive feed's articles
+    pool = articles[max((n for n in corpus if len(articles[n]) <= 1000), key=lambda n: len(articles[n]))]
+    dedup = ArticleDeduplicator(settings)
+    threshold = settings.DEDUP_SIMILARITY_THRESHOLD
+    for size in DEDUP_SIZES:
+        window = pool[:size]
+        titles = [a['title'] for a in window]
+        cases.append((f'dedup/fuzzy/{size}', lambda w=window: len(dedup._fuzzy_deduplicate(w)) and len(w)))
+        cases.append((f'dedup/fuzzy_prefiltered/{size}',
+                      lambda t=titles: len(dedup_fuzzy_prefiltered(t, threshold)) and len(t)))
+        cases.append((f'dedup/token_jaccard/{size}',
+                      lambda t=titles: len(dedup_token_jaccard(t)) and len(t)))
+    return cases
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Print a comparison table; return the cases that regressed beyond ``tolerance``."""
+    regressions = []
+    print(f"{'case':42} {'items/s':>12} {'vs base':>8} {'peak KiB':>10} {'vs base':>8}")
+    for case, r in results.items():
+        base = baseline.get(case)
+        speed = mem = ''
+        if base:
+            speed_delta = r['items_per_s'] / base['items_per_s'] - 1 if base['items_per_s'] else 0
+            mem_delta = r['peak_kib'] / base['peak_kib'] - 1 if base['peak_kib'] else 0
+            speed, mem = f'{speed_delta:+.0%}', f'{mem_delta:+.0%}'
+            if speed_delta < -tolerance or mem_delta > tolerance:
+                regressions.append(case)
+        print(f"{case:42} {r['items_per_s']:12.1f} {speed:>8} {r['peak_kib']:10.1f} {mem:>8}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', help='run only cases whose name contains this string')
+    parser.add_argument('--quick', action='store_true', help='skip the largest fixtures')
+    parser.add_argument('--corpus', type=Path, default=FIXTURES,
+                        help='directory of *.xml / *.xml.gz feeds (default: checked-in fixtures)')
+    parser.add_argument('--save-baseline', action='store_true', help='overwrite the baseline file')
+    parser.add_argument('--check', action='store_true',
+                        help='exit non-zero if a case regressed beyond --tolerance')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed throughput drop / memory growth (default 0.25)')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if args.quick:
+        corpus = {name: data for name, data in corpus.items() if len(data) <= QUICK_MAX_BYTES}
+    _CorpusHandler.corpus = corpus
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _CorpusHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        cases = build_cases(corpus, base_url)
+        results = {
+            name: measure(fn, args.repeat)
+            for name, fn in cases if not args.only or args.only in name
+        }
+    finally:
+        server.shutdown()
+
+    baseline = {}
+    if BASELINE_FILE.exists():
+        baseline = json.loads(BASELINE_FILE.read_text(encoding='utf-8')).get('cases', {})
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        BASELINE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        BASELINE_FILE.write_text(json.dumps({
+            'commit': git_commit(),
+            'python': sys.version.split()[0],
+            'recorded': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'cases': {**baseline, **results},
+        }, indent=2) + '\n', encoding='utf-8')
+        print(f"Baseline written to {BASELINE_FILE.relative_to(ROOT)}")
+
+    if regressions:
+        print(f"\n{len(regressions)} case(s) beyond {args.tolerance:.0%} of baseline: "
+              + ', '.join(regressions))
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+Cold-start benchmark.
+
+Measures, in fresh interpreter processes:
+
+1. ``python -X importtime -c "import src.main"`` - total import time and the
+   slowest modules.
+2. Time to first fetch - from process spawn until the first feed has been
+   fetched and parsed from a local HTTP server (no external network).
+
+Each run is printed and appended to ``benchmarks/results/startup.jsonl``
+together with the git commit, so start-up cost can be tracked over time.
+
+Usage::
+
+    python -m benchmarks.startup [--runs 5] [--no-record]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_FILE = Path(__file__).parent / 'results' / 'startup.jsonl'
+
+SAMPLE_FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Bench</title><link>http://localhost/</link>
+<item><title>First item</title><link>http://localhost/1</link>
+<description>&lt;p&gt;Hello &lt;b&gt;world&lt;/b&gt;&lt;/p&gt;</description>
+<pubDate>Mon, 05 Oct 2026 10:00:00 GMT</pubDate></item>
+<item><title>Second item</title><link>http://localhost/2</link>
+<description>Plain text summary.</description>
+<pubDate>Mon, 05 Oct 2026 09:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+import src.main
+from src.config.settings import get_settings
+from src.scrapers.registry import ScraperRegistry
+t_import = time.perf_counter()
+from src.config.feeds import parse_categories
+url = sys.argv[1]
+registry = ScraperRegistry(
+    parse_categories({'categories': {'bench': {'name': 'Bench', 'feeds': [url]}}}),
+    get_settings(),
+)
+articles = registry['bench'].extract_articles_from_feed(url)
+t_fetch = time.perf_counter()
+print(json.dumps({
+    'import_s': t_import - t0,
+    'first_fetch_s': t_fetch - t0,
+    'articles': len(articles),
+    'done_at': time.time(),
+}))
+"""
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('Content-Length', str(len(SAMPLE_FEED)))
+        self.end_headers()
+        self.wfile.write(SAMPLE_FEED)
+
+    def log_message(self, *args):
+        pass
+
+
+def _child_env(tmp: str) -> dict:
+    env = dict(os.environ)
+    env['LOG_FILE'] = str(Path(tmp) / 'bench.log')
+    env['PYTHONPATH'] = str(ROOT)
+    return env
+
+
+def measure_importtime(env: dict, top: int = 10) -> dict:
+    """Total self+cumulative import time of src.main and its slowest imports."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import src.main'],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        head, cumulative_us, name = line.split('|')
+        self_us = head.split(':', 1)[1]
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    total = next((c for c, _, name in rows if name == 'src.main'), 0)
+    slowest = sorted(r for r in rows if r[2] not in ('src.main', 'site'))[::-1][:top]
+    return {
+        'import_src_main_ms': total / 1000,
+        'slowest': [{'module': n, 'cumulative_ms': c / 1000} for c, _, n in slowest],
+    }
+
+
+def measure_first_fetch(env: dict, url: str) -> dict:
+    spawned = time.time()
+    proc = subprocess.run(
+        [sys.executable, '-c', CHILD, url],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['spawn_to_first_fetch_s'] = result.pop('done_at') - spawned
+    return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--no-record', action='store_true', help="don't append to the results file")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FeedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/rss'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _child_env(tmp)
+        imports = measure_importtime(env)
+        runs = [measure_first_fetch(env, url) for _ in range(args.runs)]
+    server.shutdown()
+
+    record = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'import_src_main_ms': round(imports['import_src_main_ms'], 1),
+        'median_import_s': round(statistics.median(r['import_s'] for r in runs), 4),
+        'median_first_fetch_s': round(statistics.median(r['first_fetch_s'] for r in runs), 4),
+        'median_spawn_to_first_fetch_s': round(
+            statistics.median(r['spawn_to_first_fetch_s'] for r in runs), 4),
+        'runs': args.runs,
+    }
+
+    print(f"import src.main (-X importtime): {record['import_src_main_ms']:.1f} ms")
+    for row in imports['slowest']:
+        print(f"  {row['cumulative_ms']:8.1f} ms  {row['module']}")
+    print(f"median in-process import:        {record['median_import_s'] * 1000:.1f} ms")
+    print(f"median import -> first fetch:    {record['median_first_fetch_s'] * 1000:.1f} ms")
+    print(f"median spawn -> first fetch:     {record['median_spawn_to_first_fetch_s'] * 1000:.1f} ms")
+
+    if not args.no_record:
+        RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(RESULTS_FILE, 'a', encoding='utf-8') as fh:
+            fh.write(json.dumps(record) + '\n')
+        print(f"Recorded in {RESULTS_FILE.relative_to(ROOT)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 """
 Entry point script to run AutoMonitor
 """
+import argparse
 import os
 import sys
 from pathlib import Path
@@ -33,9 +34,35 @@ def release_lock():
 
 from src.main import main
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Run the AutoMonitor bot')
+    parser.add_argument('--profile-every', type=int, metavar='N',
+                        help='profile every Nth cycle into PROFILE_DIR (overrides PROFILE_EVERY)')
+    parser.add_argument('--worker', action='store_true',
+                        help='distributed mode: share the feeds with other workers through DATABASE_URL '
+                             '(no single-instance lock)')
+    parser.add_argument('--worker-id', help='stable name for this worker (default: the hostname; '
+                                            'required when several workers share a host)')
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    acquire_lock()
-    try:
+    args = parse_args()
+    from src.config.settings import get_settings
+    settings = get_settings()
+    if args.profile_every is not None:
+        settings.PROFILE_EVERY = args.profile_every
+    if args.worker or args.worker_id:
+        settings.WORKER_MODE = True
+    if args.worker_id:
+        settings.WORKER_ID = args.worker_id
+
+    # Workers coordinate through database leases instead of the PID lock
+    if settings.WORKER_MODE:
         main()
-    finally:
-        release_lock()
+    else:
+        acquire_lock()
+        try:
+            main()
+        finally:
+            release_lock()
@@ -16,6 +16,7 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/yourusername/AutoMonitor",
     packages=find_packages(),
+    package_data={"src.config": ["feeds.yaml"]},
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Developers",
@@ -31,9 +32,9 @@ setup(
         "requests>=2.28.0",
         "beautifulsoup4>=4.11.0",
         "lxml>=4.9.0",
+        "cssselect>=1.2.0",
         "selenium>=4.10.0",
         "feedparser>=6.0.0",
-        "schedule>=1.2.0",
         "python-dotenv>=1.0.0",
         "twilio>=8.10.0",
         "aiohttp>=3.8.0",
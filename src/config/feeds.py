@@ -0,0 +1,203 @@
+"""
+Declarative category / feed configuration loaded from feeds.yaml
+
+The models validate the file with pydantic, which is slow to import; the
+start-up path only imports this module when ConfigManager loads the file.
+"""
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import (
+    BaseModel, ConfigDict, Field, PositiveFloat, PositiveInt, field_validator, model_validator,
+)
+
+from src.config.table import feeds_file, read_feeds_file, resolve_category, resolve_subscription
+
+
+class PageSelectors(BaseModel):
+    """CSS selectors that turn an HTML listing page into articles"""
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
+    item: str                           # one element per listed article
+    link: str = 'a[href]'               # within the item; its href is the article URL
+    title: Optional[str] = None         # default: the link's text
+    description: Optional[str] = None
+    image: Optional[str] = None         # <img> (src / data-src)
+    date: Optional[str] = None          # datetime attribute or text
+
+    @field_validator('item', 'link', 'title', 'description', 'image', 'date')
+    @classmethod
+    def _check_selector(cls, selector: Optional[str]) -> Optional[str]:
+        if selector is not None:
+            from cssselect import GenericTranslator, SelectorError
+            try:
+                GenericTranslator().css_to_xpath(selector)
+            except SelectorError as e:
+                raise ValueError(f"invalid CSS selector {selector!r}: {e}")
+        return selector
+
+
+class FeedConfig(BaseModel):
+    """One feed URL plus its optional per-feed overrides"""
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
+    url: str
+    enabled: bool = True
+    timeout: Optional[PositiveFloat] = None
+    max_articles: Optional[PositiveInt] = None
+    # Multiplies the ranking score of this feed's stories (see ranking.py)
+    weight: PositiveFloat = 1.0
+    # Set for HTML pages without a feed: scraped with these selectors
+    page: Optional[PageSelectors] = None
+
+    @field_validator('url')
+    @classmethod
+    def _check_url(cls, url: str) -> str:
+        if not url.startswith(('http://', 'https://')):
+            raise ValueError(f"feed url must be http(s): {url!r}")
+        return url
+
+
+class CategoryConfig(BaseModel):
+    """A news category: its feeds and where its messages go"""
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
+    key: str
+    name: str
+    feeds: Tuple[FeedConfig, ...] = ()
+    enabled: bool = True
+    channel: int = 0
+    emoji: str = '📰'
+    label: str = ''
+
+    @field_validator('feeds', mode='before')
+    @classmethod
+    def _expand_feeds(cls, feeds):
+        return tuple({'url': f} if isinstance(f, str) else f for f in feeds or ())
+
+    @property
+    def sources(self) -> List[str]:
+        return [feed.url for feed in self.feeds if feed.enabled]
+
+
+class SubscriptionConfig(BaseModel):
+    """Keyword / regex filter across categories, delivered to its own channel"""
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
+    key: str
+    channel: int = 0  # 0 (e.g. channel_env unset) = subscription inactive
+    keywords: Tuple[str, ...] = ()
+    patterns: Tuple[str, ...] = ()
+    # Category keys (or names) to take articles from; empty = every category
+    categories: Tuple[str, ...] = ()
+    enabled: bool = True
+
+    @field_validator('patterns')
+    @classmethod
+    def _check_patterns(cls, patterns: Tuple[str, ...]) -> Tuple[str, ...]:
+        for pattern in patterns:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"invalid pattern {pattern!r}: {e}")
+        return patterns
+
+    @model_validator(mode='after')
+    def _check_filters(self) -> 'SubscriptionConfig':
+        if not self.keywords and not self.patterns:
+            raise ValueError(f"subscription {self.key!r} needs keywords or patterns")
+        return self
+
+
+# Settings the ``settings:`` section may override. They are either read when
+# used or rebuilt by AutoMonitor._on_config_change; the rest (pool sizes,
+# storage paths, logging, ENABLE_*_NEWS, ...) are bound at start-up and only
+# change through the environment and a restart.
+RELOADABLE_SETTINGS = frozenset({
+    'TELEGRAM_BOT_TOKEN', 'TELEGRAM_API_BASE', 'TELEGRAM_MAX_RETRIES', 'TELEGRAM_MAX_RETRY_AFTER',
+    'SCRAPE_INTERVAL', 'FEED_MIN_INTERVAL', 'FEED_MAX_INTERVAL', 'SCHEDULER_JITTER',
+    'CYCLE_DEADLINE', 'REQUEST_TIMEOUT', 'FEED_CONTENT_HASH', 'FEED_FAST_PARSE', 'FEED_MAX_BYTES',
+    'FEED_FAILURE_THRESHOLD', 'FEED_BASE_BACKOFF', 'FEED_MAX_BACKOFF',
+    'MAX_ARTICLES_PER_CATEGORY', 'MAX_SENDS_PER_CATEGORY', 'MAX_SENDS_PER_CYCLE',
+    'MAX_SENDS_PER_SUBSCRIPTION', 'RANKING', 'RANK_HALF_LIFE_HOURS', 'RANK_SOURCE_BOOST',
+    'RANK_TRENDING_BOOST', 'TRENDING_MIN_COUNT', 'TRENDING_GROWTH', 'TRENDING_RECENT_BUCKETS',
+    'TRENDING_CANDIDATES', 'PIPELINE_QUEUE_SIZE', 'DEDUP_WINDOW_SECONDS', 'DEDUP_WINDOW_SIZE',
+    'ENRICH_ARTICLES', 'ENRICH_WORKERS', 'ENRICH_TIMEOUT', 'ENRICH_CYCLE_BUDGET',
+    'ENRICH_CACHE_TTL', 'ENRICH_CACHE_SIZE', 'ENRICH_MIN_DESCRIPTION', 'ENRICH_MAX_BYTES',
+    'ENABLE_LLM_DEDUP', 'OPENAI_API_KEY', 'LLM_DEDUP_MODEL', 'DEDUP_SIMILARITY_THRESHOLD',
+    'ARCHIVE_RETENTION_DAYS',
+})
+
+
+class AppConfig(BaseModel):
+    """
+    The whole reloadable configuration file.
+
+    ``settings`` overrides Settings attributes by name (e.g.
+    ``DEDUP_SIMILARITY_THRESHOLD: 0.7``); values are coerced to the type of
+    the attribute they replace. Only RELOADABLE_SETTINGS are accepted.
+    """
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
+    categories: Dict[str, CategoryConfig] = Field(default_factory=dict)
+    subscriptions: Dict[str, SubscriptionConfig] = Field(default_factory=dict)
+    settings: Dict[str, Any] = Field(default_factory=dict)
+
+    @field_validator('settings')
+    @classmethod
+    def _check_settings(cls, overrides: Dict[str, Any]) -> Dict[str, Any]:
+        from src.config.settings import Settings
+        checked = {}
+        for name, value in overrides.items():
+            current = getattr(Settings, name, None)
+            if not name.isupper() or current is None:
+                raise ValueError(f"unknown setting {name!r}")
+            if name not in RELOADABLE_SETTINGS:
+                raise ValueError(f"setting {name!r} cannot be changed without a restart")
+            if isinstance(current, bool):
+                value = value if isinstance(value, bool) else str(value).lower() == 'true'
+            elif isinstance(current, (int, float, str)):
+                value = type(current)(value)
+            checked[name] = value
+        return checked
+
+    def channels(self) -> Dict[str, int]:
+        return {c.name: c.channel for c in self.categories.values()}
+
+    def category_meta(self) -> Dict[str, Dict[str, str]]:
+        return {c.name: {'emoji': c.emoji, 'label': c.label} for c in self.categories.values()}
+
+
+def parse_config(raw: Dict) -> AppConfig:
+    """Validate a parsed YAML document; raises pydantic.ValidationError."""
+    raw = dict(raw or {})
+    raw['categories'] = {
+        key: resolve_category(key, cat) for key, cat in (raw.get('categories') or {}).items()
+    }
+    raw['subscriptions'] = {
+        key: resolve_subscription(key, sub) for key, sub in (raw.get('subscriptions') or {}).items()
+    }
+    return AppConfig.model_validate(raw)
+
+
+def parse_categories(raw: Dict) -> Dict[str, CategoryConfig]:
+    """Build CategoryConfig objects from the parsed YAML document."""
+    return parse_config(raw).categories
+
+
+def load_config(path: Optional[Path] = None) -> AppConfig:
+    """Read and validate a feeds YAML file."""
+    return parse_config(read_feeds_file(path or feeds_file()))
+
+
+def load_categories(path: Optional[Path] = None) -> Dict[str, CategoryConfig]:
+    """Read and parse a feeds YAML file."""
+    return load_config(path).categories
+
+
+@lru_cache(maxsize=1)
+def default_categories() -> Dict[str, CategoryConfig]:
+    """Categories from FEEDS_FILE (or the bundled feeds.yaml), loaded once."""
+    return load_categories()
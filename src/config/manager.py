@@ -0,0 +1,131 @@
+"""
+Hot-reloadable configuration.
+
+ConfigManager owns the validated AppConfig loaded from FEEDS_FILE.  A reload
+(on file change or SIGHUP) parses and validates the whole file first; only a
+fully valid config replaces the current one, so a typo never leaves the bot
+half-configured.  Listeners are then told what changed and rebuild only the
+parts that depend on it.
+"""
+import logging
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set
+
+from src.config.table import feeds_file
+
+# pydantic (feeds.py) is imported when the file is first loaded, not on import
+if TYPE_CHECKING:
+    from src.config.feeds import AppConfig
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigChange:
+    """What differs between two configurations"""
+
+    def __init__(self, old: Optional['AppConfig'], new: 'AppConfig'):
+        old_cats = old.categories if old else {}
+        old_settings = old.settings if old else {}
+        self.added: Set[str] = set(new.categories) - set(old_cats)
+        self.removed: Set[str] = set(old_cats) - set(new.categories)
+        self.changed: Set[str] = {
+            key for key in set(new.categories) & set(old_cats)
+            if new.categories[key] != old_cats[key]
+        }
+        old_subs = old.subscriptions if old else {}
+        self.subscriptions: Set[str] = {
+            key for key in set(new.subscriptions) | set(old_subs)
+            if new.subscriptions.get(key) != old_subs.get(key)
+        }
+        self.settings: Set[str] = {
+            name for name in set(new.settings) | set(old_settings)
+            if new.settings.get(name) != old_settings.get(name)
+        }
+        if old is None or old.channels() != new.channels():
+            self.settings.add('TELEGRAM_CHANNELS')
+        if old is None or old.category_meta() != new.category_meta():
+            self.settings.add('CATEGORY_META')
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed or self.subscriptions or self.settings)
+
+    def __str__(self) -> str:
+        parts = []
+        for label, keys in (('added', self.added), ('removed', self.removed),
+                            ('changed', self.changed), ('subscriptions', self.subscriptions),
+                            ('settings', self.settings)):
+            if keys:
+                parts.append(f"{label}: {', '.join(sorted(keys))}")
+        return '; '.join(parts) or 'no changes'
+
+
+class ConfigManager:
+    """Loads, validates and atomically reloads the configuration file."""
+
+    def __init__(self, settings, path: Optional[Path] = None):
+        self.settings = settings
+        self.path = Path(path or feeds_file())
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[['AppConfig', ConfigChange], None]] = []
+        self._defaults: Dict[str, object] = {}
+        self._mtime = self._stat()
+        self.config: 'AppConfig' = self._load()
+        self._apply_settings(None, self.config)
+
+    def subscribe(self, listener: Callable[['AppConfig', ConfigChange], None]) -> None:
+        """Call ``listener(new_config, change)`` after every successful reload."""
+        self._listeners.append(listener)
+
+    def _load(self) -> 'AppConfig':
+        from src.config.feeds import load_config
+        return load_config(self.path)
+
+    def _stat(self) -> float:
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    def changed_on_disk(self) -> bool:
+        return self._stat() != self._mtime
+
+    def reload(self) -> bool:
+        """Reload the file; returns True if a new configuration was applied."""
+        with self._lock:
+            mtime = self._stat()
+            try:
+                new = self._load()
+            except Exception as e:
+                # Keep running on the last good config
+                self._mtime = mtime
+                logger.error("Config reload rejected, keeping current config: %s", e)
+                return False
+            self._mtime = mtime
+
+            change = ConfigChange(self.config, new)
+            if not change:
+                logger.info("Config reloaded: no changes")
+                return False
+
+            self._apply_settings(self.config, new)
+            self.config = new
+            logger.info("Config reloaded (%s)", change)
+            for listener in self._listeners:
+                try:
+                    listener(new, change)
+                except Exception as e:
+                    logger.error("Error applying config change: %s", e)
+            return True
+
+    def _apply_settings(self, old: Optional['AppConfig'], new: 'AppConfig') -> None:
+        """Push ``settings`` overrides and derived mappings onto the shared Settings."""
+        previous = set(old.settings) if old else set()
+        for name in previous - set(new.settings):
+            # Override removed from the file: fall back to the env/default value
+            setattr(self.settings, name, self._defaults.pop(name))
+        for name, value in new.settings.items():
+            self._defaults.setdefault(name, getattr(self.settings, name))
+            setattr(self.settings, name, value)
+        self.settings.TELEGRAM_CHANNELS = new.channels()
+        self.settings.CATEGORY_META = new.category_meta()
@@ -1,24 +1,65 @@
 """Configuration management for AutoMonitor"""
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
+from src.config.table import category_sources, category_table
 
 load_dotenv()
 
 
+def _category_sources(key: str) -> list:
+    category = category_table().get(key)
+    return category_sources(category) if category else []
+
+
 class Settings:
     """Application settings and configuration"""
     
-    # Telegram Configuration - Channel mapping by category
+    # Telegram Configuration - Channel mapping by category (declared in feeds.yaml)
     TELEGRAM_BOT_TOKEN: str = os.getenv('TELEGRAM_BOT_TOKEN', '')
-    TELEGRAM_CHANNELS: dict = {
-        'Technology': int(os.getenv('TELEGRAM_TECH_CHANNEL', 0)),
-        'Science': int(os.getenv('TELEGRAM_SCIENCE_CHANNEL', 0)),
-        'AI & Machine Learning': int(os.getenv('TELEGRAM_AI_CHANNEL', 0)),
-        'Military & Defense': int(os.getenv('TELEGRAM_MILITARY_CHANNEL', 0)),
+    # Bot API server; point at a local stand-in (benchmarks/fake_telegram.py) for load tests
+    TELEGRAM_API_BASE: str = os.getenv('TELEGRAM_API_BASE', 'https://api.telegram.org')
+    # Retries per call on 429 (honouring retry_after) and 5xx responses
+    TELEGRAM_MAX_RETRIES: int = int(os.getenv('TELEGRAM_MAX_RETRIES', '3'))
+    # Give up instead of waiting when Telegram asks for a longer pause (seconds)
+    TELEGRAM_MAX_RETRY_AFTER: float = float(os.getenv('TELEGRAM_MAX_RETRY_AFTER', '30'))
+    TELEGRAM_CHANNELS: dict = {c['name']: c['channel'] for c in category_table().values()}
+    # Message header emoji and hashtag label per category
+    CATEGORY_META: dict = {
+        c['name']: {'emoji': c.get('emoji', '📰'), 'label': c['label']}
+        for c in category_table().values()
     }
     
     # Database Configuration
     DATABASE_URL: str = os.getenv('DATABASE_URL', 'sqlite:///automonitor.db')
+    # Connection pool (PostgreSQL): steady connections, extra burst connections,
+    # seconds to wait for a free one, and age (seconds) after which one is replaced
+    DB_POOL_SIZE: int = int(os.getenv('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW: int = int(os.getenv('DB_MAX_OVERFLOW', '5'))
+    DB_POOL_TIMEOUT: float = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+    DB_POOL_RECYCLE: int = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    # Rows per INSERT statement in bulk writes
+    DB_BATCH_SIZE: int = int(os.getenv('DB_BATCH_SIZE', '1000'))
+    # Log every SQL statement (independent of DEBUG)
+    DB_ECHO: bool = os.getenv('DB_ECHO', 'false').lower() == 'true'
+
+    # Distributed mode (run.py --worker): workers sharing DATABASE_URL split the
+    # feeds into SHARD_COUNT shards held under LEASE_TTL-second leases
+    WORKER_MODE: bool = os.getenv('WORKER_MODE', 'false').lower() == 'true'
+    WORKER_ID: str = os.getenv('WORKER_ID', '')  # default: the hostname
+    SHARD_COUNT: int = int(os.getenv('SHARD_COUNT', '64'))
+    LEASE_TTL: float = float(os.getenv('LEASE_TTL', '60'))
+    # Seconds a claimed article may stay unsent before another worker retries it
+    SENT_CLAIM_TTL: float = float(os.getenv('SENT_CLAIM_TTL', '600'))
+    # Days the shared sent history is kept (0 = forever)
+    SENT_HISTORY_DAYS: float = float(os.getenv('SENT_HISTORY_DAYS', '30'))
+
+    # Full-text article archive (SQLite FTS5); '' disables archiving.
+    # Maintenance prunes articles older than ARCHIVE_RETENTION_DAYS (0 = keep
+    # forever) and compacts the index every ARCHIVE_MAINTENANCE_INTERVAL seconds.
+    ARCHIVE_PATH: str = os.getenv('ARCHIVE_PATH', 'data/archive.db')
+    ARCHIVE_RETENTION_DAYS: float = float(os.getenv('ARCHIVE_RETENTION_DAYS', '365'))
+    ARCHIVE_MAINTENANCE_INTERVAL: float = float(os.getenv('ARCHIVE_MAINTENANCE_INTERVAL', '86400'))
     
     # Scraper Configuration
     SCRAPE_INTERVAL: int = int(os.getenv('SCRAPE_INTERVAL', '3600'))  # 1 hour
@@ -26,64 +67,130 @@ class Settings:
     ENABLE_SCIENCE_NEWS: bool = os.getenv('ENABLE_SCIENCE_NEWS', 'true').lower() == 'true'
     ENABLE_AI_NEWS: bool = os.getenv('ENABLE_AI_NEWS', 'true').lower() == 'true'
     ENABLE_MILITARY_NEWS: bool = os.getenv('ENABLE_MILITARY_NEWS', 'true').lower() == 'true'
+    # Adaptive per-feed polling: each feed's interval is learned from its
+    # publish cadence and cache headers, clamped to these bounds (seconds).
+    # SCRAPE_INTERVAL is the starting interval for feeds with no history.
+    FEED_MIN_INTERVAL: int = int(os.getenv('FEED_MIN_INTERVAL', '120'))  # 2 minutes
+    FEED_MAX_INTERVAL: int = int(os.getenv('FEED_MAX_INTERVAL', '21600'))  # 6 hours
+    # Skip parsing a feed whose body (minus lastBuildDate and similar) hashes
+    # the same as on the previous poll - for servers without ETag/Last-Modified
+    FEED_CONTENT_HASH: bool = os.getenv('FEED_CONTENT_HASH', 'true').lower() == 'true'
+    # Parse RSS 2.0 / Atom feeds with the streaming lxml parser, which stops
+    # after the entries we keep or FEED_MAX_BYTES; other feeds use feedparser
+    FEED_FAST_PARSE: bool = os.getenv('FEED_FAST_PARSE', 'true').lower() == 'true'
+    FEED_MAX_BYTES: int = int(os.getenv('FEED_MAX_BYTES', str(4 * 1024 * 1024)))
+    # Random delay (seconds) added to start-up and to every cycle wake-up
+    SCHEDULER_JITTER: float = float(os.getenv('SCHEDULER_JITTER', '5'))
+    # Seconds to wait for an in-flight cycle to finish its sends on SIGTERM
+    SHUTDOWN_TIMEOUT: float = float(os.getenv('SHUTDOWN_TIMEOUT', '20'))
+    # How often (seconds) FEEDS_FILE is checked for changes; 0 = only on SIGHUP
+    CONFIG_POLL_INTERVAL: float = float(os.getenv('CONFIG_POLL_INTERVAL', '10'))
     
     # Logging
     LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE: str = os.getenv('LOG_FILE', 'logs/automonitor.log')
+    # 'text' or 'json' (one object per line)
+    LOG_FORMAT: str = os.getenv('LOG_FORMAT', 'text')
+    # Rotate by size, or by time when LOG_ROTATE_WHEN is set (e.g. 'midnight', 'H')
+    LOG_MAX_BYTES: int = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+    LOG_ROTATE_WHEN: str = os.getenv('LOG_ROTATE_WHEN', '')
+    LOG_BACKUP_COUNT: int = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+
+    # Metrics - Prometheus text format at http://METRICS_HOST:METRICS_PORT/metrics (0 = off)
+    METRICS_PORT: int = int(os.getenv('METRICS_PORT', '0'))
+    METRICS_HOST: str = os.getenv('METRICS_HOST', '127.0.0.1')
+
+    # Profiling - every Nth cycle runs under cProfile + tracemalloc (0 = off,
+    # SIGUSR1 toggles at runtime); .prof files and reports go to PROFILE_DIR
+    PROFILE_EVERY: int = int(os.getenv('PROFILE_EVERY', '0'))
+    PROFILE_DIR: str = os.getenv('PROFILE_DIR', 'logs/profiles')
+    PROFILE_TOP: int = int(os.getenv('PROFILE_TOP', '30'))
     
     # Cloud Deployment
     ENVIRONMENT: str = os.getenv('ENVIRONMENT', 'development')
     DEBUG: bool = os.getenv('DEBUG', 'false').lower() == 'true'
     
-    # Scraper URLs - Working RSS feeds for each category
-    TECH_NEWS_SOURCES: list = [
-        # Primary recommended sources
-        'https://feeds.arstechnica.com/arstechnica/index',       # Ars Technica - deep technical coverage
-        'https://www.theverge.com/rss/index.xml',                # The Verge - fast consumer tech news
-        'https://news.ycombinator.com/rss',                      # Hacker News - dev-curated top stories
-        # Supplementary
-        'https://feeds.feedburner.com/TechCrunch',
-    ]
-    
-    SCIENCE_NEWS_SOURCES: list = [
-        # Primary recommended sources
-        'https://www.nature.com/nature.rss',                     # Nature - premier peer-reviewed journal
-        'https://www.science.org/rss/news_current.xml',          # Science - top-tier research journal
-        'https://www.technologyreview.com/feed/',                 # MIT Technology Review - science to commercialization
-        'https://phys.org/rss-feed/',                            # Phys.org - physics, nano, space sciences
-        # Supplementary
-        'https://www.sciencedaily.com/rss/top/science.xml',
-    ]
-    
-    AI_NEWS_SOURCES: list = [
-        # Primary recommended sources
-        'https://huggingface.co/blog/feed.xml',                  # Hugging Face Blog - open-source model releases
-        'https://openai.com/blog/rss/',                          # OpenAI Blog - frontier model updates
-        'https://www.anthropic.com/news/rss',                    # Anthropic News - safety & frontier research
-        'https://deepmind.google/blog/rss.xml',                  # Google DeepMind Blog - research breakthroughs
-        'https://www.deeplearning.ai/the-batch/feed/',           # The Batch (Andrew Ng) - curated AI trends
-        'https://www.latent.space/feed',                         # Latent Space - AI engineering depth
-        # Supplementary
-        'https://venturebeat.com/category/ai/feed/',
-    ]
-    
-    MILITARY_NEWS_SOURCES: list = [
-        # Primary recommended sources
-        'https://www.understandingwar.org/rss.xml',              # ISW - gold standard OSINT & operational analysis
-        'https://acleddata.com/feed/',                           # ACLED - real-time conflict & protest data
-        'https://www.cfr.org/rss/all-publications',             # CFR - strategic global conflict overview
-        # Supplementary
-        'https://www.militarytimes.com/arc/outboundfeeds/rss/?outputType=xml',
-        'https://breakingdefense.com/feed/',
-        'https://www.defensenews.com/arc/outboundfeeds/rss/?outputType=xml',
-    ]
+    # Scraper URLs - feeds are declared per category in src/config/feeds.yaml
+    # (override the file with FEEDS_FILE); these lists mirror it for callers
+    # that still read the per-category settings
+    TECH_NEWS_SOURCES: list = _category_sources('tech')
+    SCIENCE_NEWS_SOURCES: list = _category_sources('science')
+    AI_NEWS_SOURCES: list = _category_sources('ai')
+    MILITARY_NEWS_SOURCES: list = _category_sources('military')
     
     # Request timeout (in seconds)
     REQUEST_TIMEOUT: int = 10
+
+    # Feeds are fetched concurrently by this many worker threads
+    FEED_FETCH_WORKERS: int = int(os.getenv('FEED_FETCH_WORKERS', '8'))
+    # Wall-clock budget (seconds) for fetching in one cycle; feeds still
+    # outstanding at the deadline are dropped and the rest is sent
+    CYCLE_DEADLINE: float = float(os.getenv('CYCLE_DEADLINE', '90'))
+
+    # Circuit breaker: after this many consecutive failures a feed is skipped
+    # for FEED_BASE_BACKOFF seconds, doubling per further failure up to
+    # FEED_MAX_BACKOFF
+    FEED_FAILURE_THRESHOLD: int = int(os.getenv('FEED_FAILURE_THRESHOLD', '3'))
+    FEED_BASE_BACKOFF: float = float(os.getenv('FEED_BASE_BACKOFF', '600'))  # 10 minutes
+    FEED_MAX_BACKOFF: float = float(os.getenv('FEED_MAX_BACKOFF', '43200'))  # 12 hours
     
     # Maximum articles per category per cycle
     MAX_ARTICLES_PER_CATEGORY: int = 20
 
+    # Maximum Telegram messages per category per cycle
+    MAX_SENDS_PER_CATEGORY: int = int(os.getenv('MAX_SENDS_PER_CATEGORY', '5'))
+
+    # Which stories get the sends: 'off' sends the first ones per category as
+    # feeds return; 'category' ranks each dedup window of a category as it
+    # closes (recency, feed weight, source count, trending) and sends the best;
+    # 'global' ranks the whole cycle under MAX_SENDS_PER_CYCLE for all categories.
+    # Recency halves every RANK_HALF_LIFE_HOURS; RANK_SOURCE_BOOST scales the
+    # bonus per doubling of sources, RANK_TRENDING_BOOST that for trending.
+    RANKING: str = os.getenv('RANKING', 'category').lower()
+    MAX_SENDS_PER_CYCLE: int = int(os.getenv('MAX_SENDS_PER_CYCLE', '15'))
+    RANK_HALF_LIFE_HOURS: float = float(os.getenv('RANK_HALF_LIFE_HOURS', '6'))
+    RANK_SOURCE_BOOST: float = float(os.getenv('RANK_SOURCE_BOOST', '0.5'))
+    RANK_TRENDING_BOOST: float = float(os.getenv('RANK_TRENDING_BOOST', '1'))
+
+    # Trending detection: title words, entities and story fingerprints are
+    # counted in count-min sketches (DEPTH x WIDTH counters) per
+    # TRENDING_BUCKET_SECONDS, over the last TRENDING_BUCKETS buckets. A
+    # feature seen TRENDING_MIN_COUNT times in the last TRENDING_RECENT_BUCKETS
+    # buckets, at TRENDING_GROWTH times its earlier rate, is trending.
+    TRENDING_DETECTION: bool = os.getenv('TRENDING_DETECTION', 'true').lower() == 'true'
+    TRENDING_BUCKET_SECONDS: float = float(os.getenv('TRENDING_BUCKET_SECONDS', '1800'))
+    TRENDING_BUCKETS: int = int(os.getenv('TRENDING_BUCKETS', '12'))
+    TRENDING_RECENT_BUCKETS: int = int(os.getenv('TRENDING_RECENT_BUCKETS', '2'))
+    TRENDING_MIN_COUNT: int = int(os.getenv('TRENDING_MIN_COUNT', '3'))
+    TRENDING_GROWTH: float = float(os.getenv('TRENDING_GROWTH', '3'))
+    TRENDING_SKETCH_WIDTH: int = int(os.getenv('TRENDING_SKETCH_WIDTH', '4096'))
+    TRENDING_SKETCH_DEPTH: int = int(os.getenv('TRENDING_SKETCH_DEPTH', '4'))
+    # Features tracked by name for the "Trending:" log line
+    TRENDING_CANDIDATES: int = int(os.getenv('TRENDING_CANDIDATES', '256'))
+
+    # Maximum Telegram messages per keyword subscription per cycle
+    MAX_SENDS_PER_SUBSCRIPTION: int = int(os.getenv('MAX_SENDS_PER_SUBSCRIPTION', '5'))
+
+    # Streaming pipeline: capacity of the queues between stages, and how long
+    # (or how many articles) a category is buffered for cross-feed dedup
+    PIPELINE_QUEUE_SIZE: int = int(os.getenv('PIPELINE_QUEUE_SIZE', '32'))
+    DEDUP_WINDOW_SECONDS: float = float(os.getenv('DEDUP_WINDOW_SECONDS', '3'))
+    DEDUP_WINDOW_SIZE: int = int(os.getenv('DEDUP_WINDOW_SIZE', '20'))
+
+    # Enrichment: stories about to be sent that have no image or a description
+    # shorter than ENRICH_MIN_DESCRIPTION get og:image / og:description from
+    # the article page. ENRICH_WORKERS fetch concurrently; a batch waits at most
+    # ENRICH_TIMEOUT seconds and a cycle ENRICH_CYCLE_BUDGET seconds in total.
+    # Results are cached per URL for ENRICH_CACHE_TTL seconds.
+    ENRICH_ARTICLES: bool = os.getenv('ENRICH_ARTICLES', 'false').lower() == 'true'
+    ENRICH_WORKERS: int = int(os.getenv('ENRICH_WORKERS', '8'))
+    ENRICH_TIMEOUT: float = float(os.getenv('ENRICH_TIMEOUT', '3'))
+    ENRICH_CYCLE_BUDGET: float = float(os.getenv('ENRICH_CYCLE_BUDGET', '10'))
+    ENRICH_CACHE_TTL: float = float(os.getenv('ENRICH_CACHE_TTL', '86400'))
+    ENRICH_CACHE_SIZE: int = int(os.getenv('ENRICH_CACHE_SIZE', '5000'))
+    ENRICH_MIN_DESCRIPTION: int = int(os.getenv('ENRICH_MIN_DESCRIPTION', '120'))
+    ENRICH_MAX_BYTES: int = int(os.getenv('ENRICH_MAX_BYTES', str(256 * 1024)))
+
     # ----------------------------------------------------------------
     # LLM Deduplication
     # ----------------------------------------------------------------
@@ -99,3 +206,9 @@ class Settings:
 
     # Fuzzy fallback: titles with similarity >= this value are merged (0.0-1.0)
     DEDUP_SIMILARITY_THRESHOLD: float = float(os.getenv('DEDUP_SIMILARITY_THRESHOLD', '0.6'))
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """The process-wide Settings instance, built once and shared"""
+    return Settings()
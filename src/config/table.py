@@ -0,0 +1,75 @@
+"""
+The feeds file as plain data.
+
+Settings needs the category table (names, channels, header meta, feed URLs)
+while its class body runs, i.e. on ``import``. Reading it here as plain
+dicts keeps pydantic off the import path: the models in ``feeds.py`` are
+only built when ConfigManager / ``load_config`` validate the file.
+"""
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import yaml
+
+# libyaml's C loader is several times faster than the pure-Python one
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+DEFAULT_FEEDS_FILE = Path(__file__).parent / 'feeds.yaml'
+
+
+def feeds_file() -> Path:
+    return Path(os.getenv('FEEDS_FILE') or DEFAULT_FEEDS_FILE)
+
+
+def read_feeds_file(path: Optional[Path] = None) -> Dict:
+    """The parsed YAML document, unvalidated."""
+    with open(path or feeds_file(), encoding='utf-8') as fh:
+        return yaml.load(fh, Loader=_YamlLoader) or {}
+
+
+def _env_flag(name: Optional[str], default: bool = True) -> bool:
+    if not name or name not in os.environ:
+        return default
+    return os.environ[name].lower() == 'true'
+
+
+def resolve_category(key: str, cat: Dict) -> Dict:
+    """Fill in the category key and resolve the *_env indirections."""
+    cat = dict(cat or {})
+    enabled_env = cat.pop('enabled_env', None)
+    channel_env = cat.pop('channel_env', None)
+    cat['key'] = key
+    cat.setdefault('name', key)
+    cat['enabled'] = _env_flag(enabled_env, bool(cat.get('enabled', True)))
+    channel = os.getenv(channel_env) if channel_env else None
+    cat['channel'] = int(channel or cat.get('channel') or 0)
+    cat['label'] = cat.get('label') or cat['name']
+    return cat
+
+
+def resolve_subscription(key: str, sub: Dict) -> Dict:
+    """Fill in the subscription key and resolve ``channel_env``."""
+    sub = dict(sub or {})
+    channel_env = sub.pop('channel_env', None)
+    sub['key'] = key
+    channel = os.getenv(channel_env) if channel_env else None
+    sub['channel'] = int(channel or sub.get('channel') or 0)
+    for field in ('keywords', 'patterns', 'categories'):
+        if isinstance(sub.get(field), str):
+            sub[field] = [sub[field]]
+    return sub
+
+
+@lru_cache(maxsize=1)
+def category_table() -> Dict[str, Dict]:
+    """Resolved categories of FEEDS_FILE (or the bundled feeds.yaml), read once."""
+    raw = read_feeds_file()
+    return {key: resolve_category(key, cat) for key, cat in (raw.get('categories') or {}).items()}
+
+
+def category_sources(category: Dict) -> List[str]:
+    """URLs of a category's enabled feeds (feeds are URLs or mappings)."""
+    feeds = [{'url': f} if isinstance(f, str) else f for f in category.get('feeds') or ()]
+    return [f['url'] for f in feeds if f.get('enabled', True)]
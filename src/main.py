@@ -1,151 +1,432 @@
 """
 AutoMonitor - Main Application Entry Point
 """
+import asyncio
 import json
 import logging
-import schedule
+import random
+import signal
+import threading
 import time
 from collections import deque
 from pathlib import Path
-from typing import Dict, Deque
-from src.config.settings import Settings
-from src.scrapers.tech_scraper import TechScraper
-from src.scrapers.science_scraper import ScienceScraper
-from src.scrapers.ai_scraper import AIScraper
-from src.scrapers.military_scraper import MilitaryScraper
+from typing import Dict, Deque, Optional
+from src.config.manager import ConfigChange, ConfigManager
+from src.config.settings import get_settings
+from src.pipeline import StreamingPipeline
+from src.scrapers.registry import ScraperRegistry
 from src.telegram.client import TelegramClient
+from src.scrapers.enrichment import ArticleEnricher
+from src.utils.archive import ArticleArchive
+from src.utils.trending import TrendingDetector
 from src.utils.deduplicator import ArticleDeduplicator
+from src.utils.feed_health import FeedHealth
+from src.utils.feed_scheduler import FeedScheduler
+from src.utils import metrics
 from src.utils.logger import setup_logger
+from src.utils.profiling import CycleProfiler
+from src.utils.subscriptions import SubscriptionEngine
 
 logger = setup_logger(__name__)
 
 SENT_CACHE_FILE = Path(__file__).parent.parent / 'data' / 'sent_cache.json'
 SENT_CACHE_SIZE = 500  # number of recent URLs to remember per category.
+RELOAD_WAIT = 30.0  # seconds a due cycle waits for a config reload to be applied
 
 
 class AutoMonitor:
     """Main application class for AutoMonitor bot"""
     
     def __init__(self):
-        self.settings = Settings()
+        self.settings = get_settings()
+        self.config_manager = ConfigManager(self.settings)
+        self.config_manager.subscribe(self._on_config_change)
         self.telegram_client = TelegramClient(self.settings)
+        self.scheduler = FeedScheduler(self.settings)
+        self.health = FeedHealth(self.settings)
         self.scrapers = self._initialize_scrapers()
         self.deduplicator = ArticleDeduplicator(self.settings)
+        self.subscriptions = self._initialize_subscriptions()
+        self.archive = ArticleArchive(self.settings.ARCHIVE_PATH) if self.settings.ARCHIVE_PATH else None
+        self.enricher = ArticleEnricher(self.settings) if self.settings.ENRICH_ARTICLES else None
+        self.trending = TrendingDetector(self.settings) if self.settings.TRENDING_DETECTION else None
+        self.coordinator = self.ledger = None
+        if self.settings.WORKER_MODE:
+            self._initialize_worker()
         self.sent_urls: Dict[str, Deque[str]] = self._load_sent_cache()
+        self.profiler = CycleProfiler(self.settings)
+        # Held while a cycle runs so a slow cycle is never entered twice
+        self._cycle_lock = threading.Lock()
+        # Set on SIGTERM/SIGINT; checked between categories so shutdown is prompt
+        self._stopping = threading.Event()
+        # Wakes the run loop early (e.g. after a config reload adds feeds)
+        self._wake = lambda: None
+        self._reloading = threading.Lock()
+        # Set while a reload holds _cycle_lock; a cycle due then waits instead of skipping
+        self._applying_config = threading.Event()
         logger.info("AutoMonitor initialized successfully")
 
+    def _initialize_worker(self):
+        """Distributed mode: lease feed shards and share sent history through the database"""
+        from src.utils.coordination import SentLedger, ShardCoordinator
+        from src.utils.db import DatabaseManager
+
+        database = DatabaseManager()
+        self.coordinator = ShardCoordinator(database.engine, self.settings)
+        self.ledger = SentLedger(database.engine, self.coordinator.worker_id, self.settings.SENT_CLAIM_TTL)
+        # Each worker polls different feeds; don't let them overwrite each other's state
+        for state in (self.scheduler, self.health):
+            path = state.state_file
+            state.state_file = path.with_name(f"{path.stem}-{self.coordinator.worker_id}{path.suffix}")
+        logger.info("Running as worker %s (%s shards, %ss leases)",
+                    self.coordinator.worker_id, self.settings.SHARD_COUNT, self.settings.LEASE_TTL)
+
+    def _heartbeat(self) -> None:
+        """Renew this worker's leases; poll nothing while the database is unreachable"""
+        try:
+            self.coordinator.heartbeat()
+        except Exception as e:
+            logger.error("Lease heartbeat failed: %s", e)
+            self.coordinator.owned = set()
+            return
+        try:
+            self.ledger.prune(self.settings.SENT_HISTORY_DAYS)
+        except Exception as e:
+            logger.error("Sent history pruning failed: %s", e)
+
+    async def _keep_leases(self):
+        """Heartbeat every LEASE_TTL / 3 seconds, also while a cycle is running"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await loop.run_in_executor(None, self._heartbeat)
+            await asyncio.sleep(self.coordinator.heartbeat_interval)
+
     def _load_sent_cache(self) -> Dict[str, Deque[str]]:
         """Load the persisted sent-URL cache from disk."""
         cache: Dict[str, Deque[str]] = {}
+        if self.ledger is not None:
+            return cache  # workers share sent history through the database
         try:
             if SENT_CACHE_FILE.exists():
                 raw = json.loads(SENT_CACHE_FILE.read_text(encoding='utf-8'))
                 for cat, urls in raw.items():
                     cache[cat] = deque(urls, maxlen=SENT_CACHE_SIZE)
-                logger.info(f"Loaded sent cache ({sum(len(v) for v in cache.values())} entries)")
+                logger.info("Loaded sent cache (%s entries)", sum(len(v) for v in cache.values()))
         except Exception as e:
-            logger.warning(f"Could not load sent cache: {e}")
+            logger.warning("Could not load sent cache: %s", e)
         return cache
 
     def _save_sent_cache(self) -> None:
         """Persist the current sent-URL cache to disk."""
+        if self.ledger is not None:
+            return
         try:
             SENT_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
-            data = {cat: list(urls) for cat, urls in self.sent_urls.items()}
-            SENT_CACHE_FILE.write_text(json.dumps(data, indent=2), encoding='utf-8')
+            data = {cat: list(urls) for cat, urls in list(self.sent_urls.items())}
+            tmp = SENT_CACHE_FILE.with_suffix('.tmp')
+            tmp.write_text(json.dumps(data, indent=2), encoding='utf-8')
+            tmp.replace(SENT_CACHE_FILE)
         except Exception as e:
-            logger.warning(f"Could not save sent cache: {e}")
+            logger.warning("Could not save sent cache: %s", e)
     
-    def _initialize_scrapers(self) -> dict:
-        """Initialize all enabled scrapers"""
-        scrapers = {}
-        
-        if self.settings.ENABLE_TECH_NEWS:
-            scrapers['tech'] = TechScraper()
-            logger.info("Tech scraper enabled")
-        
-        if self.settings.ENABLE_SCIENCE_NEWS:
-            scrapers['science'] = ScienceScraper()
-            logger.info("Science scraper enabled")
-        
-        if self.settings.ENABLE_AI_NEWS:
-            scrapers['ai'] = AIScraper()
-            logger.info("AI scraper enabled")
-        
-        if self.settings.ENABLE_MILITARY_NEWS:
-            scrapers['military'] = MilitaryScraper()
-            logger.info("Military scraper enabled")
-        
+    def _initialize_scrapers(self) -> ScraperRegistry:
+        """Build the (lazy) scraper registry for every enabled category"""
+        scrapers = ScraperRegistry(
+            self.config_manager.config.categories, self.settings,
+            scheduler=self.scheduler, health=self.health,
+        )
+        for key in scrapers:
+            config = scrapers.config(key)
+            logger.info("%s scraper enabled (%s feeds)", config.name, len(config.sources))
         return scrapers
     
+    def _initialize_subscriptions(self) -> SubscriptionEngine:
+        """Compile the keyword/regex subscriptions into one matcher"""
+        engine = SubscriptionEngine.from_config(self.config_manager.config)
+        if len(engine):
+            logger.info("%s keyword subscription(s) active", len(engine))
+        return engine
+
+    def _on_config_change(self, config, change: ConfigChange):
+        """Rebuild only what the new configuration affects; caches and pools stay"""
+        self.scrapers.update(config.categories)
+        if change.subscriptions or change.added or change.removed or change.changed:
+            # Category names resolve subscription filters, so rebuild on either
+            self.subscriptions = self._initialize_subscriptions()
+        if change.settings & {'TELEGRAM_BOT_TOKEN', 'TELEGRAM_API_BASE'}:
+            self.telegram_client = TelegramClient(self.settings)
+            logger.info("Telegram client rebuilt for new bot token / API base")
+        if change.settings & {'ENABLE_LLM_DEDUP', 'OPENAI_API_KEY', 'LLM_DEDUP_MODEL'}:
+            self.deduplicator = ArticleDeduplicator(self.settings)
+        if change.settings & {'SCRAPE_INTERVAL', 'FEED_MIN_INTERVAL', 'FEED_MAX_INTERVAL'}:
+            self.scheduler.configure(self.settings)
+        if change.settings & {'FEED_FAILURE_THRESHOLD', 'FEED_BASE_BACKOFF', 'FEED_MAX_BACKOFF'}:
+            self.health.configure(self.settings)
+        if change.settings & {'ENRICH_ARTICLES', 'ENRICH_WORKERS'}:
+            if self.enricher is not None:
+                self.enricher.close()
+            self.enricher = ArticleEnricher(self.settings) if self.settings.ENRICH_ARTICLES else None
+
+    def reload_config(self) -> bool:
+        """Reload FEEDS_FILE between cycles so no cycle sees a half-applied config"""
+        if not self._reloading.acquire(blocking=False):
+            return False
+        try:
+            try:
+                with self._cycle_lock:
+                    self._applying_config.set()
+                    applied = self.config_manager.reload()
+            finally:
+                # Cleared after the lock is released so a waiting cycle never misses it
+                self._applying_config.clear()
+            if applied:
+                self._wake()
+            return applied
+        finally:
+            self._reloading.release()
+
+    def _reload_in_background(self):
+        threading.Thread(target=self.reload_config, name='config-reload', daemon=True).start()
+
+    async def _watch_config(self):
+        """Poll FEEDS_FILE's mtime and reload when it changes"""
+        interval = self.settings.CONFIG_POLL_INTERVAL
+        if interval <= 0:
+            return
+        while True:
+            await asyncio.sleep(interval)
+            if self.config_manager.changed_on_disk():
+                self._reload_in_background()
+
+    def _maintain_archive_now(self) -> None:
+        try:
+            self.archive.maintain(self.settings.ARCHIVE_RETENTION_DAYS)
+        except Exception as e:
+            logger.error("Archive maintenance failed: %s", e)
+
+    async def _maintain_archive(self):
+        """Prune and compact the archive every ARCHIVE_MAINTENANCE_INTERVAL seconds"""
+        interval = self.settings.ARCHIVE_MAINTENANCE_INTERVAL
+        if self.archive is None or interval <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        while True:
+            # The last run is stored in the archive, so restarts don't postpone it
+            if await loop.run_in_executor(None, self.archive.maintenance_due, interval):
+                await loop.run_in_executor(None, self._maintain_archive_now)
+            await asyncio.sleep(min(interval, 3600))
+
     def run_scrapers(self):
         """Run all enabled scrapers and send updates via Telegram"""
+        if not self._cycle_lock.acquire(blocking=False):
+            if not self._applying_config.is_set():
+                logger.warning("Previous scraping cycle still running - skipping")
+                return
+            # Applying a config is quick; run this cycle on the new one
+            logger.info("Waiting for the configuration reload before starting the cycle")
+            if not self._cycle_lock.acquire(timeout=RELOAD_WAIT):
+                logger.warning("Configuration reload still running - skipping cycle")
+                return
+        try:
+            with self.profiler.cycle():
+                self._run_cycle()
+        finally:
+            self._cycle_lock.release()
+
+    def _run_cycle(self):
+        """One scraping cycle: stream every due feed through to Telegram"""
+        started = time.monotonic()
         try:
             logger.info("Starting scraping cycle...")
+            deadline = started + self.settings.CYCLE_DEADLINE
+            for scraper in self.scrapers.values():
+                self.sent_urls.setdefault(scraper.category, deque(maxlen=SENT_CACHE_SIZE))
+
+            pipeline = StreamingPipeline(
+                self.scrapers,
+                self.deduplicator,
+                self.telegram_client,
+                self.settings,
+                self.sent_urls,
+                stopping=self._stopping,
+                owns=self.coordinator.owns if self.coordinator else None,
+                ledger=self.ledger,
+                subscriptions=self.subscriptions,
+                archive=self.archive,
+                enricher=self.enricher,
+                trending=self.trending,
+            )
+            sent = pipeline.run(deadline)
+            if pipeline.accepted:
+                self._save_sent_cache()
+            logger.info("Sent %s new articles via Telegram", sum(sent.values()))
             
-            for category, scraper in self.scrapers.items():
-                try:
-                    logger.info(f"Scraping {category} news...")
-                    articles = scraper.scrape()
-                    
-                    # Filter out recently-sent articles (last 5 per category)
-                    category_name = scraper.category
-                    recent = self.sent_urls.setdefault(
-                        category_name, deque(maxlen=SENT_CACHE_SIZE)
-                    )
-                    new_articles = [
-                        a for a in articles
-                        if a.get('url') and a['url'] not in recent
-                    ]
-
-                    if new_articles:
-                        # Deduplicate / merge articles covering the same story
-                        new_articles = self.deduplicator.deduplicate(new_articles)
-                        self.telegram_client.send_news(category_name, new_articles)
-                        for a in new_articles:
-                            # For merged digests, mark all constituent URLs as sent
-                            for url in a.get('merged_urls', [a.get('url')]):
-                                if url:
-                                    recent.append(url)
-                        self._save_sent_cache()
-                        logger.info(f"Sent {len(new_articles)} new {category} articles via Telegram")
-                    else:
-                        logger.info(f"No new {category} articles to send (all match last {SENT_CACHE_SIZE} sent)")
-                
-                except Exception as e:
-                    logger.error(f"Error scraping {category}: {str(e)}")
-            
+            self.scheduler.save()
+            self.health.save()
+            self.health.log_summary()
             logger.info("Scraping cycle completed")
         
         except Exception as e:
-            logger.error(f"Unexpected error during scraping: {str(e)}")
+            logger.error("Unexpected error during scraping: %s", e)
+        finally:
+            metrics.CYCLE_SECONDS.observe(time.monotonic() - started)
     
-    def schedule_jobs(self):
-        """Schedule scraping jobs at regular intervals"""
-        interval_seconds = self.settings.SCRAPE_INTERVAL
-        interval_minutes = interval_seconds // 60
-        
-        schedule.every(interval_minutes).minutes.do(self.run_scrapers)
-        logger.info(f"Scraping scheduled every {interval_minutes} minutes")
+    def _seconds_until_next_cycle(self) -> float:
+        """Sleep until the earliest feed is due, plus a little jitter"""
+        sources = self.scrapers.all_sources()
+        longest = float(self.settings.FEED_MAX_INTERVAL)
+        if self.coordinator is not None:
+            sources = [src for src in sources if self.coordinator.owns(src)]
+            # Shards gained at the next heartbeat should be polled promptly
+            longest = min(longest, self.coordinator.heartbeat_interval)
+            if not sources:
+                return longest
+        delay = self.scheduler.next_due(sources) - time.time()
+        jitter = random.uniform(0, self.settings.SCHEDULER_JITTER)
+        return min(max(delay, 1.0), longest) + jitter
+
+    async def run_forever(self):
+        """Event-loop driven core: run a cycle whenever the next feed falls due"""
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+
+        def request_stop():
+            if not stop.is_set():
+                logger.info("Shutdown signal received")
+            self._stopping.set()
+            stop.set()
+
+        handlers = [(signal.SIGTERM, request_stop), (signal.SIGINT, request_stop)]
+        if hasattr(signal, 'SIGHUP'):
+            handlers.append((signal.SIGHUP, self._reload_in_background))
+        if hasattr(signal, 'SIGUSR1'):
+            handlers.append((signal.SIGUSR1, self.profiler.toggle))
+        for sig, handler in handlers:
+            try:
+                loop.add_signal_handler(sig, handler)
+            except (NotImplementedError, RuntimeError):
+                # Windows / non-main thread: fall back to a plain signal handler
+                signal.signal(sig, lambda *_, h=handler: loop.call_soon_threadsafe(h))
+
+        wake = asyncio.Event()
+        self._wake = lambda: loop.call_soon_threadsafe(wake.set)
+        watcher = asyncio.ensure_future(self._watch_config())
+        maintenance = asyncio.ensure_future(self._maintain_archive())
+        leases = None
+        if self.coordinator is not None:
+            await loop.run_in_executor(None, self._heartbeat)
+            leases = asyncio.ensure_future(self._keep_leases())
+        metrics_server = self._start_metrics_server()
+
+        # Jittered start so restarted instances don't all hit the feeds at once
+        delay = random.uniform(0, self.settings.SCHEDULER_JITTER)
+        stop_wait = asyncio.ensure_future(stop.wait())
+        cycle: Optional[asyncio.Future] = None
+        try:
+            while True:
+                wake_wait = asyncio.ensure_future(wake.wait())
+                await asyncio.wait({stop_wait, wake_wait}, timeout=delay,
+                                   return_when=asyncio.FIRST_COMPLETED)
+                wake_wait.cancel()
+                wake.clear()
+                if stop_wait.done():
+                    break
+
+                cycle = self._start_cycle(loop)
+                await asyncio.wait({cycle, stop_wait}, return_when=asyncio.FIRST_COMPLETED)
+                if stop_wait.done():
+                    break
+                delay = self._seconds_until_next_cycle()
+                logger.debug("Next scraping cycle in %.1fs", delay)
+        finally:
+            stop_wait.cancel()
+            watcher.cancel()
+            maintenance.cancel()
+            self._wake = lambda: None
+            if metrics_server is not None:
+                metrics_server.shutdown()
+                metrics.registry.unregister_collector(self._health_metrics)
+            if cycle is not None and not cycle.done():
+                logger.info("Waiting for the running cycle to finish its sends...")
+                try:
+                    await asyncio.wait_for(cycle, self.settings.SHUTDOWN_TIMEOUT)
+                except asyncio.TimeoutError:
+                    logger.warning("Cycle did not finish before shutdown timeout")
+            self.flush(cycle_running=cycle is not None and not cycle.done())
+            if leases is not None:
+                leases.cancel()
+                self.coordinator.release()
+
+    def _start_metrics_server(self):
+        """Serve /metrics when METRICS_PORT is set; None otherwise"""
+        if not self.settings.METRICS_PORT:
+            return None
+        try:
+            server = metrics.start_metrics_server(self.settings.METRICS_PORT, self.settings.METRICS_HOST)
+        except Exception as e:
+            logger.error("Could not start metrics server: %s", e)
+            return None
+        self._health_metrics = metrics.health_collector(self.health)
+        metrics.registry.register_collector(self._health_metrics)
+        return server
+
+    def _start_cycle(self, loop: asyncio.AbstractEventLoop) -> asyncio.Future:
+        """
+        Run one blocking cycle on a daemon thread and return a future for it.
+
+        A daemon thread (rather than the loop's default executor) means a cycle
+        stuck on a slow socket can never hold up process exit past
+        SHUTDOWN_TIMEOUT.
+        """
+        finished = loop.create_future()
+
+        def mark_done():
+            if not finished.done():
+                finished.set_result(None)
+
+        def target():
+            try:
+                self.run_scrapers()
+            finally:
+                try:
+                    loop.call_soon_threadsafe(mark_done)
+                except RuntimeError:
+                    pass  # loop already closed after a shutdown timeout
+
+        threading.Thread(target=target, name='scrape-cycle', daemon=True).start()
+        return finished
+
+    def flush(self, cycle_running: bool = False):
+        """
+        Persist caches and scheduler state (called on shutdown).
+
+        With ``cycle_running`` (a cycle outlived SHUTDOWN_TIMEOUT) the state
+        saved is whatever the cycle has recorded so far, and the archive and
+        enricher it may still be using are left open for process exit.
+        """
+        self._save_sent_cache()
+        self.scheduler.save()
+        self.health.save()
+        if cycle_running:
+            logger.info("Caches flushed; archive and enricher left to the running cycle")
+            return
+        if self.archive is not None:
+            self.archive.close()
+        if self.enricher is not None:
+            self.enricher.close()
+        logger.info("Caches flushed")
     
     def start(self):
         """Start the AutoMonitor bot"""
         try:
             logger.info("Starting AutoMonitor bot...")
-            self.schedule_jobs()
-            
-            # Run immediately on startup
-            self.run_scrapers()
-            
-            # Keep the scheduler running
-            while True:
-                schedule.run_pending()
-                time.sleep(60)
+            asyncio.run(self.run_forever())
+            logger.info("AutoMonitor bot stopped")
         
         except KeyboardInterrupt:
             logger.info("AutoMonitor bot stopped by user")
         except Exception as e:
-            logger.error(f"Critical error: {str(e)}")
+            logger.error("Critical error: %s", e)
             raise
 
 
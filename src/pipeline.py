@@ -0,0 +1,392 @@
+"""
+Streaming scrape-to-delivery pipeline.
+
+One cycle is a chain of stages connected by bounded queues and generators::
+
+    fetch + parse        seen-filter -> dedup window -> select -> format        send
+    (feed worker pool) ──[queue]──▶ (generator chain, cycle thread) ──[queue]──▶ (sender thread)
+
+- Every due feed of every category is fetched concurrently.  As soon as a
+  feed returns, its articles flow downstream - nothing waits for the slowest
+  feed of the category.
+- The dedup window buffers a category's new articles for at most
+  DEDUP_WINDOW_SECONDS (or DEDUP_WINDOW_SIZE articles) and merges stories
+  within it, so digests still form across feeds that return together.
+- Select decides which stories get a message of their own (see ranking.py).
+  Each window closes with up to MAX_SENDS_PER_CATEGORY sends left for its
+  category: RANKING=off takes its first stories, RANKING=category its best
+  scored ones, and both stream on. RANKING=global holds the stories of the
+  whole fetch stage and sends the best under MAX_SENDS_PER_CYCLE in total.
+  The rest are only marked sent.
+- Optionally (ENRICH_ARTICLES), selected stories that lack an image or a
+  real description are enriched from their pages' Open Graph tags before
+  formatting, within ENRICH_CYCLE_BUDGET seconds per cycle.
+- Both queues are bounded (PIPELINE_QUEUE_SIZE); a slow sender back-pressures
+  the fetch workers, so memory stays flat however many feeds are configured.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from src.scrapers.base_scraper import apply_commits, get_executor
+from src.utils import metrics
+from src.utils.article import ArticleRecord
+from src.utils.profiling import traced
+from src.utils.ranking import Story, StoryRanker
+
+logger = logging.getLogger(__name__)
+
+# Longest an idle stage sleeps before re-checking the dedup window and the deadline
+TICK_SECONDS = 0.5
+
+_DONE = object()
+
+
+class StreamingPipeline:
+    """Runs one scraping cycle as a set of streaming stages."""
+
+    def __init__(self, scrapers: Dict, deduplicator, telegram_client, settings,
+                 sent_urls: Dict[str, Deque[str]], stopping: Optional[threading.Event] = None,
+                 owns: Optional[Callable[[str], bool]] = None, ledger=None, subscriptions=None,
+                 archive=None, enricher=None, trending=None):
+        self.scrapers = scrapers
+        self.deduplicator = deduplicator
+        self.telegram_client = telegram_client
+        self.settings = settings
+        # Per-category deques of recently sent URLs (owned by AutoMonitor)
+        self.sent_urls = sent_urls
+        self.stopping = stopping or threading.Event()
+        # Distributed mode: which feeds this worker polls, and the shared
+        # sent history that makes each send exactly-once (see coordination.py)
+        self.owns = owns
+        self.ledger = ledger
+        # Keyword/regex subscriptions that also route articles to their channels
+        self.subscriptions = subscriptions
+        # Full-text archive every new article is written to (see archive.py)
+        self.archive = archive
+        # Fills images / descriptions from article pages (see enrichment.py)
+        self.enricher = enricher
+        self._enrich_budget = settings.ENRICH_CYCLE_BUDGET
+        # Sliding-window feature counts every new article feeds (see trending.py)
+        self.trending = trending
+        self.ranker = StoryRanker(settings, trending=trending)
+        # Ranking weight of each accepted article, from its feed's options
+        self._weights: Dict[str, float] = {}
+
+        # Per-category counts of new articles accepted / messages sent this cycle
+        self.accepted: Dict[str, int] = defaultdict(int)
+        self.sent: Dict[str, int] = defaultdict(int)
+        self.routed: Dict[str, int] = defaultdict(int)
+        self._selected: Dict[str, int] = defaultdict(int)
+        self._seen: Dict[str, set] = defaultdict(set)
+
+    def run(self, deadline: Optional[float] = None) -> Dict[str, int]:
+        """
+        Run the cycle and return the number of messages sent per category.
+
+        ``deadline`` is a ``time.monotonic()`` value; feeds that have not
+        returned by then are dropped, everything already fetched is delivered.
+        """
+        send_queue: queue.Queue = queue.Queue(maxsize=self.settings.PIPELINE_QUEUE_SIZE)
+        sender = threading.Thread(
+            target=traced(self._send_loop), args=(send_queue,), name='telegram-sender', daemon=True
+        )
+        sender.start()
+        try:
+            stream = self._format(self._select(self._dedup_window(self._filter_seen(self._fetch(deadline)))))
+            for item in stream:
+                send_queue.put(item)
+        finally:
+            send_queue.put(_DONE)
+            sender.join()
+
+        for category, accepted in self.accepted.items():
+            logger.info("%s: %s new article(s), %s sent", category, accepted, self.sent[category])
+        for subscription, routed in self.routed.items():
+            logger.info("Subscription %s: %s article(s) routed", subscription, routed)
+        if self.trending is not None and self.accepted:
+            rising = self.trending.rising(limit=5)
+            if rising:
+                logger.info("Trending: %s", ', '.join(f"{key} x{growth}" for key, _, growth in rising))
+        return dict(self.sent)
+
+    # ------------------------------------------------------------------
+    # Stage 1: fetch + parse (worker pool -> bounded queue)
+    # ------------------------------------------------------------------
+
+    def _fetch(self, deadline: Optional[float]) -> Iterator[Optional[Tuple]]:
+        """
+        Yield ``(scraper, source, articles)`` as each feed returns.
+
+        Yields ``None`` as a heartbeat while waiting so downstream stages can
+        flush time-based windows.
+        """
+        if self.stopping.is_set():
+            return
+        jobs = [(scraper, src) for scraper in self.scrapers.values() for src in scraper.due_sources()
+                if self.owns is None or self.owns(src)]
+        if not jobs:
+            logger.info("No feeds due this cycle")
+            return
+
+        results: queue.Queue = queue.Queue(maxsize=self.settings.PIPELINE_QUEUE_SIZE)
+        # Heartbeat at least as often as the dedup window can expire
+        tick = min(TICK_SECONDS, max(self.settings.DEDUP_WINDOW_SECONDS, 0.01))
+        closed = threading.Event()
+        outstanding = {src for _, src in jobs}
+
+        def work(scraper, src):
+            # Scheduler/listing state is committed only for results the cycle takes
+            commits = []
+            articles = scraper.extract_articles_from_feed(src, commits)
+            while not closed.is_set():
+                try:
+                    results.put((scraper, src, articles, commits), timeout=TICK_SECONDS)
+                    return
+                except queue.Full:
+                    continue
+
+        executor = get_executor(self.settings)
+        futures = [executor.submit(traced(work), scraper, src) for scraper, src in jobs]
+        logger.info("Fetching %s due feed(s)", len(jobs))
+        try:
+            while outstanding:
+                if self.stopping.is_set():
+                    logger.info("Shutdown requested - not waiting for remaining feeds")
+                    break
+                timeout = tick
+                if deadline is not None:
+                    timeout = min(timeout, deadline - time.monotonic())
+                    if timeout <= 0:
+                        logger.warning(
+                            "Cycle deadline reached: dropped %d outstanding feed(s): %s",
+                            len(outstanding), ', '.join(sorted(outstanding)),
+                        )
+                        # A feed that never makes the deadline backs off and trips its breaker
+                        for scraper, src in jobs:
+                            if src in outstanding:
+                                scraper.record_cutoff(src)
+                        break
+                try:
+                    item = results.get(timeout=timeout)
+                except queue.Empty:
+                    yield None
+                    continue
+                scraper, src, articles, commits = item
+                outstanding.discard(src)
+                apply_commits(commits)
+                yield scraper, src, articles
+        finally:
+            closed.set()
+            for fut in futures:
+                fut.cancel()
+
+    # ------------------------------------------------------------------
+    # Stage 2: seen-filter
+    # ------------------------------------------------------------------
+
+    def _filter_seen(self, batches: Iterator[Optional[Tuple]]) -> Iterator[Optional[Tuple[str, Dict]]]:
+        """Drop articles sent recently or already seen from another feed this cycle."""
+        limit = self.settings.MAX_ARTICLES_PER_CATEGORY
+        for item in batches:
+            if item is None:
+                yield None
+                continue
+            scraper, src, articles = item
+            category = scraper.category
+            options = getattr(scraper, 'feed_options', {}).get(src)
+            weight = options.weight if options is not None else 1.0
+            recent = self.sent_urls[category]
+            seen = self._seen[category]
+            fresh = []
+            for article in articles:
+                url = article.get('url')
+                if not url or url in recent:
+                    continue
+                # Same story from two feeds, differing only in tracking params
+                article = ArticleRecord.of(article)
+                if article.canonical_url in seen:
+                    continue
+                if self.accepted[category] + len(fresh) >= limit:
+                    break
+                seen.add(article.canonical_url)
+                fresh.append(article)
+            if fresh and self.ledger is not None:
+                # One round trip per feed; articles another worker claimed are dropped
+                won = self.ledger.claim(category, [a.url for a in fresh])
+                fresh = [a for a in fresh if a.url in won]
+            if fresh and self.archive is not None:
+                self.archive.add(category, fresh)
+            if self.trending is not None:
+                for article in fresh:
+                    self.trending.observe(article)
+            for article in fresh:
+                self.accepted[category] += 1
+                if weight != 1.0:
+                    self._weights[article.url] = weight
+                yield category, article
+
+    # ------------------------------------------------------------------
+    # Stage 3: dedup window
+    # ------------------------------------------------------------------
+
+    def _dedup_window(self, items: Iterator[Optional[Tuple[str, Dict]]]) -> Iterator[Tuple[str, List]]:
+        """Buffer each category briefly and merge articles covering the same story."""
+        max_size = self.settings.DEDUP_WINDOW_SIZE
+        max_age = self.settings.DEDUP_WINDOW_SECONDS
+        windows: Dict[str, List[Dict]] = {}
+        opened: Dict[str, float] = {}
+
+        for item in items:
+            now = time.monotonic()
+            if item is not None:
+                category, article = item
+                if category not in windows:
+                    windows[category] = []
+                    opened[category] = now
+                windows[category].append(article)
+
+            for category in [c for c, buf in windows.items()
+                             if len(buf) >= max_size or now - opened[c] >= max_age]:
+                yield category, self.deduplicator.deduplicate(windows.pop(category))
+
+        for category, buf in windows.items():
+            yield category, self.deduplicator.deduplicate(buf)
+
+    # ------------------------------------------------------------------
+    # Stage 4: select (+ enrich)
+    # ------------------------------------------------------------------
+
+    def _select(self, windows: Iterator[Tuple[str, List]]) -> Iterator[Tuple[str, ArticleRecord, bool]]:
+        """Flag the stories that get a message of their own; the rest are only marked sent."""
+        cap = self.settings.MAX_SENDS_PER_CATEGORY
+        mode = self.settings.RANKING
+        if mode == 'global':
+            # One budget for every category: the whole fetch stage is ranked at once
+            stories = [(category, article) for category, window in windows for article in window]
+            chosen = self.ranker.select(stories, cap, self.settings.MAX_SENDS_PER_CYCLE, weight=self._weight)
+            logger.info("Ranked %s stories, %s selected", len(stories), len(chosen))
+            yield from self._flag(stories, chosen)
+            return
+
+        for category, window in windows:
+            room = max(cap - self._selected[category], 0)
+            stories = [(category, article) for article in window]
+            if mode == 'category' and room:
+                # Each window is ranked as it closes, so sends keep streaming
+                chosen = self.ranker.select(stories, room, weight=self._weight)
+            else:
+                chosen = stories[:room]
+            self._selected[category] += len(chosen)
+            yield from self._flag(stories, chosen)
+
+    def _flag(self, stories: List[Story], chosen: List[Story]) -> Iterator[Tuple[str, ArticleRecord, bool]]:
+        """Enrich and yield ``chosen`` (best first), then the rest of ``stories`` unselected"""
+        self._enrich([article for _, article in chosen])
+        picked = {id(article) for _, article in chosen}
+        for category, article in chosen:
+            yield category, article, True
+        for category, article in stories:
+            if id(article) not in picked:
+                yield category, article, False
+
+    def _weight(self, article: ArticleRecord) -> float:
+        """A story's feed weight; digests take their best source's"""
+        urls = article.get('merged_urls') or [article.url]
+        return max(self._weights.get(url, 1.0) for url in urls)
+
+    def _enrich(self, stories: List[ArticleRecord]) -> None:
+        if self.enricher is None or not stories:
+            return
+        # Once the budget is spent only cached results are applied
+        timeout = max(min(self.settings.ENRICH_TIMEOUT, self._enrich_budget), 0)
+        started = time.monotonic()
+        enriched = self.enricher.enrich(stories, timeout)
+        self._enrich_budget -= time.monotonic() - started
+        if enriched:
+            logger.debug("Enriched %s of %s stories", enriched, len(stories))
+
+    # ------------------------------------------------------------------
+    # Stage 5: format
+    # ------------------------------------------------------------------
+
+    def _format(self, items: Iterator[Tuple[str, ArticleRecord, bool]]
+                ) -> Iterator[Tuple[str, int, Dict, str, Optional[str]]]:
+        """Render messages for selected stories; the others are only marked sent."""
+        for category, article, selected in items:
+            prepared = self.telegram_client.prepare_article(category, article) if selected else None
+            routes = list(self._route(category, article, prepared))
+            if prepared is None:
+                self._mark_sent(category, article)
+                if self.ledger is not None:
+                    # Not sent on purpose: settle the claim so no worker retries it
+                    self.ledger.mark_delivered(category, article.get('merged_urls', [article.url]))
+            else:
+                channel_id, text = prepared
+                yield category, channel_id, article, text, None
+            yield from routes
+
+    def _route(self, category: str, article: Dict,
+               prepared: Optional[Tuple[int, str]]) -> Iterator[Tuple[str, int, Dict, str, Optional[str]]]:
+        """Extra sends for the subscriptions ``article`` matches (one per channel)."""
+        if not self.subscriptions:
+            return
+        cap = self.settings.MAX_SENDS_PER_SUBSCRIPTION
+        channels = {prepared[0]} if prepared else set()
+        text = prepared[1] if prepared else None
+        for sub in self.subscriptions.match(article, category):
+            if sub.channel in channels or self.routed[sub.key] >= cap:
+                continue
+            if text is None:
+                rendered = self.telegram_client.prepare_article(category, article, channel_id=sub.channel)
+                if rendered is None:
+                    return
+                text = rendered[1]
+            channels.add(sub.channel)
+            self.routed[sub.key] += 1
+            yield category, sub.channel, article, text, sub.key
+
+    # ------------------------------------------------------------------
+    # Stage 6: send (sender thread)
+    # ------------------------------------------------------------------
+
+    def _send_loop(self, send_queue: queue.Queue) -> None:
+        while True:
+            item = send_queue.get()
+            if item is _DONE:
+                return
+            category, channel_id, article, text, subscription = item
+            try:
+                delivered = self.telegram_client.deliver(channel_id, category, article, text)
+            except Exception as e:
+                logger.error("Unexpected error sending %s article: %s", category, e)
+                delivered = False
+            if subscription is not None:
+                # Routed copy; the category send (or _format) remembers the URL
+                if delivered:
+                    metrics.SUBSCRIPTION_SENT.inc(subscription=subscription)
+                continue
+            if delivered:
+                self.sent[category] += 1
+                self._record_delivery(category, article)
+                if self.ledger is not None:
+                    self.ledger.mark_delivered(
+                        category, article.get('merged_urls', [article.get('url')]))
+            self._mark_sent(category, article)
+
+    @staticmethod
+    def _record_delivery(category: str, article: Dict) -> None:
+        metrics.ARTICLES_SENT.inc(category=category)
+        published = article.get('published_ts')
+        if published:
+            metrics.FRESHNESS_LAG_SECONDS.observe(max(time.time() - published, 0), category=category)
+
+    def _mark_sent(self, category: str, article: Dict) -> None:
+        """Remember every URL behind an article (all sources for merged digests)."""
+        recent = self.sent_urls[category]
+        for url in article.get('merged_urls', [article.get('url')]):
+            if url:
+                recent.append(url)
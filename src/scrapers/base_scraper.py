@@ -1,43 +1,143 @@
 """Base scraper class for all news scrapers"""
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+from typing import TYPE_CHECKING, Callable, List, Dict, Optional, Tuple
+import calendar
 import re
-import requests
-from bs4 import BeautifulSoup
+import time
 import logging
-from src.config.settings import Settings
+from src.config.settings import Settings, get_settings
+from src.scrapers.fast_feed import FeedFormatError, StreamingFeedParser
+from src.scrapers.page_listing import PageListing, parse_page
+from src.utils import metrics
+from src.utils.article import ArticleRecord
+from src.utils.feed_digest import feed_digest
+
+# requests / bs4 / feedparser are imported on first use to keep start-up fast
+if TYPE_CHECKING:
+    import requests
 
 logger = logging.getLogger(__name__)
 
+_session: Optional['requests.Session'] = None
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_session() -> 'requests.Session':
+    """Shared HTTP session so every feed poll reuses pooled keep-alive connections"""
+    global _session
+    if _session is None:
+        import requests
+        _session = requests.Session()
+    return _session
+
+
+def get_executor(settings: Settings) -> ThreadPoolExecutor:
+    """Shared worker pool used to fetch feeds concurrently"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.FEED_FETCH_WORKERS, thread_name_prefix='feed-fetch'
+        )
+    return _executor
+
+
+def apply_commits(commits: List[Callable[[], None]]) -> None:
+    """Run the state updates a poll deferred (see ``extract_articles_from_feed``)"""
+    for commit in commits:
+        commit()
+
+
+def trim_description(description: str) -> str:
+    """Trim to ~450 chars, ending on a full sentence if possible"""
+    if len(description) > 450:
+        cutoff = description.rfind('.', 200, 450)
+        description = description[:cutoff + 1] if cutoff > 0 else description[:450] + '...'
+    return description
+
 
 class BaseScraper(ABC):
     """Abstract base class for all news scrapers"""
     
-    def __init__(self, sources: List[str] = None):
-        self.settings = Settings()
+    def __init__(self, sources: List[str] = None, settings: Optional[Settings] = None):
+        self.settings = settings or get_settings()
         self.sources = sources or []
+        # Per-feed overrides (FeedConfig by URL) - see src/config/feeds.yaml
+        self.feed_options: Dict = {}
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-    
-    def fetch_page(self, url: str) -> BeautifulSoup:
-        """Fetch and parse a web page"""
-        try:
-            response = requests.get(
-                url,
-                headers=self.headers,
-                timeout=self.settings.REQUEST_TIMEOUT
+        # Optional FeedScheduler / FeedHealth (set by AutoMonitor) for per-feed
+        # polling intervals and circuit breaking
+        self.scheduler = None
+        self.health = None
+        # PageListing by URL for the feed_options with a ``page:`` block
+        self._listings: Dict[str, PageListing] = {}
+
+    def due_sources(self) -> List[str]:
+        """Sources whose next poll is due and whose circuit is not open"""
+        sources = list(self.sources)
+        if self.scheduler is not None:
+            sources = self.scheduler.due(sources)
+        if self.health is not None:
+            sources = [src for src in sources if self.health.allow(src)]
+        return sources
+
+    def fetch_feeds(self, sources: List[str],
+                    deadline: Optional[float] = None) -> List[Tuple[str, List[Dict]]]:
+        """
+        Fetch ``sources`` concurrently and return ``(source, articles)`` pairs.
+
+        ``deadline`` is a ``time.monotonic()`` value.  Feeds still outstanding
+        when it passes are dropped so the ones that did return can be sent.
+        """
+        if not sources:
+            return []
+        executor = get_executor(self.settings)
+        commits = {src: [] for src in sources}
+        futures = {src: executor.submit(self.extract_articles_from_feed, src, commits[src])
+                   for src in sources}
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        done, pending = wait(futures.values(), timeout=timeout)
+
+        if pending:
+            dropped = [src for src, fut in futures.items() if fut in pending]
+            for fut in pending:
+                fut.cancel()
+            logger.warning(
+                "Cycle deadline reached: dropped %d outstanding feed(s): %s",
+                len(dropped), ', '.join(dropped),
             )
+            for src in dropped:
+                self.record_cutoff(src)
+        results = []
+        for src, fut in futures.items():
+            if fut in done:
+                # Dropped feeds keep their old validators, so they are fetched in full next time
+                apply_commits(commits[src])
+                results.append((src, fut.result()))
+        return results
+    
+    def fetch_page(self, url: str, headers: Optional[Dict[str, str]] = None,
+                   timeout: Optional[float] = None) -> 'requests.Response':
+        """
+        GET a web page over the shared session.
+
+        ``headers`` are sent on top of the default ones (validators for a
+        conditional GET). Raises on errors; a 304 is returned as is.
+        """
+        response = get_session().get(url, headers={**self.headers, **(headers or {})},
+                                     timeout=timeout or self.settings.REQUEST_TIMEOUT)
+        if response.status_code != 304:
             response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
-        except requests.RequestException as e:
-            logger.error(f"Error fetching {url}: {str(e)}")
-            raise
+        return response
     
     def _clean_html(self, raw: str) -> str:
         """Strip HTML tags and clean up whitespace from text"""
         if not raw:
             return ''
+        from bs4 import BeautifulSoup
         text = BeautifulSoup(raw, 'html.parser').get_text(separator=' ')
         text = re.sub(r'\s+', ' ', text).strip()
         return text
@@ -70,6 +170,7 @@ class BaseScraper(ABC):
         # 5. Scan summary HTML for <img> tags
         summary_html = entry.get('summary', '') or entry.get('content', [{'value': ''}])[0].get('value', '')
         if summary_html:
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(summary_html, 'html.parser')
             img = soup.find('img')
             if img and img.get('src'):
@@ -79,45 +180,205 @@ class BaseScraper(ABC):
         
         return None
     
-    def extract_articles_from_feed(self, feed_url: str) -> List[Dict]:
-        """Extract articles with rich data from RSS/XML feed"""
-        import feedparser
+    def extract_articles_from_feed(self, feed_url: str,
+                                   commits: Optional[List[Callable[[], None]]] = None) -> List[ArticleRecord]:
+        """
+        Extract articles with rich data from RSS/XML feed.
+
+        With ``commits`` given, the poll's scheduler, listing and health
+        updates (validators, digest, next poll, seen items, success) are
+        appended there instead of applied. The caller runs them with
+        ``apply_commits`` only if it keeps the articles, so a result dropped at
+        the deadline is fetched again in full rather than answered with 304 /
+        unchanged, and its late success does not close the circuit that
+        ``record_cutoff`` counts towards.
+        """
+        started = time.monotonic()
         try:
-            feed = feedparser.parse(feed_url)
-            articles = []
+            articles = self._fetch_and_parse_feed(feed_url, commits)
+        except Exception as e:
+            latency = time.monotonic() - started
+            logger.error("Error parsing feed %s: %s", feed_url, e)
+            metrics.FEED_ERRORS.inc(feed=feed_url)
+            metrics.FEED_FETCH_SECONDS.observe(latency, feed=feed_url)
+            self._record_failure(feed_url, str(e) or type(e).__name__, latency)
+            return []
+        latency = time.monotonic() - started
+        metrics.FEED_FETCH_SECONDS.observe(latency, feed=feed_url)
+        if self.health is not None:
+            self._defer(commits, self.health.record_success, feed_url, latency)
+        return articles
+
+    def record_cutoff(self, feed_url: str) -> None:
+        """Count a feed still outstanding at the cycle deadline as a failed poll"""
+        self._record_failure(feed_url, 'cycle deadline exceeded')
+
+    def _record_failure(self, feed_url: str, error: str, latency: float = 0.0) -> None:
+        not_before = 0.0
+        if self.health is not None:
+            self.health.record_failure(feed_url, error, latency)
+            not_before = self.health.state(feed_url).open_until
+        if self.scheduler is not None:
+            # Otherwise the feed stays due and the run loop spins on it
+            self.scheduler.record_failure(feed_url, not_before)
+
+    @staticmethod
+    def _defer(commits: Optional[List[Callable[[], None]]], update: Callable, *args, **kwargs) -> None:
+        if commits is None:
+            update(*args, **kwargs)
+        else:
+            commits.append(partial(update, *args, **kwargs))
+
+    def _fetch_and_parse_feed(self, feed_url: str,
+                              commits: Optional[List[Callable[[], None]]] = None) -> List[ArticleRecord]:
+        """Conditional GET + parse of one feed; raises on any failure"""
+        options = self.feed_options.get(feed_url)
+        if options is not None and options.page is not None:
+            return self._fetch_and_parse_page(feed_url, options, commits)
+        logger.info("Fetching feed %s", feed_url)
+        headers = dict(self.headers)
+        if self.scheduler is not None:
+            headers.update(self.scheduler.conditional_headers(feed_url))
+        timeout = (options and options.timeout) or self.settings.REQUEST_TIMEOUT
+        max_articles = (options and options.max_articles) or self.settings.MAX_ARTICLES_PER_CATEGORY
+        with get_session().get(feed_url, headers=headers, timeout=timeout, stream=True) as response:
+            if response.status_code == 304:
+                logger.info("Feed not modified: %s", feed_url)
+                metrics.FEED_NOT_MODIFIED.inc(feed=feed_url)
+                if self.scheduler is not None:
+                    self._defer(commits, self.scheduler.record_not_modified, feed_url, response.headers)
+                return []
+            response.raise_for_status()
+            fast, body = self._read_feed(response, max_articles)
+        metrics.FEED_BYTES.inc(fast.bytes_read if fast else len(body), feed=feed_url)
+
+        digest = None
+        if self.scheduler is not None and self.settings.FEED_CONTENT_HASH:
+            digest = fast.hexdigest() if fast else feed_digest([body])
+            if self._unchanged(feed_url, digest, response, commits):
+                return []
+
+        if fast is not None:
+            entries, ttl = fast.entries, fast.ttl
+            metrics.FEED_PARSES.inc(parser='streaming')
+        else:
+            import feedparser
+            feed = feedparser.parse(body, response_headers=dict(response.headers))
+            if feed.bozo and not feed.entries:
+                raise ValueError(f"Malformed feed: {feed.get('bozo_exception')}")
+            entries, ttl = feed.entries, feed.feed.get('ttl')
+            metrics.FEED_PARSES.inc(parser='feedparser')
+        metrics.FEED_ENTRIES.inc(len(entries), feed=feed_url)
+        articles = []
+        
+        for entry in entries[:max_articles]:
+            # Get and clean full description (up to 500 chars)
+            raw_summary = entry.get('summary', '') or ''
+            if not raw_summary:
+                content_list = entry.get('content', [])
+                raw_summary = content_list[0].get('value', '') if content_list else ''
             
-            for entry in feed.entries[:self.settings.MAX_ARTICLES_PER_CATEGORY]:
-                # Get and clean full description (up to 500 chars)
-                raw_summary = entry.get('summary', '') or ''
-                if not raw_summary:
-                    content_list = entry.get('content', [])
-                    raw_summary = content_list[0].get('value', '') if content_list else ''
-                
-                description = self._clean_html(raw_summary)
-                # Trim to ~450 chars, ending on a full sentence if possible
-                if len(description) > 450:
-                    cutoff = description.rfind('.', 200, 450)
-                    description = description[:cutoff + 1] if cutoff > 0 else description[:450] + '...'
-                
-                article = {
-                    'title': self._clean_html(entry.get('title', '')),
-                    'url': entry.get('link', ''),
-                    'description': description,
-                    'image': self._extract_image(entry),
-                    'author': entry.get('author', '') or entry.get('author_detail', {}).get('name', ''),
-                    'published': entry.get('published', '')
-                }
-                
-                if article['title'] and article['url']:
-                    articles.append(article)
+            article = ArticleRecord(
+                title=self._clean_html(entry.get('title', '')),
+                url=entry.get('link', ''),
+                description=trim_description(self._clean_html(raw_summary)),
+                image=self._extract_image(entry),
+                author=entry.get('author', '') or entry.get('author_detail', {}).get('name', ''),
+                published=entry.get('published', ''),
+                published_ts=self._entry_timestamp(entry),
+            )
             
-            return articles
+            if article.title and article.url:
+                articles.append(article)
+
+        if self.scheduler is not None:
+            self._defer(
+                commits,
+                self.scheduler.record,
+                feed_url,
+                response.headers,
+                [self._entry_timestamp(e) for e in entries],
+                ttl_minutes=ttl,
+                digest=digest,
+            )
         
-        except Exception as e:
-            logger.error(f"Error parsing feed {feed_url}: {str(e)}")
+        return articles
+
+    def _fetch_and_parse_page(self, page_url: str, options,
+                              commits: Optional[List[Callable[[], None]]] = None) -> List[ArticleRecord]:
+        """Conditional GET of an HTML listing page; articles for its new items"""
+        logger.info("Fetching page %s", page_url)
+        listing = self._listings.get(page_url)
+        if listing is None or listing.selectors != options.page:
+            listing = self._listings[page_url] = PageListing(options.page)
+        headers = self.scheduler.conditional_headers(page_url) if self.scheduler is not None else {}
+        max_articles = options.max_articles or self.settings.MAX_ARTICLES_PER_CATEGORY
+        response = self.fetch_page(page_url, headers, options.timeout)
+        if response.status_code == 304:
+            logger.info("Page not modified: %s", page_url)
+            metrics.FEED_NOT_MODIFIED.inc(feed=page_url)
+            if self.scheduler is not None:
+                self._defer(commits, self.scheduler.record_not_modified, page_url, response.headers)
             return []
+        body = response.content
+        metrics.FEED_BYTES.inc(len(body), feed=page_url)
+
+        digest = None
+        if self.scheduler is not None and self.settings.FEED_CONTENT_HASH:
+            digest = feed_digest([body])
+            if self._unchanged(page_url, digest, response, commits):
+                return []
+
+        articles = listing.extract(parse_page(body, response.url), max_articles)
+        self._defer(commits, listing.remember, listing.extracted)
+        metrics.FEED_PARSES.inc(parser='html')
+        metrics.FEED_ENTRIES.inc(listing.items, feed=page_url)
+        for article in articles:
+            article['description'] = trim_description(article['description'])
+
+        if self.scheduler is not None:
+            # Undated items count as new now, so the page isn't backed off while it moves
+            now = time.time()
+            self._defer(commits, self.scheduler.record, page_url, response.headers,
+                        [a['published_ts'] or now for a in articles], now=now, digest=digest)
+        return articles
+
+    def _unchanged(self, url: str, digest: str, response,
+                   commits: Optional[List[Callable[[], None]]] = None) -> bool:
+        """Whether ``digest`` matches the last poll's (recorded as not modified)"""
+        if digest != self.scheduler.state(url).digest:
+            return False
+        # Same content as last poll, only volatile parts differ: nothing to do
+        logger.info("Feed unchanged: %s", url)
+        metrics.FEED_UNCHANGED.inc(feed=url)
+        self._defer(commits, self.scheduler.record_not_modified, url, response.headers)
+        return True
+
+    def _read_feed(self, response, max_articles: int) -> Tuple[Optional[StreamingFeedParser], Optional[bytes]]:
+        """
+        Stream the first ``max_articles`` entries through the lxml fast path.
+
+        Returns ``(parser, None)`` on success. For formats it doesn't handle,
+        returns ``(None, body)`` with the whole body read, for feedparser.
+        """
+        chunks = response.iter_content(chunk_size=65536)
+        if not self.settings.FEED_FAST_PARSE:
+            return None, b''.join(chunks)
+        fast = StreamingFeedParser(max_articles, self.settings.FEED_MAX_BYTES, base_url=response.url)
+        try:
+            fast.parse(chunks)
+        except FeedFormatError as e:
+            logger.debug("Falling back to feedparser for %s: %s", response.url, e)
+            return None, fast.consumed + b''.join(chunks)
+        return fast, None
+
+    @staticmethod
+    def _entry_timestamp(entry) -> float:
+        """Epoch seconds of an entry's publish (or update) time, 0 if unknown"""
+        parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+        return float(calendar.timegm(parsed)) if parsed else 0.0
     
     @abstractmethod
-    def scrape(self) -> List[Dict]:
+    def scrape(self, deadline: Optional[float] = None) -> List[Dict]:
         """Scrape news articles - to be implemented by subclasses"""
         pass
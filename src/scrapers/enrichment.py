@@ -0,0 +1,167 @@
+"""
+Open Graph enrichment of articles about to be sent.
+
+Many feeds carry no image and only a one-line summary. ``ArticleEnricher``
+fills the gaps from the article page itself, using the ``og:image`` and
+``og:description`` meta tags (``twitter:image`` and ``description`` are the
+fallbacks):
+
+- It runs only on deduplicated stories the pipeline is about to send, and
+  only on the ones missing an image or with a short description.
+- Pages are fetched concurrently on a small pool of its own
+  (ENRICH_WORKERS), over the shared keep-alive session. Each response is fed
+  to an lxml HTML pull parser as it streams in. Reading stops at ``<body>``
+  (or ENRICH_MAX_BYTES), so only the ``<head>`` is downloaded.
+- Results are cached by URL for ENRICH_CACHE_TTL seconds. That includes
+  pages with no usable tags, so they are not fetched again.
+- ``enrich`` waits at most ``timeout`` seconds. Fetches still running after
+  that keep going in the background and fill the cache for the next cycle.
+"""
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from src.config.settings import Settings
+from src.scrapers.base_scraper import get_session, trim_description
+from src.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+_SPACE = re.compile(r'\s+')
+# Meta tags read, by preference
+_IMAGE_KEYS = ('og:image', 'og:image:url', 'og:image:secure_url', 'twitter:image', 'twitter:image:src')
+_DESCRIPTION_KEYS = ('og:description', 'twitter:description', 'description')
+
+PageMeta = Tuple[Optional[str], Optional[str]]  # (image, description)
+
+
+def read_head_meta(chunks, max_bytes: int) -> Dict[str, str]:
+    """``<meta>`` property/name -> content from the ``<head>`` of a streamed HTML page."""
+    from lxml import etree
+    parser = etree.HTMLPullParser(events=('start',))
+    meta: Dict[str, str] = {}
+    read = 0
+    for chunk in chunks:
+        parser.feed(chunk)
+        read += len(chunk)
+        for _event, el in parser.read_events():
+            if el.tag == 'body':
+                return meta
+            if el.tag == 'meta':
+                key = (el.get('property') or el.get('name') or '').strip().lower()
+                content = el.get('content')
+                if key and content and key not in meta:
+                    meta[key] = content.strip()
+        if read >= max_bytes:
+            break
+    return meta
+
+
+class ArticleEnricher:
+    """Fills missing images / short descriptions from Open Graph tags, with a TTL cache."""
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._executor = ThreadPoolExecutor(max_workers=settings.ENRICH_WORKERS,
+                                            thread_name_prefix='enrich')
+        self._cache: 'OrderedDict[str, Tuple[float, PageMeta]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+
+    def wants(self, article) -> bool:
+        """Whether ``article`` lacks an image or has a short description"""
+        return bool(article.get('url')) and (
+            not article.get('image')
+            or len(article.get('description') or '') < self.settings.ENRICH_MIN_DESCRIPTION)
+
+    def enrich(self, articles: List, timeout: float) -> int:
+        """
+        Enrich ``articles`` in place, waiting at most ``timeout`` seconds.
+
+        Returns the number of articles that gained an image or description.
+        """
+        wanted = [a for a in articles if self.wants(a)]
+        if not wanted:
+            return 0
+        results: Dict[str, PageMeta] = {}
+        futures = {}
+        for article in wanted:
+            cached = self._cached(article['url'])
+            if cached is not None:
+                results[article['url']] = cached
+                metrics.ENRICHMENTS.inc(result='cached')
+            elif article['url'] not in futures:
+                futures[article['url']] = self._executor.submit(self._fetch, article['url'])
+
+        if futures and timeout > 0:
+            wait(futures.values(), timeout=timeout)
+        for url, future in futures.items():
+            if not future.done():
+                # Left running: it still fills the cache for the next cycle
+                metrics.ENRICHMENTS.inc(result='timeout')
+            elif future.exception() is not None:
+                logger.debug("Enrichment fetch failed for %s: %s", url, future.exception())
+                metrics.ENRICHMENTS.inc(result='failed')
+            else:
+                results[url] = future.result()
+                metrics.ENRICHMENTS.inc(result='fetched')
+        return sum(self._apply(article, results[article['url']])
+                   for article in wanted if article['url'] in results)
+
+    def _apply(self, article, meta: PageMeta) -> bool:
+        image, description = meta
+        changed = False
+        if image and not article.get('image'):
+            article['image'] = image
+            changed = True
+        current = article.get('description') or ''
+        if description and len(current) < self.settings.ENRICH_MIN_DESCRIPTION \
+                and len(description) > len(current):
+            article['description'] = description
+            changed = True
+        return changed
+
+    def _cached(self, url: str) -> Optional[PageMeta]:
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._cache[url]
+                return None
+            return entry[1]
+
+    def _store(self, url: str, meta: PageMeta) -> None:
+        with self._lock:
+            self._cache[url] = (time.monotonic() + self.settings.ENRICH_CACHE_TTL, meta)
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.settings.ENRICH_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def _fetch(self, url: str) -> PageMeta:
+        """Image and description from the head of ``url``; cached (raises on HTTP errors)"""
+        with get_session().get(url, headers=self._headers, stream=True,
+                               timeout=self.settings.ENRICH_TIMEOUT) as response:
+            response.raise_for_status()
+            if 'html' not in response.headers.get('Content-Type', 'text/html'):
+                meta = {}
+            else:
+                meta = read_head_meta(response.iter_content(chunk_size=8192),
+                                      self.settings.ENRICH_MAX_BYTES)
+            base = response.url
+        image = next((meta[k] for k in _IMAGE_KEYS if meta.get(k)), None)
+        description = next((meta[k] for k in _DESCRIPTION_KEYS if meta.get(k)), None)
+        result = (
+            urljoin(base, image) if image else None,
+            trim_description(_SPACE.sub(' ', description).strip()) if description else None,
+        )
+        self._store(url, result)
+        return result
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,268 @@
+"""
+Streaming RSS 2.0 / Atom 1.0 parser for the fields AutoMonitor uses.
+
+``feedparser`` reads and normalises the whole document, then the scraper
+keeps the first few entries. ``StreamingFeedParser`` feeds the response to an
+``lxml`` pull parser in fixed-size pieces as it downloads:
+
+- Each ``<item>`` / ``<entry>`` is turned into a small ``FastEntry``
+  (title, link, summary/content, author, dates, media) as soon as it closes.
+  Its element is then freed, so the tree never holds more than one entry.
+- Parsing stops after ``max_entries`` entries, or after ``max_bytes``
+  bytes, and the rest of the response is never read.
+- Relative links and enclosure URLs are resolved against ``xml:base`` or
+  the feed's own URL, as feedparser does.
+- Anything else - RSS 0.9x/1.0 (RDF), Atom 0.3, malformed XML - raises
+  ``FeedFormatError``. The caller then falls back to feedparser with the
+  bytes read so far (``consumed``) plus the rest of the response.
+
+``FastEntry`` answers the ``entry.get(...)`` / ``getattr(entry, ...)``
+lookups the scraper makes on feedparser entries, so both paths share one
+article builder.
+"""
+import email.utils
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Optional
+from urllib.parse import urljoin
+
+from src.utils.feed_digest import FeedDigest
+
+# Bytes handed to the parser at a time. Fixed, so the bytes read before an
+# early stop (and so their digest) depend on the feed, not on network chunking
+PIECE_SIZE = 16384
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+CONTENT = '{http://purl.org/rss/1.0/modules/content/}'
+DC = '{http://purl.org/dc/elements/1.1/}'
+MEDIA = '{http://search.yahoo.com/mrss/}'
+
+
+class FeedFormatError(ValueError):
+    """The document is not something the fast path handles; use feedparser."""
+
+
+class FastEntry(dict):
+    """A feed entry as a dict, with feedparser-style attribute access."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+def parse_date(text: Optional[str]) -> Optional[time.struct_time]:
+    """RFC 822 or RFC 3339 date as a UTC struct_time; other formats via feedparser."""
+    text = (text or '').strip()
+    if not text:
+        return None
+    parsed = email.utils.parsedate_tz(text)
+    if parsed is not None:
+        return time.gmtime(email.utils.mktime_tz(parsed))
+    try:
+        moment = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        from feedparser.datetimes import _parse_date
+        return _parse_date(text)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).timetuple()
+
+
+def _inner(el) -> str:
+    """Element content as a string: its text, or its markup for inline XHTML."""
+    if not len(el):
+        return el.text or ''
+    from lxml import etree
+    return (el.text or '') + ''.join(etree.tostring(child, encoding='unicode') for child in el)
+
+
+def _media(el, entry: FastEntry) -> None:
+    """media:content / media:thumbnail anywhere under ``el`` (including media:group)."""
+    content = [{'url': m.get('url'), 'medium': m.get('medium', ''), 'type': m.get('type', '')}
+               for m in el.iter(f'{MEDIA}content') if m.get('url')]
+    thumbnails = [{'url': m.get('url')} for m in el.iter(f'{MEDIA}thumbnail') if m.get('url')]
+    if content:
+        entry['media_content'] = content
+    if thumbnails:
+        entry['media_thumbnail'] = thumbnails
+
+
+def _url(el, value: Optional[str], base_url: Optional[str]) -> str:
+    """``value`` resolved against ``el``'s xml:base, else the feed URL"""
+    value = (value or '').strip()
+    base = el.base or base_url
+    return urljoin(base, value) if value and base else value
+
+
+def _add_dates(entry: FastEntry) -> FastEntry:
+    for field in ('published', 'updated'):
+        if entry.get(field):
+            entry[f'{field}_parsed'] = parse_date(entry[field])
+    return entry
+
+
+def _rss_item(el, base_url: Optional[str] = None) -> FastEntry:
+    entry = FastEntry()
+    guid = None
+    enclosures = []
+    for child in el:
+        tag = child.tag
+        if not isinstance(tag, str):
+            continue  # comments, processing instructions
+        if tag == 'title':
+            entry['title'] = _inner(child)
+        elif tag == 'link':
+            entry['link'] = _url(child, child.text, base_url)
+        elif tag == 'description':
+            entry['summary'] = _inner(child)
+        elif tag == f'{CONTENT}encoded':
+            entry['content'] = [{'value': _inner(child)}]
+        elif tag == 'pubDate':
+            entry['published'] = (child.text or '').strip()
+        elif tag == f'{DC}date':
+            entry['updated'] = (child.text or '').strip()
+        elif tag == 'author' or (tag == f'{DC}creator' and 'author' not in entry):
+            entry['author'] = (child.text or '').strip()
+        elif tag == 'guid' and child.get('isPermaLink', 'true') != 'false':
+            guid = (child.text or '').strip()
+        elif tag == 'enclosure' and child.get('url'):
+            enclosures.append({'href': _url(child, child.get('url'), base_url),
+                               'type': child.get('type', '')})
+    if not entry.get('link') and guid and guid.startswith('http'):
+        entry['link'] = guid
+    if enclosures:
+        entry['enclosures'] = enclosures
+    _media(el, entry)
+    return _add_dates(entry)
+
+
+def _atom_entry(el, base_url: Optional[str] = None) -> FastEntry:
+    entry = FastEntry()
+    links = []
+    for child in el:
+        tag = child.tag
+        if not isinstance(tag, str):
+            continue
+        if tag == f'{ATOM}title':
+            entry['title'] = _inner(child)
+        elif tag == f'{ATOM}link' and child.get('href'):
+            link = {'rel': child.get('rel', 'alternate'), 'type': child.get('type', ''),
+                    'href': _url(child, child.get('href'), base_url)}
+            links.append(link)
+            if link['rel'] == 'alternate' and 'link' not in entry:
+                entry['link'] = link['href']
+        elif tag == f'{ATOM}summary':
+            entry['summary'] = _inner(child)
+        elif tag == f'{ATOM}content':
+            entry['content'] = [{'value': _inner(child)}]
+        elif tag == f'{ATOM}published':
+            entry['published'] = (child.text or '').strip()
+        elif tag == f'{ATOM}updated':
+            entry['updated'] = (child.text or '').strip()
+        elif tag == f'{ATOM}author':
+            name = child.find(f'{ATOM}name')
+            if name is not None and name.text and 'author' not in entry:
+                entry['author'] = name.text.strip()
+    if links:
+        entry['links'] = links
+        enclosures = [link for link in links if link['rel'] == 'enclosure']
+        if enclosures:
+            entry['enclosures'] = enclosures
+    _media(el, entry)
+    return _add_dates(entry)
+
+
+def _pieces(chunks: Iterable[bytes], size: int) -> Iterator[bytes]:
+    """Re-cut ``chunks`` into ``size``-byte pieces (the last may be shorter)."""
+    buffer = b''
+    for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= size:
+            yield buffer[:size]
+            buffer = buffer[size:]
+    if buffer:
+        yield buffer
+
+
+class StreamingFeedParser:
+    """Parses the first ``max_entries`` entries of an RSS 2.0 / Atom 1.0 feed."""
+
+    def __init__(self, max_entries: int, max_bytes: int, base_url: Optional[str] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # The feed's URL, for relative links
+        self.base_url = base_url
+        self.entries: List[FastEntry] = []
+        self.ttl: Optional[str] = None
+        # Bytes downloaded (a little past the last entry kept on an early stop)
+        self.bytes_read = 0
+        # Whether parsing stopped before the end of the document
+        self.stopped_early = False
+        self._received: List[bytes] = []
+        self._digest = FeedDigest()
+        self._entry_tag: Optional[str] = None
+
+    @property
+    def consumed(self) -> bytes:
+        """Every byte read so far (for the feedparser fallback)."""
+        return b''.join(self._received)
+
+    def hexdigest(self) -> str:
+        """FeedDigest of the bytes read: the kept entries and the feed header."""
+        return self._digest.hexdigest()
+
+    def parse(self, chunks: Iterable[bytes]) -> List[FastEntry]:
+        """Read ``chunks`` until enough entries, the byte cap, or the end."""
+        from lxml import etree
+        parser = etree.XMLPullParser(events=('start', 'end'), resolve_entities=False,
+                                     no_network=True, remove_comments=True, base_url=self.base_url)
+        try:
+            for piece in _pieces(self._record(chunks), PIECE_SIZE):
+                self._digest.update(piece)
+                parser.feed(piece)
+                if self._handle(parser.read_events()) or self.bytes_read >= self.max_bytes:
+                    self.stopped_early = True
+                    return self.entries
+            parser.close()
+            self._handle(parser.read_events())
+        except etree.XMLSyntaxError as e:
+            raise FeedFormatError(f"not well-formed: {e}") from None
+        if self._entry_tag is None:
+            raise FeedFormatError("empty document")
+        return self.entries
+
+    def _record(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        for chunk in chunks:
+            self._received.append(chunk)
+            self.bytes_read += len(chunk)
+            yield chunk
+
+    def _handle(self, events) -> bool:
+        """Process parser events; True once ``max_entries`` entries are in."""
+        for event, el in events:
+            if self._entry_tag is None:
+                # The first event is the root element's start
+                if el.tag == 'rss':
+                    self._entry_tag = 'item'
+                elif el.tag == f'{ATOM}feed':
+                    self._entry_tag = f'{ATOM}entry'
+                else:
+                    raise FeedFormatError(f"unsupported root element {el.tag!r}")
+                continue
+            if event != 'end':
+                continue
+            if el.tag == self._entry_tag:
+                parse = _rss_item if el.tag == 'item' else _atom_entry
+                self.entries.append(parse(el, self.base_url))
+                # Free the entry and everything before it
+                el.clear()
+                parent = el.getparent()
+                while el.getprevious() is not None:
+                    del parent[0]
+                if len(self.entries) >= self.max_entries:
+                    return True
+            elif el.tag == 'ttl' and self.ttl is None:
+                self.ttl = (el.text or '').strip() or None
+        return False
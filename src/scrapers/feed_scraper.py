@@ -0,0 +1,34 @@
+"""Generic RSS/Atom scraper driven by a feeds.yaml category"""
+from typing import TYPE_CHECKING, List, Dict, Optional
+from src.scrapers.base_scraper import BaseScraper
+import logging
+
+if TYPE_CHECKING:
+    from src.config.feeds import CategoryConfig
+
+logger = logging.getLogger(__name__)
+
+
+class FeedScraper(BaseScraper):
+    """Scraper for any category declared in feeds.yaml"""
+    
+    def __init__(self, config: 'CategoryConfig', settings=None):
+        super().__init__(sources=config.sources, settings=settings)
+        self.config = config
+        self.category = config.name
+        self.feed_options = {feed.url: feed for feed in config.feeds}
+    
+    def scrape(self, deadline: Optional[float] = None) -> List[Dict]:
+        """Scrape every due feed of the category"""
+        all_articles = []
+        sources = self.due_sources()
+        logger.info("Scraping %s news from %s feed(s)", self.category, len(sources))
+        
+        for source, articles in self.fetch_feeds(sources, deadline):
+            all_articles.extend(articles)
+        
+        # Remove duplicates and limit results
+        unique_articles = {article['url']: article 
+                          for article in all_articles}.values()
+        
+        return list(unique_articles)[:self.settings.MAX_ARTICLES_PER_CATEGORY]
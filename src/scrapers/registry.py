@@ -0,0 +1,64 @@
+"""Lazily-instantiated scraper registry built from feeds.yaml"""
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Dict, Iterator, List
+import logging
+from src.scrapers.feed_scraper import FeedScraper
+
+if TYPE_CHECKING:
+    from src.config.feeds import CategoryConfig
+
+logger = logging.getLogger(__name__)
+
+
+class ScraperRegistry(Mapping):
+    """
+    Read-only mapping of category key -> FeedScraper.
+
+    Only enabled categories are listed, and each scraper is built on first
+    access, so start-up cost does not grow with the number of categories.
+    """
+
+    def __init__(self, categories: Dict[str, 'CategoryConfig'], settings,
+                 scheduler=None, health=None):
+        self.settings = settings
+        self.scheduler = scheduler
+        self.health = health
+        self._configs = {key: cfg for key, cfg in categories.items() if cfg.enabled}
+        self._scrapers: Dict[str, FeedScraper] = {}
+
+    def __getitem__(self, key: str) -> FeedScraper:
+        scraper = self._scrapers.get(key)
+        if scraper is None:
+            config = self._configs[key]
+            scraper = FeedScraper(config, self.settings)
+            scraper.scheduler = self.scheduler
+            scraper.health = self.health
+            self._scrapers[key] = scraper
+            logger.debug("%s scraper loaded (%s feeds)", config.name, len(config.sources))
+        return scraper
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._configs)
+
+    def __len__(self) -> int:
+        return len(self._configs)
+
+    def update(self, categories: Dict[str, 'CategoryConfig']) -> None:
+        """
+        Swap in a new set of categories.
+
+        Scrapers whose category config is unchanged are kept as they are;
+        changed ones are dropped and rebuilt lazily on next access.
+        """
+        configs = {key: cfg for key, cfg in categories.items() if cfg.enabled}
+        for key in list(self._scrapers):
+            if configs.get(key) != self._configs.get(key):
+                del self._scrapers[key]
+        self._configs = configs
+
+    def config(self, key: str) -> 'CategoryConfig':
+        return self._configs[key]
+
+    def all_sources(self) -> List[str]:
+        """Every enabled feed URL, without instantiating any scraper."""
+        return [src for cfg in self._configs.values() for src in cfg.sources]
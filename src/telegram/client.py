@@ -1,8 +1,10 @@
 """Telegram bot client"""
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import logging
-import requests
+import threading
+import time
 from src.config.settings import Settings
+from src.utils import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -13,63 +15,87 @@ class TelegramClient:
     def __init__(self, settings: Settings):
         self.settings = settings
         self.bot_token = settings.TELEGRAM_BOT_TOKEN
-        self.api_url = f"https://api.telegram.org/bot{self.bot_token}"
+        self.api_url = f"{settings.TELEGRAM_API_BASE.rstrip('/')}/bot{self.bot_token}"
+        self._session = None
         
+        # Verify the token in the background so start-up (and the first feed
+        # fetch) doesn't wait on the getMe round trip; senders wait for it.
+        self._ready = threading.Event()
+        threading.Thread(target=self._verify_token, name='telegram-getme', daemon=True).start()
+
+    def _verify_token(self):
+        """Test the bot token with getMe; clears bot_token if it is unusable"""
         try:
-            # Test the bot token
-            response = requests.get(f"{self.api_url}/getMe", timeout=5)
+            response = self._get_session().get(f"{self.api_url}/getMe", timeout=5)
             if response.status_code == 200:
                 logger.info("Telegram bot initialized successfully")
             else:
-                logger.error(f"Failed to connect to Telegram: {response.text}")
+                logger.error("Failed to connect to Telegram: %s", response.text)
                 self.bot_token = None
         except Exception as e:
-            logger.error(f"Failed to initialize Telegram bot: {str(e)}")
+            logger.error("Failed to initialize Telegram bot: %s", e)
             self.bot_token = None
-    
-    # Category emojis and labels
-    CATEGORY_META = {
-        'Technology':           {'emoji': '💻', 'label': 'Tech'},
-        'Science':              {'emoji': '🔬', 'label': 'Science'},
-        'AI & Machine Learning':{'emoji': '🧠', 'label': 'AI'},
-        'Military & Defense':   {'emoji': '🪖', 'label': 'Military'},
-    }
+        finally:
+            self._ready.set()
 
+    def _bot_ready(self) -> bool:
+        """Wait for the start-up token check, then report whether we can send"""
+        self._ready.wait(timeout=10)
+        return bool(self.bot_token)
+    
     def send_news(self, category: str, articles: List[Dict]):
         """Send news articles to the appropriate Telegram channel"""
-        if not self.bot_token:
+        if not self._bot_ready():
             logger.warning("Telegram bot not initialized. Skipping message send.")
             return
         
         if not articles:
-            logger.info(f"No articles to send for category: {category}")
+            logger.info("No articles to send for category: %s", category)
             return
         
         channel_id = self.settings.TELEGRAM_CHANNELS.get(category)
         if not channel_id:
-            logger.warning(f"No channel configured for category: {category}")
+            logger.warning("No channel configured for category: %s", category)
             return
         
         # Send each article as its own rich message
-        for article in articles[:5]:
-            try:
-                image_url = article.get('image')
-                if image_url:
-                    self._send_photo(channel_id, image_url, self._format_article(category, article))
-                else:
-                    self._send_message(channel_id, self._format_article(category, article))
-            except Exception as e:
-                # Fallback: send without image if photo fails
-                try:
-                    self._send_message(channel_id, self._format_article(category, article))
-                except Exception as e2:
-                    logger.error(f"Failed to send article to {category} channel: {str(e2)}")
+        for article in articles[:self.settings.MAX_SENDS_PER_CATEGORY]:
+            self.deliver(channel_id, category, article, self._format_article(category, article))
         
-        logger.info(f"Attempted to send {len(articles)} articles to {category} channel ({channel_id})")
+        logger.info("Attempted to send %s articles to %s channel (%s)", len(articles), category, channel_id)
+
+    def prepare_article(self, category: str, article: Dict,
+                        channel_id: Optional[int] = None) -> Optional[Tuple[int, str]]:
+        """Resolve the channel (the category's unless given) and render the message, or None if it can't be sent"""
+        if not self._bot_ready():
+            return None
+        channel_id = channel_id or self.settings.TELEGRAM_CHANNELS.get(category)
+        if not channel_id:
+            return None
+        with metrics.FORMAT_SECONDS.time():
+            text = self._format_article(category, article)
+        return channel_id, text
+
+    def deliver(self, channel_id: int, category: str, article: Dict, text: str) -> bool:
+        """Send one rendered article, falling back to text-only if the photo fails"""
+        try:
+            image_url = article.get('image')
+            if image_url:
+                try:
+                    self._send_photo(channel_id, image_url, text)
+                    return True
+                except Exception:
+                    pass  # Fallback: send without image if photo fails
+            self._send_message(channel_id, text)
+            return True
+        except Exception as e2:
+            logger.error("Failed to send article to %s channel: %s", category, e2)
+            return False
     
     def _format_article(self, category: str, article: Dict) -> str:
         """Format a single article (or merged digest) as a rich Telegram message."""
-        meta = self.CATEGORY_META.get(category, {'emoji': '📰', 'label': category})
+        # Category emojis and labels (declared per category in feeds.yaml)
+        meta = self.settings.CATEGORY_META.get(category, {'emoji': '📰', 'label': category})
         emoji = meta['emoji']
 
         is_digest = article.get('source_count', 1) > 1
@@ -122,22 +148,76 @@ class TelegramClient:
             return ''
         return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
     
+    def _get_session(self):
+        """Keep-alive session so consecutive sends reuse one connection"""
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    @staticmethod
+    def _retry_after(response) -> Optional[float]:
+        """Seconds Telegram asked us to wait (parameters.retry_after or Retry-After)"""
+        try:
+            return float(response.json()['parameters']['retry_after'])
+        except (ValueError, KeyError, TypeError):
+            pass
+        try:
+            return float(response.headers.get('Retry-After', ''))
+        except ValueError:
+            return None
+
+    def _post(self, method: str, data: Dict, timeout: float):
+        """
+        Call a Bot API method, recording latency and rate-limit responses.
+
+        429s are retried after the requested ``retry_after`` (up to
+        TELEGRAM_MAX_RETRY_AFTER) and 5xx responses with exponential backoff,
+        at most TELEGRAM_MAX_RETRIES times.
+        """
+        import requests
+        attempts = max(int(self.settings.TELEGRAM_MAX_RETRIES), 0) + 1
+        for attempt in range(attempts):
+            started = time.perf_counter()
+            try:
+                response = self._get_session().post(f"{self.api_url}/{method}", json=data, timeout=timeout)
+            except requests.RequestException:
+                metrics.TELEGRAM_ERRORS.inc(method=method)
+                raise
+            finally:
+                metrics.TELEGRAM_SEND_SECONDS.observe(time.perf_counter() - started, method=method)
+            if response.ok:
+                return response.json()
+
+            wait = None
+            if response.status_code == 429:
+                metrics.TELEGRAM_RATE_LIMITED.inc(method=method)
+                wait = self._retry_after(response)
+                if wait is None or wait > self.settings.TELEGRAM_MAX_RETRY_AFTER:
+                    wait = None
+            elif response.status_code >= 500:
+                wait = 0.5 * (2 ** attempt)
+            metrics.TELEGRAM_ERRORS.inc(method=method)
+            if wait is None or attempt == attempts - 1:
+                break
+            logger.warning("Telegram %s returned %s; retrying in %.1fs",
+                           method, response.status_code, wait)
+            time.sleep(wait)
+        response.raise_for_status()
+        return response.json()
+
     def _send_message(self, chat_id: int, text: str):
         """Send text message to Telegram channel via HTTP API"""
-        url = f"{self.api_url}/sendMessage"
         data = {
             "chat_id": chat_id,
             "text": text,
             "parse_mode": "HTML",
             "disable_web_page_preview": False
         }
-        response = requests.post(url, json=data, timeout=10)
-        response.raise_for_status()
-        return response.json()
+        return self._post("sendMessage", data, timeout=10)
     
     def _send_photo(self, chat_id: int, photo_url: str, caption: str):
         """Send a photo with caption to Telegram channel"""
-        url = f"{self.api_url}/sendPhoto"
         # Telegram captions are limited to 1024 chars
         if len(caption) > 1024:
             caption = caption[:1020] + '...'
@@ -147,19 +227,17 @@ class TelegramClient:
             "caption": caption,
             "parse_mode": "HTML"
         }
-        response = requests.post(url, json=data, timeout=15)
-        response.raise_for_status()
-        return response.json()
+        return self._post("sendPhoto", data, timeout=15)
     
     def send_status(self, status: str):
         """Send status message to all channels"""
-        if not self.bot_token:
+        if not self._bot_ready():
             logger.warning("Telegram bot not initialized. Skipping status message.")
             return
         
         for category, channel_id in self.settings.TELEGRAM_CHANNELS.items():
             try:
                 self._send_message(channel_id, status)
-                logger.info(f"Status sent to {category} channel ({channel_id})")
+                logger.info("Status sent to %s channel (%s)", category, channel_id)
             except Exception as e:
-                logger.error(f"Failed to send status to {category} channel: {str(e)}")
+                logger.error("Failed to send status to %s channel: %s", category, e)
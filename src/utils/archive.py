@@ -0,0 +1,305 @@
+"""
+Full-text searchable archive of every scraped article.
+
+Each new article a cycle sees is appended to a SQLite file (ARCHIVE_PATH)
+with one ``INSERT OR IGNORE`` per feed batch. An FTS5 index over title and
+description is kept in sync by triggers. Searches are ranked by BM25, with
+title hits weighted above description hits.
+
+The archive is its own SQLite file rather than a table behind DATABASE_URL.
+FTS5 is SQLite-only, and a local file keeps lookups off the network.
+
+- Prefix indexes for 3 and 4 characters keep ``word*`` queries fast.
+- Row ids grow with archive time. A recency filter (``since``) becomes a
+  rowid lower bound, which FTS5 applies inside the index. Searching "the
+  last week" of a multi-million-row archive only ranks that week's matches.
+- ``prune()`` deletes rows older than ARCHIVE_RETENTION_DAYS in small
+  batches. ``compact()`` merges the FTS5 segments, returns the freed pages
+  to the filesystem (incremental auto-vacuum) and truncates the WAL. The
+  bot runs both every ARCHIVE_MAINTENANCE_INTERVAL seconds.
+
+Command line::
+
+    python -m src.utils.archive search "rust compiler" --days 30 --category Technology
+    python -m src.utils.archive stats | prune --days 90 | compact
+"""
+import argparse
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.utils import metrics
+from src.utils.article import hostname
+
+logger = logging.getLogger(__name__)
+
+# Rows deleted per statement while pruning, so writers are never blocked for long
+PRUNE_BATCH = 5000
+# BM25 column weights: (title, description)
+RANK_WEIGHTS = (10.0, 1.0)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    category TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    source TEXT,
+    published_ts REAL,
+    archived_ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_archived_ts ON articles(archived_ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, description,
+    content='articles', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='3 4'
+);
+CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, title, description)
+    VALUES (new.id, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+END;
+CREATE TABLE IF NOT EXISTS archive_meta (key TEXT PRIMARY KEY, value REAL);
+INSERT INTO articles_fts(articles_fts, rank) VALUES ('rank', 'bm25({RANK_WEIGHTS[0]}, {RANK_WEIGHTS[1]})');
+"""
+
+_TOKEN = re.compile(r'\w+\*?', re.UNICODE)
+
+
+def match_expression(query: str) -> str:
+    """
+    Plain words to an FTS5 query: every word must occur, ``word*`` is a prefix.
+
+    Punctuation (which FTS5 would otherwise parse as syntax) is dropped.
+    """
+    terms = []
+    for token in _TOKEN.findall(query):
+        prefix = token.endswith('*')
+        terms.append(f'"{token.rstrip("*")}"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+
+class ArticleArchive:
+    """One SQLite archive file; safe to share between threads."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open (and on first use create) the archive; called with the lock held."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            # Must precede the first table; lets compact() hand pages back
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def add(self, category: str, articles: Iterable, now: Optional[float] = None) -> int:
+        """Archive ``articles`` in one transaction; returns how many were new."""
+        now = time.time() if now is None else now
+        rows = [
+            (a['url'], category, a.get('title') or '', a.get('description') or '',
+             hostname(a['url']), a.get('published_ts'), now)
+            for a in articles if a.get('url')
+        ]
+        if not rows:
+            return 0
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute('BEGIN')
+                    added = conn.executemany(
+                        'INSERT OR IGNORE INTO articles '
+                        '(url, category, title, description, source, published_ts, archived_ts) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?)', rows).rowcount
+        except sqlite3.Error as e:
+            logger.warning("Could not archive %s articles: %s", category, e)
+            return 0
+        if added:
+            metrics.ARTICLES_ARCHIVED.inc(added, category=category)
+        return added
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def search(self, query: str, since: Optional[float] = None, category: Optional[str] = None,
+               limit: int = 20, raw: bool = False) -> List[Dict]:
+        """
+        Best BM25 matches for ``query``, newest-first among equal scores.
+
+        ``since`` (epoch seconds) keeps articles published - or, without a
+        publish date, archived - at or after it. ``raw`` passes ``query``
+        to FTS5 unchanged (phrases, OR, NEAR, column filters).
+        """
+        expression = query if raw else match_expression(query)
+        if not expression:
+            return []
+        sql = ['SELECT a.url, a.category, a.title, a.description, a.source, a.published_ts,',
+               '       a.archived_ts, articles_fts.rank AS score',
+               'FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid',
+               'WHERE articles_fts MATCH ?']
+        params: list = [expression]
+        with self._lock:
+            conn = self._connect()
+            if since is not None:
+                # Nothing published after ``since`` was archived before it
+                first = conn.execute('SELECT id FROM articles WHERE archived_ts >= ? '
+                                     'ORDER BY archived_ts LIMIT 1', (since,)).fetchone()
+                if first is None:
+                    return []
+                sql.append('AND articles_fts.rowid >= ? AND coalesce(a.published_ts, a.archived_ts) >= ?')
+                params += [first['id'], since]
+            if category:
+                sql.append('AND a.category = ?')
+                params.append(category)
+            sql.append('ORDER BY articles_fts.rank, a.id DESC LIMIT ?')
+            params.append(limit)
+            return [dict(row) for row in conn.execute('\n'.join(sql), params)]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute('SELECT count(*) AS articles, min(archived_ts) AS oldest, '
+                               'max(archived_ts) AS newest FROM articles').fetchone()
+            pages = conn.execute('PRAGMA page_count').fetchone()[0]
+            free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        return {**dict(row), 'bytes': pages * page_size, 'free_bytes': free * page_size}
+
+    # ------------------------------------------------------------------
+    # Retention and compaction
+    # ------------------------------------------------------------------
+
+    def prune(self, older_than_days: float, now: Optional[float] = None) -> int:
+        """Delete articles archived more than ``older_than_days`` ago."""
+        cutoff = (time.time() if now is None else now) - older_than_days * 86400
+        removed = 0
+        while True:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute('BEGIN')
+                    deleted = conn.execute(
+                        'DELETE FROM articles WHERE id IN '
+                        '(SELECT id FROM articles WHERE archived_ts < ? ORDER BY archived_ts LIMIT ?)',
+                        (cutoff, PRUNE_BATCH)).rowcount
+            removed += deleted
+            if deleted < PRUNE_BATCH:
+                return removed
+
+    def compact(self) -> None:
+        """Merge FTS5 segments, release free pages and truncate the WAL."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('optimize')")
+            conn.execute('PRAGMA incremental_vacuum').fetchall()  # frees a page per step
+            conn.execute('PRAGMA optimize')
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def maintenance_due(self, interval: float, now: Optional[float] = None) -> bool:
+        """Whether prune/compact last ran more than ``interval`` seconds ago."""
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value FROM archive_meta WHERE key = 'maintained_at'").fetchone()
+        return row is None or now - row['value'] >= interval
+
+    def maintain(self, retention_days: float) -> int:
+        """Retention then compaction; returns the number of articles pruned."""
+        started = time.monotonic()
+        pruned = self.prune(retention_days) if retention_days > 0 else 0
+        self.compact()
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO archive_meta (key, value) VALUES ('maintained_at', ?)",
+                (time.time(),))
+        logger.info("Archive maintenance: %s article(s) pruned, compacted in %.1fs",
+                    pruned, time.monotonic() - started)
+        return pruned
+
+
+def _format_ts(ts: Optional[float]) -> str:
+    return time.strftime('%Y-%m-%d %H:%M', time.localtime(ts)) if ts else '-'
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from src.config.settings import get_settings
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description='Search and maintain the article archive')
+    parser.add_argument('--path', default=settings.ARCHIVE_PATH, help='archive file (default: ARCHIVE_PATH)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    search = commands.add_parser('search', help='full-text search, best matches first')
+    search.add_argument('query')
+    search.add_argument('--days', type=float, help='only articles from the last N days')
+    search.add_argument('--category')
+    search.add_argument('--limit', type=int, default=20)
+    search.add_argument('--raw', action='store_true', help='pass the query to FTS5 unchanged')
+    search.add_argument('--json', action='store_true', help='one JSON object per line')
+    commands.add_parser('stats', help='row count, date range and file size')
+    prune = commands.add_parser('prune', help='delete old articles')
+    prune.add_argument('--days', type=float, default=settings.ARCHIVE_RETENTION_DAYS)
+    commands.add_parser('compact', help='merge the index and release free space')
+    args = parser.parse_args(argv)
+
+    if not args.path:
+        parser.error('no archive: set ARCHIVE_PATH or pass --path')
+    archive = ArticleArchive(args.path)
+    if args.command == 'search':
+        since = time.time() - args.days * 86400 if args.days else None
+        started = time.perf_counter()
+        hits = archive.search(args.query, since=since, category=args.category,
+                              limit=args.limit, raw=args.raw)
+        elapsed = (time.perf_counter() - started) * 1000
+        for hit in hits:
+            if args.json:
+                print(json.dumps(hit, ensure_ascii=False))
+            else:
+                print(f"{_format_ts(hit['published_ts'] or hit['archived_ts'])}  "
+                      f"[{hit['category']}] {hit['title']}\n    {hit['url']}")
+        if not args.json:
+            print(f"{len(hits)} result(s) in {elapsed:.1f} ms")
+    elif args.command == 'stats':
+        stats = archive.stats()
+        print(f"{stats['articles']} article(s), {_format_ts(stats['oldest'])} .. "
+              f"{_format_ts(stats['newest'])}, {stats['bytes'] / 2 ** 20:.1f} MiB "
+              f"({stats['free_bytes'] / 2 ** 20:.1f} MiB free)")
+    elif args.command == 'prune':
+        print(f"{archive.prune(args.days)} article(s) pruned")
+    else:
+        archive.compact()
+        print("Archive compacted")
+    archive.close()
+
+
+if __name__ == '__main__':
+    main()
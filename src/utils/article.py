@@ -0,0 +1,161 @@
+"""
+Compact article records.
+
+Articles pass from the scrapers through the pipeline, dedup and the Telegram
+formatter. ``ArticleRecord`` keeps their fields in ``__slots__``, so there is
+no per-instance dict. Hostnames are interned, so the thousands of articles
+from one outlet share a single string. The keys that dedup and the seen-filter
+compare on (normalized title, host, canonical URL) are computed on first use
+and cached.
+
+The record implements the read-only ``Mapping`` protocol, plus item assignment
+for its own fields. Code written against the old article dicts keeps working
+unchanged, e.g. ``article['title']`` or ``article.get('merged_urls', ...)``.
+(Not to be confused with ``src.utils.db.Article``, the ORM row.)
+"""
+import sys
+from collections.abc import Mapping
+from typing import Any, Iterator, List, Optional, Sequence
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+FIELDS = ('title', 'url', 'description', 'image', 'author', 'published', 'published_ts',
+          'merged_urls', 'source_count')
+_FIELD_SET = frozenset(FIELDS)
+
+# Query parameters that only track the click, never select the page
+_TRACKING_PREFIXES = ('utm_',)
+_TRACKING_PARAMS = frozenset({'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'cmpid', 'ref', 'ref_src'})
+
+
+def hostname(url: str) -> str:
+    """Interned hostname without ``www.``, e.g. 'arstechnica.com' ('' if unparseable)."""
+    try:
+        host = urlsplit(url).netloc.lower().strip()
+    except ValueError:
+        return ''
+    if host.startswith('www.'):
+        host = host[4:]
+    return sys.intern(host)
+
+
+def canonical_url(url: str) -> str:
+    """``url`` with tracking parameters, the fragment and a trailing slash removed."""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(_TRACKING_PREFIXES) and k.lower() not in _TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+
+class ArticleRecord(Mapping):
+    """One scraped article (or a merged digest of several)"""
+
+    __slots__ = FIELDS + ('_host', '_normalized_title', '_canonical_url')
+
+    def __init__(self, title: str = '', url: str = '', description: str = '',
+                 image: Optional[str] = None, author: str = '', published: str = '',
+                 published_ts: float = 0.0, merged_urls: Optional[List[str]] = None,
+                 source_count: int = 1):
+        self.title = title
+        self.url = url
+        self.description = description
+        self.image = image
+        self.author = author
+        self.published = published
+        self.published_ts = published_ts
+        # Only digests carry merged_urls; single articles leave the key out
+        self.merged_urls = merged_urls
+        self.source_count = source_count
+        self._host = self._normalized_title = self._canonical_url = None
+
+    @classmethod
+    def of(cls, article) -> 'ArticleRecord':
+        """``article`` as a record; dicts are converted (keys other than FIELDS are dropped)."""
+        if isinstance(article, cls):
+            return article
+        return cls(**{k: v for k, v in article.items() if k in _FIELD_SET})
+
+    @classmethod
+    def digest(cls, members: Sequence['ArticleRecord']) -> 'ArticleRecord':
+        """Merge articles covering the same story into one digest record."""
+        primary = members[0]  # use first article as the base
+        # Collect unique hostnames as source attribution
+        sources: List[str] = []
+        urls: List[str] = []
+        for m in members:
+            if m.url:
+                urls.append(m.url)
+                host = m.host
+                if host and host not in sources:
+                    sources.append(host)
+        return cls(
+            # Keep primary title (usually the freshest / most informative)
+            title=primary.title,
+            url=primary.url,
+            # Use the longest description as the body
+            description=max((m.description or '' for m in members), key=len),
+            image=primary.image,
+            # Source list instead of the author, so the reader knows it's a
+            # digest and which outlets covered it
+            author=', '.join(sources) if sources else primary.author,
+            published=primary.published,
+            published_ts=primary.published_ts,
+            merged_urls=urls,
+            source_count=len(members),
+        )
+
+    # -- derived keys (computed once) ------------------------------------
+
+    @property
+    def host(self) -> str:
+        if self._host is None:
+            self._host = hostname(self.url) if self.url else ''
+        return self._host
+
+    @property
+    def normalized_title(self) -> str:
+        """Lower-cased, stripped title; what fuzzy dedup compares."""
+        if self._normalized_title is None:
+            self._normalized_title = (self.title or '').lower().strip()
+        return self._normalized_title
+
+    @property
+    def canonical_url(self) -> str:
+        if self._canonical_url is None:
+            self._canonical_url = canonical_url(self.url) if self.url else ''
+        return self._canonical_url
+
+    # -- dict compatibility ------------------------------------------------
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            if value is not None or key != 'merged_urls':
+                return value
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        setattr(self, key, value)
+        if key == 'title':
+            self._normalized_title = None
+        elif key == 'url':
+            self._host = self._canonical_url = None
+
+    def __iter__(self) -> Iterator[str]:
+        return (k for k in FIELDS if k != 'merged_urls' or self.merged_urls is not None)
+
+    def __len__(self) -> int:
+        return len(FIELDS) - (self.merged_urls is None)
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f'ArticleRecord(title={self.title!r}, url={self.url!r}, source_count={self.source_count})'
@@ -0,0 +1,223 @@
+"""
+Distributed worker coordination through the database.
+
+In worker mode (``python run.py --worker``) several processes can run side by
+side, on one host or on many. They share one DATABASE_URL and split the
+feeds between them:
+
+- Every feed URL hashes to one of SHARD_COUNT shards (crc32, so all
+  processes agree). Each worker claims shards through ``feed_leases`` rows
+  that expire after LEASE_TTL seconds, and only polls the feeds of shards it
+  holds.
+- ``ShardCoordinator.heartbeat()`` runs every LEASE_TTL / 3 seconds. It
+  renews the worker's leases and records the worker as alive. A worker takes
+  free or expired shards until it holds its fair share,
+  ceil(SHARD_COUNT / live workers). Above that share it gives shards back,
+  so a new worker picks them up. A crashed worker's shards expire and are
+  taken over within one TTL.
+- ``SentLedger`` makes every send exactly-once across workers. Before an
+  article is accepted, its ``(category, url)`` is inserted into
+  ``sent_history`` with ON CONFLICT DO NOTHING. Only the worker whose insert
+  won sends it, even if a lease changed hands mid-cycle or two shards carry
+  the same story. After delivery the row is marked ``delivered`` (so is a
+  story the cycle chose not to send).
+- A claim still undelivered after SENT_CLAIM_TTL seconds is stale: its
+  worker died or failed to send. The next worker to see the article takes
+  the row over and sends it, so a crash between claim and send delays an
+  article instead of losing it.
+- Rows are kept for SENT_HISTORY_DAYS after their claim (``prune``), longer
+  than any feed keeps listing an article.
+
+Claims are plain conditional INSERT/UPDATE statements, so SQLite (one host)
+and PostgreSQL (many hosts) both work.
+"""
+import logging
+import math
+import random
+import socket
+import threading
+import time
+import zlib
+from typing import Iterable, List, Set
+
+import sqlalchemy as sa
+
+from src.utils.db import Base, FeedLease, SentArticle, WorkerHeartbeat, insert_ignore
+
+logger = logging.getLogger(__name__)
+
+# Heartbeats after which a silent worker's row is deleted altogether
+STALE_WORKER_TTLS = 10
+
+# Seconds between sent-history prunes
+SENT_PRUNE_INTERVAL = 3600
+
+
+def default_worker_id() -> str:
+    # Stable across restarts, so the worker keeps its state files; workers
+    # sharing a host need a WORKER_ID each
+    return socket.gethostname()
+
+
+def shard_of(url: str, shard_count: int) -> int:
+    """Stable shard number of a feed URL (the same in every process)."""
+    return zlib.crc32(url.encode('utf-8')) % shard_count
+
+
+class ShardCoordinator:
+    """Holds this worker's feed-shard leases and keeps them renewed."""
+
+    def __init__(self, engine, settings, worker_id: str = None):
+        self.engine = engine
+        self.worker_id = worker_id or settings.WORKER_ID or default_worker_id()
+        self.shard_count = settings.SHARD_COUNT
+        self.ttl = float(settings.LEASE_TTL)
+        self.owned: Set[int] = set()
+        self._lock = threading.Lock()
+        Base.metadata.create_all(engine, tables=[FeedLease.__table__, WorkerHeartbeat.__table__])
+
+    @property
+    def heartbeat_interval(self) -> float:
+        return self.ttl / 3
+
+    def owns(self, url: str) -> bool:
+        """Whether this worker should poll ``url`` (per the last heartbeat)."""
+        return shard_of(url, self.shard_count) in self.owned
+
+    def heartbeat(self, now: float = None) -> Set[int]:
+        """Renew, rebalance and claim leases; returns the shards now held."""
+        with self._lock:
+            now = time.time() if now is None else now
+            expires = now + self.ttl
+            leases = FeedLease.__table__
+            workers = WorkerHeartbeat.__table__
+            with self.engine.begin() as conn:
+                conn.execute(insert_ignore(self.engine, WorkerHeartbeat).values(
+                    worker_id=self.worker_id, heartbeat_at=now))
+                conn.execute(workers.update().where(workers.c.worker_id == self.worker_id)
+                             .values(heartbeat_at=now))
+                conn.execute(workers.delete().where(
+                    workers.c.heartbeat_at < now - STALE_WORKER_TTLS * self.ttl))
+                live = conn.execute(sa.select(sa.func.count()).select_from(workers)
+                                    .where(workers.c.heartbeat_at >= now - self.ttl)).scalar()
+
+                conn.execute(leases.update().where(leases.c.owner == self.worker_id)
+                             .values(expires_at=expires))
+                rows = conn.execute(sa.select(leases.c.shard, leases.c.owner, leases.c.expires_at)).all()
+                owned = sorted(r.shard for r in rows if r.owner == self.worker_id)
+                share = math.ceil(self.shard_count / max(live, 1))
+
+                if len(owned) > share:
+                    surplus = owned[share:]
+                    conn.execute(leases.delete().where(leases.c.owner == self.worker_id)
+                                 .where(leases.c.shard.in_(surplus)))
+                    owned = owned[:share]
+                else:
+                    held = {r.shard for r in rows if r.expires_at >= now}
+                    free = [s for s in range(self.shard_count) if s not in held]
+                    random.shuffle(free)  # spread concurrent claimers over different shards
+                    for shard in free:
+                        if len(owned) >= share:
+                            break
+                        if self._claim(conn, shard, now, expires):
+                            owned.append(shard)
+
+            gained = set(owned) - self.owned
+            lost = self.owned - set(owned)
+            if gained or lost:
+                logger.info("Worker %s holds %d/%d shard(s) (%d live worker(s); +%d -%d)",
+                            self.worker_id, len(owned), self.shard_count, live, len(gained), len(lost))
+            self.owned = set(owned)
+            return set(self.owned)
+
+    def _claim(self, conn, shard: int, now: float, expires: float) -> bool:
+        """Take ``shard`` if nobody holds it or its lease has expired."""
+        leases = FeedLease.__table__
+        inserted = conn.execute(insert_ignore(self.engine, FeedLease).values(
+            shard=shard, owner=self.worker_id, expires_at=expires))
+        if inserted.rowcount == 1:
+            return True
+        taken = conn.execute(leases.update()
+                             .where(leases.c.shard == shard)
+                             .where(leases.c.expires_at < now)
+                             .values(owner=self.worker_id, expires_at=expires))
+        return taken.rowcount == 1
+
+    def release(self) -> None:
+        """Give up every lease (clean shutdown) so other workers take over at once."""
+        with self._lock:
+            leases = FeedLease.__table__
+            workers = WorkerHeartbeat.__table__
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(leases.delete().where(leases.c.owner == self.worker_id))
+                    conn.execute(workers.delete().where(workers.c.worker_id == self.worker_id))
+            except Exception as e:
+                logger.warning("Could not release leases: %s", e)
+            self.owned = set()
+
+
+class SentLedger:
+    """Shared sent history: the first worker to claim a (category, url) sends it."""
+
+    def __init__(self, engine, worker_id: str, claim_ttl: float = 600):
+        self.engine = engine
+        self.worker_id = worker_id
+        self.claim_ttl = claim_ttl
+        self._pruned_at = 0.0
+        Base.metadata.create_all(engine, tables=[SentArticle.__table__])
+
+    def claim(self, category: str, urls: Iterable[str], now: float = None) -> Set[str]:
+        """Claim ``urls`` (new or stale); returns the ones this worker won."""
+        urls = list(dict.fromkeys(u for u in urls if u))
+        if not urls:
+            return set()
+        now = time.time() if now is None else now
+        rows: List[dict] = [
+            {'category': category, 'url': url, 'worker_id': self.worker_id,
+             'claimed_at': now, 'delivered': False}
+            for url in urls
+        ]
+        stmt = insert_ignore(self.engine, SentArticle).values(rows).returning(SentArticle.url)
+        with self.engine.begin() as conn:
+            won = set(conn.execute(stmt).scalars())
+            taken = [url for url in urls if url not in won]
+            if taken and self.claim_ttl > 0:
+                # Take over claims whose worker never delivered them
+                table = SentArticle.__table__
+                stale = (table.update()
+                         .where(table.c.category == category)
+                         .where(table.c.url.in_(taken))
+                         .where(table.c.delivered.is_(False))
+                         .where(table.c.claimed_at < now - self.claim_ttl)
+                         .values(worker_id=self.worker_id, claimed_at=now)
+                         .returning(table.c.url))
+                won.update(conn.execute(stale).scalars())
+        return won
+
+    def prune(self, retention_days: float, now: float = None) -> int:
+        """Delete rows claimed more than ``retention_days`` ago, at most every SENT_PRUNE_INTERVAL"""
+        now = time.time() if now is None else now
+        if retention_days <= 0 or now - self._pruned_at < SENT_PRUNE_INTERVAL:
+            return 0
+        self._pruned_at = now
+        table = SentArticle.__table__
+        with self.engine.begin() as conn:
+            deleted = conn.execute(table.delete().where(
+                table.c.claimed_at < now - retention_days * 86400)).rowcount
+        if deleted:
+            logger.info("Pruned %d sent-history row(s)", deleted)
+        return deleted
+
+    def mark_delivered(self, category: str, urls: Iterable[str]) -> None:
+        """Settle this worker's claims on ``urls``: sent, or deliberately not sent"""
+        table = SentArticle.__table__
+        urls = [u for u in urls if u]
+        if not urls:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(table.update()
+                         .where(table.c.category == category)
+                         .where(table.c.url.in_(urls))
+                         .where(table.c.worker_id == self.worker_id)
+                         .values(delivered=True))
@@ -1,7 +1,10 @@
 """Database utilities"""
 import sqlalchemy as sa
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
 from sqlalchemy.orm import sessionmaker, declarative_base
-from src.config.settings import Settings
+from src.config.settings import get_settings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,19 +15,33 @@ Base = declarative_base()
 class DatabaseManager:
     """Database connection and session management"""
     
-    def __init__(self):
-        self.settings = Settings()
+    def __init__(self, database_url: str = None):
+        self.settings = get_settings()
+        self.database_url = database_url or self.settings.DATABASE_URL
         self.engine = None
         self.SessionLocal = None
         self._initialize()
     
+    def _engine_options(self) -> Dict:
+        """Pool settings for server databases; SQLite keeps SQLAlchemy's per-file pool"""
+        options = {'echo': self.settings.DB_ECHO}
+        if sa.engine.make_url(self.database_url).get_backend_name() != 'sqlite':
+            options.update(
+                pool_size=self.settings.DB_POOL_SIZE,
+                max_overflow=self.settings.DB_MAX_OVERFLOW,
+                pool_timeout=self.settings.DB_POOL_TIMEOUT,
+                pool_recycle=self.settings.DB_POOL_RECYCLE,
+                # Drop connections the server closed (restarts, idle timeouts) before use
+                pool_pre_ping=True,
+            )
+        return options
+
     def _initialize(self):
         """Initialize database engine and session"""
         try:
-            self.engine = sa.create_engine(
-                self.settings.DATABASE_URL,
-                echo=self.settings.DEBUG
-            )
+            self.engine = sa.create_engine(self.database_url, **self._engine_options())
+            if self.engine.dialect.name == 'sqlite':
+                sa.event.listen(self.engine, 'connect', _sqlite_pragmas)
             self.SessionLocal = sessionmaker(bind=self.engine)
             logger.info("Database initialized successfully")
         except Exception as e:
@@ -42,6 +59,82 @@ class DatabaseManager:
         """Get a new database session"""
         return self.SessionLocal()
 
+    def bulk_insert(self, model, rows: Iterable[Dict]) -> int:
+        """Insert ``rows`` into ``model``'s table, skipping conflicts; returns the number inserted"""
+        return bulk_insert_ignore(self.engine, model, rows, self.settings.DB_BATCH_SIZE)
+
+    def upsert_articles(self, category: str, articles: Iterable) -> int:
+        """Store scraped articles; URLs already in the table are left untouched"""
+        return self.bulk_insert(Article, article_rows(category, articles))
+
+
+def _sqlite_pragmas(dbapi_connection, _record) -> None:
+    """WAL lets readers run during bulk writes; wait instead of failing on a locked file"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode = WAL')
+    cursor.execute('PRAGMA synchronous = NORMAL')
+    cursor.execute('PRAGMA busy_timeout = 5000')
+    cursor.close()
+
+
+def insert_ignore(engine, model):
+    """``INSERT ... ON CONFLICT DO NOTHING`` for ``model`` on SQLite or PostgreSQL"""
+    if engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif engine.dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"No ON CONFLICT support for {engine.dialect.name}")
+    return insert(model).on_conflict_do_nothing()
+
+
+def _batches(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def bulk_insert_ignore(engine, model, rows: Iterable[Dict], batch_size: int = 1000) -> int:
+    """
+    Insert ``rows`` in one transaction, ``batch_size`` rows per statement.
+
+    Conflicting rows are skipped. SQLAlchemy sends each batch as multi-row
+    ``VALUES`` statements. ``RETURNING`` the primary key gives an exact count
+    of new rows, which ``rowcount`` doesn't on every driver.
+    """
+    key = model.__table__.primary_key.columns.values()[0]
+    stmt = insert_ignore(engine, model).returning(key)
+    inserted = 0
+    with engine.begin() as conn:
+        for batch in _batches(rows, batch_size):
+            inserted += len(conn.execute(stmt, batch).all())
+    return inserted
+
+
+def article_rows(category: str, articles: Iterable) -> Iterator[Dict]:
+    """``Article`` rows for scraped articles (dicts or ArticleRecords); one per URL"""
+    url_limit = Article.url.type.length
+    title_limit = Article.title.type.length
+    seen = set()
+    for article in articles:
+        url = article.get('url')
+        if not url or url in seen or len(url) > url_limit:
+            continue
+        seen.add(url)
+        published = article.get('published_ts')
+        yield {
+            'title': (article.get('title') or '')[:title_limit],
+            'url': url,
+            'category': category,
+            'description': article.get('description') or '',
+            'published_date': (datetime.fromtimestamp(published, timezone.utc).replace(tzinfo=None)
+                               if published else None),
+            'sent': False,
+        }
+
 
 # Models
 class Article(Base):
@@ -56,3 +149,33 @@ class Article(Base):
     published_date = sa.Column(sa.DateTime)
     scraped_date = sa.Column(sa.DateTime, default=sa.func.now())
     sent = sa.Column(sa.Boolean, default=False)
+
+
+class FeedLease(Base):
+    """Time-limited claim of one feed shard by a worker (distributed mode)"""
+    __tablename__ = "feed_leases"
+
+    shard = sa.Column(sa.Integer, primary_key=True, autoincrement=False)
+    owner = sa.Column(sa.String(128), nullable=False)
+    expires_at = sa.Column(sa.Float, nullable=False)
+
+
+class WorkerHeartbeat(Base):
+    """Last heartbeat of each worker; live workers share the shards evenly"""
+    __tablename__ = "workers"
+
+    worker_id = sa.Column(sa.String(128), primary_key=True)
+    heartbeat_at = sa.Column(sa.Float, nullable=False)
+
+
+class SentArticle(Base):
+    """Sent history shared by all workers; the unique key makes each send a one-time claim"""
+    __tablename__ = "sent_history"
+    __table_args__ = (sa.UniqueConstraint('category', 'url', name='uq_sent_history_category_url'),)
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    category = sa.Column(sa.String(100), nullable=False)
+    url = sa.Column(sa.String(1024), nullable=False)
+    worker_id = sa.Column(sa.String(128), nullable=False)
+    claimed_at = sa.Column(sa.Float, nullable=False, index=True)
+    delivered = sa.Column(sa.Boolean, nullable=False, default=False)
@@ -10,22 +10,35 @@ Strategy
    purely local fuzzy-title similarity check using difflib.
 
 In both cases, articles within the same group are merged into a single
-"digest" dict so only one Telegram message is sent per story.
+digest ``ArticleRecord`` so only one Telegram message is sent per story.
 """
 
 import json
 import logging
+import time
 from difflib import SequenceMatcher
 from typing import List, Dict, Optional
-from urllib.parse import urlparse
+
+from src.utils import metrics
+from src.utils.article import ArticleRecord
 
 logger = logging.getLogger(__name__)
 
-# Optional LLM dependency — only required when ENABLE_LLM_DEDUP=true
-try:
-    from openai import OpenAI
-except ImportError:
-    OpenAI = None  # type: ignore
+# Optional LLM dependency — only required when ENABLE_LLM_DEDUP=true.
+# Imported on first use (see _openai_class) so start-up doesn't pay for it.
+OpenAI = None  # type: ignore
+
+
+def _openai_class():
+    """Return the OpenAI client class, importing it lazily (None if not installed)."""
+    global OpenAI
+    if OpenAI is None:
+        try:
+            from openai import OpenAI as _OpenAI
+        except ImportError:
+            return None
+        OpenAI = _OpenAI
+    return OpenAI
 
 
 def _title_similarity(a: str, b: str) -> float:
@@ -33,18 +46,10 @@ def _title_similarity(a: str, b: str) -> float:
     return SequenceMatcher(None, a.lower().strip(), b.lower().strip()).ratio()
 
 
-def _hostname(url: str) -> str:
-    """Return a clean hostname from a URL, e.g. 'arstechnica.com'."""
-    try:
-        return urlparse(url).netloc.replace("www.", "").strip()
-    except Exception:
-        return ""
-
-
 class ArticleDeduplicator:
     """
     Groups semantically similar articles and merges each group into a
-    single 'digest' article dict before messages are sent to Telegram.
+    single digest article before messages are sent to Telegram.
     """
 
     def __init__(self, settings):
@@ -52,19 +57,20 @@ class ArticleDeduplicator:
         self._openai_client = None
 
         if getattr(settings, "ENABLE_LLM_DEDUP", False) and getattr(settings, "OPENAI_API_KEY", ""):
-            if OpenAI is None:
+            client_cls = _openai_class()
+            if client_cls is None:
                 logger.warning(
                     "openai package not installed – falling back to fuzzy dedup. "
                     "Run: pip install openai"
                 )
             else:
                 try:
-                    self._openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+                    self._openai_client = client_cls(api_key=settings.OPENAI_API_KEY)
                     logger.info(
                         f"LLM deduplicator ready (model: {settings.LLM_DEDUP_MODEL})"
                     )
                 except Exception as e:
-                    logger.warning(f"Failed to init OpenAI client: {e}")
+                    logger.warning("Failed to init OpenAI client: %s", e)
         else:
             logger.info("LLM dedup disabled or no API key – using fuzzy title dedup")
 
@@ -72,23 +78,32 @@ class ArticleDeduplicator:
     # Public API
     # ------------------------------------------------------------------
 
-    def deduplicate(self, articles: List[Dict]) -> List[Dict]:
+    def deduplicate(self, articles: List[Dict]) -> List[ArticleRecord]:
         """
         Return a deduplicated list.  Articles covering the same story are
-        merged into one digest entry with combined metadata.
+        merged into one digest entry with combined metadata.  Plain dicts
+        are accepted and come back as ``ArticleRecord``s.
         """
+        metrics.DEDUP_ARTICLES_IN.inc(len(articles))
+        articles = [ArticleRecord.of(a) for a in articles]
         if len(articles) <= 1:
+            metrics.DEDUP_ARTICLES_OUT.inc(len(articles))
             return articles
 
+        started = time.perf_counter()
         if self._openai_client:
-            return self._llm_deduplicate(articles)
-        return self._fuzzy_deduplicate(articles)
+            result = self._llm_deduplicate(articles)
+        else:
+            result = self._fuzzy_deduplicate(articles)
+        metrics.DEDUP_SECONDS.observe(time.perf_counter() - started)
+        metrics.DEDUP_ARTICLES_OUT.inc(len(result))
+        return result
 
     # ------------------------------------------------------------------
     # LLM path
     # ------------------------------------------------------------------
 
-    def _llm_deduplicate(self, articles: List[Dict]) -> List[Dict]:
+    def _llm_deduplicate(self, articles: List[ArticleRecord]) -> List[ArticleRecord]:
         """Ask the LLM to group articles that cover the same event/story."""
         items = [
             {
@@ -134,24 +149,26 @@ class ArticleDeduplicator:
                 raise ValueError("LLM returned incomplete grouping")
 
             logger.info(
-                f"LLM grouped {len(articles)} articles → {len(groups)} digest(s)"
+                "LLM grouped %d articles → %d digest(s)", len(articles), len(groups)
             )
             return self._merge_groups(articles, groups)
 
         except Exception as exc:
-            logger.warning(f"LLM dedup failed ({exc}); falling back to fuzzy dedup")
+            logger.warning("LLM dedup failed (%s); falling back to fuzzy dedup", exc)
             return self._fuzzy_deduplicate(articles)
 
     # ------------------------------------------------------------------
     # Fuzzy fallback path
     # ------------------------------------------------------------------
 
-    def _fuzzy_deduplicate(self, articles: List[Dict]) -> List[Dict]:
+    def _fuzzy_deduplicate(self, articles: List[ArticleRecord]) -> List[ArticleRecord]:
         """
         Group articles whose titles are above DEDUP_SIMILARITY_THRESHOLD
         using a greedy single-linkage approach.
         """
         threshold: float = getattr(self.settings, "DEDUP_SIMILARITY_THRESHOLD", 0.6)
+        # Normalized once per record rather than once per comparison
+        titles = [a.normalized_title for a in articles]
         used = [False] * len(articles)
         groups: List[List[int]] = []
 
@@ -162,10 +179,7 @@ class ArticleDeduplicator:
             used[i] = True
             for j in range(i + 1, len(articles)):
                 if not used[j]:
-                    sim = _title_similarity(
-                        articles[i].get("title", ""),
-                        articles[j].get("title", ""),
-                    )
+                    sim = SequenceMatcher(None, titles[i], titles[j]).ratio()
                     if sim >= threshold:
                         group.append(j)
                         used[j] = True
@@ -174,8 +188,8 @@ class ArticleDeduplicator:
         duplicates_found = sum(1 for g in groups if len(g) > 1)
         if duplicates_found:
             logger.info(
-                f"Fuzzy dedup: {len(articles)} articles → "
-                f"{len(groups)} digest(s) ({duplicates_found} merge(s))"
+                "Fuzzy dedup: %d articles → %d digest(s) (%d merge(s))",
+                len(articles), len(groups), duplicates_found,
             )
         return self._merge_groups(articles, groups)
 
@@ -184,50 +198,16 @@ class ArticleDeduplicator:
     # ------------------------------------------------------------------
 
     def _merge_groups(
-        self, articles: List[Dict], groups: List[List[int]]
-    ) -> List[Dict]:
+        self, articles: List[ArticleRecord], groups: List[List[int]]
+    ) -> List[ArticleRecord]:
         """
         For singleton groups return the article unchanged.
-        For multi-article groups return a single merged 'digest' dict.
+        For multi-article groups return a single merged digest record.
         """
-        result: List[Dict] = []
-
+        result: List[ArticleRecord] = []
         for group in groups:
             if len(group) == 1:
                 result.append(articles[group[0]])
-                continue
-
-            members = [articles[i] for i in group]
-            primary = members[0]  # use first article as the base
-
-            # Collect unique hostnames as source attribution
-            sources = []
-            all_urls = []
-            for m in members:
-                url = m.get("url", "")
-                if url:
-                    all_urls.append(url)
-                    host = _hostname(url)
-                    if host and host not in sources:
-                        sources.append(host)
-
-            # Use the longest description as the body
-            best_desc = max(
-                (m.get("description") or "" for m in members), key=len
-            )
-
-            merged: Dict = {
-                **primary,
-                # Keep primary title (usually the freshest / most informative)
-                "title": primary.get("title", ""),
-                "description": best_desc,
-                # Overwrite author with source list so the reader knows it's
-                # a digest and which outlets covered it
-                "author": ", ".join(sources) if sources else primary.get("author", ""),
-                # Extra fields consumed by TelegramClient._format_article
-                "merged_urls": all_urls,
-                "source_count": len(members),
-            }
-            result.append(merged)
-
+            else:
+                result.append(ArticleRecord.digest([articles[i] for i in group]))
         return result
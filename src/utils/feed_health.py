@@ -0,0 +1,162 @@
+"""
+Per-feed health tracking with exponential backoff and circuit breaking.
+
+Each feed has a small circuit breaker:
+
+- **closed**    - healthy, polled normally.
+- **open**      - failed FEED_FAILURE_THRESHOLD times in a row; skipped until
+                  its backoff expires.  The backoff doubles with every further
+                  failure, up to FEED_MAX_BACKOFF.
+- **half-open** - backoff expired; the next poll is a probe.  Success closes
+                  the circuit, failure re-opens it with a longer backoff.
+
+State is persisted to ``data/feed_health.json`` so a restart does not make
+every dead feed burn a full REQUEST_TIMEOUT again.
+
+Fetch workers record outcomes while the metrics thread reads snapshots, so
+the table is guarded by a lock.
+"""
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+HEALTH_FILE = Path(__file__).parent.parent.parent / 'data' / 'feed_health.json'
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+@dataclass
+class FeedHealthState:
+    """Health counters for a single feed URL"""
+    consecutive_failures: int = 0
+    total_failures: int = 0
+    total_successes: int = 0
+    open_until: float = 0.0
+    last_error: str = ''
+    last_latency: float = 0.0
+
+
+class FeedHealth:
+    """Circuit breakers for every feed, keyed by URL."""
+
+    def __init__(self, settings, state_file: Path = HEALTH_FILE):
+        self.configure(settings)
+        self.state_file = state_file
+        self.feeds: Dict[str, FeedHealthState] = self._load()
+        # Reentrant: status() looks up state() while snapshot() holds it
+        self._lock = threading.RLock()
+
+    def configure(self, settings) -> None:
+        """(Re)read the breaker thresholds; per-feed state is kept."""
+        self.threshold = max(int(settings.FEED_FAILURE_THRESHOLD), 1)
+        self.base_backoff = float(settings.FEED_BASE_BACKOFF)
+        self.max_backoff = float(settings.FEED_MAX_BACKOFF)
+
+    def state(self, url: str) -> FeedHealthState:
+        st = self.feeds.get(url)
+        if st is None:
+            with self._lock:
+                st = self.feeds.setdefault(url, FeedHealthState())
+        return st
+
+    def status(self, url: str, now: Optional[float] = None) -> str:
+        """Circuit state of ``url``: closed, open or half-open."""
+        now = time.time() if now is None else now
+        st = self.state(url)
+        if st.consecutive_failures < self.threshold:
+            return CLOSED
+        return OPEN if st.open_until > now else HALF_OPEN
+
+    def allow(self, url: str, now: Optional[float] = None) -> bool:
+        """True if ``url`` may be polled now (closed circuit or a half-open probe)."""
+        return self.status(url, now) != OPEN
+
+    def record_success(self, url: str, latency: float = 0.0) -> None:
+        with self._lock:
+            st = self.state(url)
+            if st.consecutive_failures >= self.threshold:
+                logger.info("Feed recovered after %s failures: %s", st.consecutive_failures, url)
+            st.consecutive_failures = 0
+            st.total_successes += 1
+            st.open_until = 0.0
+            st.last_error = ''
+            st.last_latency = latency
+
+    def record_failure(self, url: str, error: str, latency: float = 0.0,
+                       now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            st = self.state(url)
+            st.consecutive_failures += 1
+            st.total_failures += 1
+            st.last_error = error[:200]
+            st.last_latency = latency
+
+            if st.consecutive_failures >= self.threshold:
+                exponent = st.consecutive_failures - self.threshold
+                backoff = min(self.base_backoff * (2 ** exponent), self.max_backoff)
+                st.open_until = now + backoff
+                logger.warning(
+                    "Circuit open for %s after %d failures (%s); next probe in %.0fs",
+                    url, st.consecutive_failures, st.last_error, backoff,
+                )
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Dict]:
+        """Per-feed health view for logs and metrics."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return {
+                url: {**asdict(st), 'status': self.status(url, now)}
+                for url, st in self.feeds.items()
+            }
+
+    def log_summary(self) -> None:
+        now = time.time()
+        with self._lock:
+            statuses = {url: self.status(url, now) for url in self.feeds}
+        counts = list(statuses.values())
+        logger.info(
+            "Feed health: %d closed, %d open, %d half-open",
+            counts.count(CLOSED), counts.count(OPEN), counts.count(HALF_OPEN),
+        )
+        for url, status in statuses.items():
+            if status != CLOSED:
+                st = self.feeds[url]
+                logger.info("  %s: %s (%s failures: %s)", status, url, st.consecutive_failures, st.last_error)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self) -> Dict[str, FeedHealthState]:
+        feeds: Dict[str, FeedHealthState] = {}
+        try:
+            if self.state_file.exists():
+                raw = json.loads(self.state_file.read_text(encoding='utf-8'))
+                for url, data in raw.items():
+                    feeds[url] = FeedHealthState(**data)
+                logger.info("Loaded health state for %s feeds", len(feeds))
+        except Exception as e:
+            logger.warning("Could not load feed health: %s", e)
+        return feeds
+
+    def save(self) -> None:
+        """Persist health state so open circuits survive restarts."""
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                data = {url: asdict(st) for url, st in self.feeds.items()}
+            # Written aside and renamed, so a crash never leaves half a file
+            tmp = self.state_file.with_suffix('.tmp')
+            tmp.write_text(json.dumps(data, indent=2), encoding='utf-8')
+            tmp.replace(self.state_file)
+        except Exception as e:
+            logger.warning("Could not save feed health: %s", e)
@@ -0,0 +1,255 @@
+"""
+Adaptive per-feed polling scheduler.
+
+Every feed gets its own polling interval instead of sharing the global
+SCRAPE_INTERVAL.  The interval is derived from:
+
+1. The feed's observed publish cadence (median gap between the publish
+   timestamps of its entries, smoothed across polls).
+2. HTTP cache hints - ``Cache-Control: max-age``, ``Expires`` and the RSS
+   ``<ttl>`` element.  We never poll before the server says content can
+   change.
+3. Backoff when a poll yields nothing new (including ``304 Not Modified``).
+
+The result is always clamped to [FEED_MIN_INTERVAL, FEED_MAX_INTERVAL].
+ETag / Last-Modified validators are kept per feed so polls can be sent as
+conditional requests, together with a digest of the last body for servers
+that send no validators.
+"""
+import json
+import logging
+import re
+import statistics
+import time
+from dataclasses import dataclass, asdict
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_FILE = Path(__file__).parent.parent.parent / 'data' / 'feed_schedule.json'
+
+# Poll roughly twice per expected update so new items wait at most half a cadence.
+POLL_FACTOR = 0.5
+# Multiplier applied to the interval when a poll brings nothing new.
+IDLE_BACKOFF = 1.5
+# Weight of the newest cadence observation in the moving average.
+CADENCE_ALPHA = 0.3
+
+_MAX_AGE_RE = re.compile(r'max-age\s*=\s*(\d+)', re.IGNORECASE)
+
+
+@dataclass
+class FeedState:
+    """Polling state kept for a single feed URL"""
+    interval: float
+    next_due: float = 0.0
+    cadence: Optional[float] = None
+    last_entry_ts: float = 0.0
+    etag: Optional[str] = None
+    modified: Optional[str] = None
+    polls: int = 0
+    # Normalised body hash of the last parsed response (see feed_digest.py)
+    digest: Optional[str] = None
+
+
+def cache_hint_seconds(headers: Mapping[str, str], ttl_minutes=None,
+                       now: Optional[float] = None) -> Optional[float]:
+    """Return how long the server says the response stays fresh, if it says so."""
+    now = time.time() if now is None else now
+    hints: List[float] = []
+
+    cache_control = headers.get('cache-control') or headers.get('Cache-Control') or ''
+    if 'no-cache' not in cache_control.lower():
+        match = _MAX_AGE_RE.search(cache_control)
+        if match:
+            hints.append(float(match.group(1)))
+
+    expires = headers.get('expires') or headers.get('Expires')
+    if expires and not hints:
+        try:
+            hints.append(parsedate_to_datetime(expires).timestamp() - now)
+        except (TypeError, ValueError, IndexError):
+            pass
+
+    if ttl_minutes:
+        try:
+            hints.append(float(ttl_minutes) * 60)
+        except (TypeError, ValueError):
+            pass
+
+    hints = [h for h in hints if h > 0]
+    return max(hints) if hints else None
+
+
+def estimate_cadence(timestamps: Iterable[float]) -> Optional[float]:
+    """Median gap in seconds between consecutive entry publish times."""
+    ordered = sorted({ts for ts in timestamps if ts})
+    if len(ordered) < 2:
+        return None
+    gaps = [b - a for a, b in zip(ordered, ordered[1:]) if b > a]
+    return statistics.median(gaps) if gaps else None
+
+
+class FeedScheduler:
+    """Tracks per-feed polling intervals and decides which feeds are due."""
+
+    def __init__(self, settings, state_file: Path = SCHEDULE_FILE):
+        self.configure(settings)
+        self.state_file = state_file
+        self.feeds: Dict[str, FeedState] = self._load()
+
+    def configure(self, settings) -> None:
+        """(Re)read the interval bounds; learned per-feed state is kept."""
+        self.min_interval = float(settings.FEED_MIN_INTERVAL)
+        self.max_interval = float(max(settings.FEED_MAX_INTERVAL, settings.FEED_MIN_INTERVAL))
+        self.default_interval = self._clamp(float(settings.SCRAPE_INTERVAL))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def state(self, url: str) -> FeedState:
+        """Return the state for ``url``, creating a fresh (immediately due) one."""
+        st = self.feeds.get(url)
+        if st is None:
+            st = self.feeds[url] = FeedState(interval=self.default_interval)
+        return st
+
+    def is_due(self, url: str, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return self.state(url).next_due <= now
+
+    def due(self, urls: Iterable[str], now: Optional[float] = None) -> List[str]:
+        """Filter ``urls`` down to the feeds whose next poll time has passed."""
+        now = time.time() if now is None else now
+        return [u for u in urls if self.is_due(u, now)]
+
+    def next_due(self, urls: Optional[Iterable[str]] = None) -> float:
+        """Earliest next poll time (epoch seconds) across ``urls`` or all feeds."""
+        keys = list(urls) if urls is not None else list(self.feeds)
+        if not keys:
+            return time.time()
+        return min(self.state(u).next_due for u in keys)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Request headers that turn the next poll into a conditional GET."""
+        st = self.state(url)
+        headers = {}
+        if st.etag:
+            headers['If-None-Match'] = st.etag
+        if st.modified:
+            headers['If-Modified-Since'] = st.modified
+        return headers
+
+    # ------------------------------------------------------------------
+    # Observations
+    # ------------------------------------------------------------------
+
+    def record(self, url: str, headers: Mapping[str, str], entry_timestamps: Iterable[float],
+               ttl_minutes=None, now: Optional[float] = None, digest: Optional[str] = None) -> float:
+        """
+        Record a successful (200) poll and schedule the next one.
+
+        A poll has new activity when an entry is newer than any seen before
+        or, for feeds whose entries carry no dates, when ``digest`` differs
+        from the last one.
+
+        Returns the new interval in seconds.
+        """
+        now = time.time() if now is None else now
+        st = self.state(url)
+        st.polls += 1
+        st.etag = headers.get('etag') or headers.get('ETag') or st.etag
+        st.modified = headers.get('last-modified') or headers.get('Last-Modified') or st.modified
+        changed = digest is not None and digest != st.digest
+        st.digest = digest or st.digest
+
+        timestamps = [ts for ts in entry_timestamps if ts]
+        newest = max(timestamps) if timestamps else 0.0
+        # Feeds without dates: a body that changed is the only sign of activity
+        has_new = newest > st.last_entry_ts if timestamps else changed
+
+        observed = estimate_cadence(timestamps)
+        if observed:
+            st.cadence = observed if st.cadence is None else (
+                CADENCE_ALPHA * observed + (1 - CADENCE_ALPHA) * st.cadence
+            )
+
+        if st.cadence and has_new:
+            interval = st.cadence * POLL_FACTOR
+        elif has_new:
+            interval = st.interval
+        else:
+            interval = st.interval * IDLE_BACKOFF
+
+        hint = cache_hint_seconds(headers, ttl_minutes, now)
+        if hint:
+            interval = max(interval, hint)
+
+        if newest:
+            st.last_entry_ts = max(st.last_entry_ts, newest)
+        return self._schedule(url, st, interval, now)
+
+    def record_not_modified(self, url: str, headers: Mapping[str, str] = None,
+                            now: Optional[float] = None) -> float:
+        """Record a ``304 Not Modified`` poll - nothing changed, so back off."""
+        now = time.time() if now is None else now
+        st = self.state(url)
+        st.polls += 1
+        interval = st.interval * IDLE_BACKOFF
+        hint = cache_hint_seconds(headers or {}, None, now)
+        if hint:
+            interval = max(interval, hint)
+        return self._schedule(url, st, interval, now)
+
+    def record_failure(self, url: str, not_before: float = 0.0, now: Optional[float] = None) -> float:
+        """
+        Record a failed poll: retry after FEED_MIN_INTERVAL, or at ``not_before``
+        (an open circuit's ``open_until``) if that is later.
+
+        The learned interval is kept. Returns the next poll time.
+        """
+        now = time.time() if now is None else now
+        st = self.state(url)
+        st.next_due = max(now + self.min_interval, not_before)
+        return st.next_due
+
+    def _schedule(self, url: str, st: FeedState, interval: float, now: float) -> float:
+        st.interval = self._clamp(interval)
+        st.next_due = now + st.interval
+        logger.debug("Next poll of %s in %.0fs", url, st.interval)
+        return st.interval
+
+    def _clamp(self, seconds: float) -> float:
+        return min(max(seconds, self.min_interval), self.max_interval)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self) -> Dict[str, FeedState]:
+        feeds: Dict[str, FeedState] = {}
+        try:
+            if self.state_file.exists():
+                raw = json.loads(self.state_file.read_text(encoding='utf-8'))
+                for url, data in raw.items():
+                    feeds[url] = FeedState(**data)
+                logger.info("Loaded polling schedule for %s feeds", len(feeds))
+        except Exception as e:
+            logger.warning("Could not load feed schedule: %s", e)
+        return feeds
+
+    def save(self) -> None:
+        """Persist the polling state so restarts keep the learned cadence."""
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            # A list copy: fetch workers may still add feeds (shutdown mid-cycle)
+            data = {url: asdict(st) for url, st in list(self.feeds.items())}
+            # Written aside and renamed, so a crash never leaves half a file
+            tmp = self.state_file.with_suffix('.tmp')
+            tmp.write_text(json.dumps(data, indent=2), encoding='utf-8')
+            tmp.replace(self.state_file)
+        except Exception as e:
+            logger.warning("Could not save feed schedule: %s", e)
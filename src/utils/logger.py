@@ -1,39 +1,128 @@
-"""Logging configuration"""
+"""
+Logging configuration.
+
+All records go through a single ``QueueHandler`` on the root logger; a
+``QueueListener`` thread does the formatting and the console/file I/O.  The
+scraping and sender threads therefore only pay for an in-memory enqueue, and
+the handlers are installed once however many modules call ``setup_logger``.
+
+The log file is rotated by size (LOG_MAX_BYTES) or, when LOG_ROTATE_WHEN is
+set (e.g. ``midnight``), by time; LOG_BACKUP_COUNT old files are kept.  Set
+LOG_FORMAT=json for one JSON object per line.
+"""
+import atexit
+import json
 import logging
+import logging.handlers
 import os
-from src.config.settings import Settings
+import queue
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+from src.config.settings import get_settings
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, thread, msg (+ exc)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        if record.exc_info:
+            record.exc_text = record.exc_text or self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueue the raw record; the listener thread does all the formatting.
+
+    The stdlib handler pre-formats the message on the calling thread; here only
+    the traceback is rendered eagerly, since its frames may be gone by the time
+    the listener gets to the record.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _file_handler(settings) -> logging.Handler:
+    if settings.LOG_ROTATE_WHEN:
+        return logging.handlers.TimedRotatingFileHandler(
+            settings.LOG_FILE, when=settings.LOG_ROTATE_WHEN,
+            backupCount=settings.LOG_BACKUP_COUNT, encoding='utf-8', delay=True,
+        )
+    return logging.handlers.RotatingFileHandler(
+        settings.LOG_FILE, maxBytes=settings.LOG_MAX_BYTES,
+        backupCount=settings.LOG_BACKUP_COUNT, encoding='utf-8', delay=True,
+    )
+
+
+def configure_logging(settings=None) -> None:
+    """Install the queue handler and start the listener (idempotent)."""
+    global _listener
+    settings = settings or get_settings()
+    with _lock:
+        if _listener is not None:
+            return
+
+        log_dir = os.path.dirname(settings.LOG_FILE)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+
+        if settings.LOG_FORMAT.lower() == 'json':
+            formatter: logging.Formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT)
+        handlers = [logging.StreamHandler(), _file_handler(settings)]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue: queue.Queue = queue.Queue(-1)
+        # LOG_LEVEL applies to our own loggers; libraries only report warnings
+        logging.getLogger('src').setLevel(settings.LOG_LEVEL)
+        root = logging.getLogger()
+        root.setLevel(logging.WARNING)
+        root.addHandler(_QueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Drain the queue and close the handlers."""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, _QueueHandler)]:
+        root.removeHandler(handler)
 
 
 def setup_logger(name: str) -> logging.Logger:
-    """Setup logging configuration"""
-    settings = Settings()
-    
-    # Ensure logs directory exists
-    log_dir = os.path.dirname(settings.LOG_FILE)
-    if log_dir and not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    
+    """Return ``name``'s logger, configuring the shared backend on first use."""
+    configure_logging()
     logger = logging.getLogger(name)
-    logger.setLevel(settings.LOG_LEVEL)
-    
-    # File handler
-    file_handler = logging.FileHandler(settings.LOG_FILE)
-    file_handler.setLevel(settings.LOG_LEVEL)
-    
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(settings.LOG_LEVEL)
-    
-    # Formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
-    
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
+    logger.setLevel(get_settings().LOG_LEVEL)
     return logger
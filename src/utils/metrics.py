@@ -0,0 +1,300 @@
+"""
+In-process metrics with a Prometheus text endpoint.
+
+Counters, gauges and histograms are plain lock-protected dicts keyed by label
+values, so recording a sample costs a dict lookup and an add - cheap enough
+to sit on the fetch and send paths.  ``render()`` produces the Prometheus
+text exposition format; ``start_metrics_server()`` serves it at ``/metrics``
+from a small Flask app on a daemon thread (METRICS_PORT, 0 = disabled).
+
+Collectors registered with ``registry.register_collector`` are called at
+scrape time for values that are cheaper to read on demand (e.g. the feed
+circuit-breaker states).
+"""
+import bisect
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers sub-millisecond parsing up to slow feed timeouts
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Publish-to-delivery lag: one minute up to a day
+FRESHNESS_BUCKETS = (60, 300, 900, 1800, 3600, 7200, 21600, 43200, 86400)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterator[Sample]:
+        """``(name, labels, value)`` for every exposed series - implemented by subclasses"""
+
+
+class Counter(_Metric):
+    """Monotonically increasing total"""
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+    kind = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed distribution with sum and count"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * (len(self.buckets) + 2)
+            row[index] += 1
+            row[-1] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        row = self._values.get(self._key(labels))
+        return int(sum(row[:-1])) if row else 0
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            items = [(key, list(row)) for key, row in self._values.items()]
+        for key, row in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), row[:-1]):
+                cumulative += n
+                yield f'{self.name}_bucket', {**labels, 'le': _format_value(bound)}, cumulative
+            yield f'{self.name}_sum', labels, row[-1]
+            yield f'{self.name}_count', labels, cumulative
+
+
+class Registry:
+    """Holds metrics and scrape-time collectors; renders the text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[_Metric]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[_Metric]]) -> None:
+        """``collector()`` returns freshly filled metrics on every scrape."""
+        self._collectors.append(collector)
+
+    def unregister_collector(self, collector: Callable[[], Iterable[_Metric]]) -> None:
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def collect(self) -> Iterator[_Metric]:
+        yield from list(self._metrics.values())
+        for collector in list(self._collectors):
+            try:
+                yield from collector()
+            except Exception as e:
+                logger.warning("Metrics collector failed: %s", e)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.collect():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+# Fetch + parse
+FEED_FETCH_SECONDS = registry.histogram(
+    'automonitor_feed_fetch_seconds', 'Feed fetch and parse latency', ['feed'])
+FEED_BYTES = registry.counter(
+    'automonitor_feed_bytes_total', 'Feed response body bytes downloaded', ['feed'])
+FEED_ENTRIES = registry.counter(
+    'automonitor_feed_entries_total', 'Entries parsed from feed responses', ['feed'])
+FEED_PARSES = registry.counter(
+    'automonitor_feed_parses_total', 'Feed bodies parsed, by parser (streaming or feedparser)', ['parser'])
+FEED_NOT_MODIFIED = registry.counter(
+    'automonitor_feed_not_modified_total', 'Conditional GETs answered with 304', ['feed'])
+FEED_UNCHANGED = registry.counter(
+    'automonitor_feed_unchanged_total', 'Polls skipped because the body digest was unchanged', ['feed'])
+FEED_ERRORS = registry.counter(
+    'automonitor_feed_errors_total', 'Failed feed fetches', ['feed'])
+
+# Dedup + format
+DEDUP_SECONDS = registry.histogram(
+    'automonitor_dedup_seconds', 'Deduplication latency per window')
+DEDUP_ARTICLES_IN = registry.counter(
+    'automonitor_dedup_articles_in_total', 'Articles entering deduplication')
+DEDUP_ARTICLES_OUT = registry.counter(
+    'automonitor_dedup_articles_out_total', 'Stories leaving deduplication')
+ENRICHMENTS = registry.counter(
+    'automonitor_enrichments_total',
+    'Article page lookups for og:image / og:description, by result (cached, fetched, timeout, failed)',
+    ['result'])
+FORMAT_SECONDS = registry.histogram(
+    'automonitor_format_seconds', 'Telegram message rendering latency',
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1))
+
+# Delivery
+TELEGRAM_SEND_SECONDS = registry.histogram(
+    'automonitor_telegram_send_seconds', 'Telegram Bot API call latency', ['method'])
+TELEGRAM_RATE_LIMITED = registry.counter(
+    'automonitor_telegram_rate_limited_total', 'Telegram 429 Too Many Requests responses', ['method'])
+TELEGRAM_ERRORS = registry.counter(
+    'automonitor_telegram_errors_total', 'Failed Telegram Bot API calls', ['method'])
+FRESHNESS_LAG_SECONDS = registry.histogram(
+    'automonitor_freshness_lag_seconds', 'Time from article publish to delivery',
+    ['category'], buckets=FRESHNESS_BUCKETS)
+ARTICLES_SENT = registry.counter(
+    'automonitor_articles_sent_total', 'Articles delivered to Telegram', ['category'])
+ARTICLES_ARCHIVED = registry.counter(
+    'automonitor_articles_archived_total', 'New articles written to the search archive', ['category'])
+SUBSCRIPTION_SENT = registry.counter(
+    'automonitor_subscription_sent_total', 'Articles routed to keyword subscription channels',
+    ['subscription'])
+
+# Cycle
+CYCLE_SECONDS = registry.histogram(
+    'automonitor_cycle_seconds', 'Scrape-to-delivery cycle duration',
+    buckets=(1, 5, 10, 30, 60, 90, 120, 300, 600))
+
+
+def health_collector(health) -> Callable[[], Iterable[_Metric]]:
+    """Export ``FeedHealth.snapshot()`` as per-feed gauges."""
+    from src.utils.feed_health import CLOSED, HALF_OPEN, OPEN
+    codes = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def collect() -> Iterable[_Metric]:
+        state = Gauge('automonitor_feed_circuit_state',
+                      'Circuit breaker state (0 closed, 1 half-open, 2 open)', ['feed'])
+        failures = Gauge('automonitor_feed_consecutive_failures',
+                         'Consecutive failed fetches', ['feed'])
+        latency = Gauge('automonitor_feed_last_latency_seconds',
+                        'Latency of the most recent fetch', ['feed'])
+        for url, snap in health.snapshot().items():
+            state.set(codes.get(snap['status'], 0), feed=url)
+            failures.set(snap['consecutive_failures'], feed=url)
+            latency.set(snap['last_latency'], feed=url)
+        return state, failures, latency
+
+    return collect
+
+
+def create_app(metrics_registry: Optional[Registry] = None):
+    """Flask app serving ``/metrics`` and a trivial ``/healthz``."""
+    from flask import Flask, Response
+
+    metrics_registry = metrics_registry or registry
+    app = Flask('automonitor-metrics')
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(metrics_registry.render(),
+                        mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+    @app.route('/healthz')
+    def healthz():
+        return 'ok\n'
+
+    return app
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1'):
+    """Serve the metrics app on a daemon thread; returns the werkzeug server."""
+    from werkzeug.serving import make_server
+
+    # Prometheus scrapes every few seconds; keep access lines out of the log
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server(host, port, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    logger.info("Metrics available at http://%s:%s/metrics", host, server.server_port)
+    return server
@@ -0,0 +1,170 @@
+"""
+Sampled per-cycle profiling.
+
+Every PROFILE_EVERY-th cycle (0 = off) runs under cProfile and tracemalloc.
+When it finishes, two files are written to PROFILE_DIR:
+
+- ``cycle-<timestamp>-<n>.prof``: pstats data. Open it with
+  ``python -m pstats`` or snakeviz.
+- ``cycle-<timestamp>-<n>.txt``: the top functions by cumulative time and
+  the top allocation sites.
+
+cProfile only sees the thread that enables it, so work handed to other
+threads (feed fetches, the Telegram sender) is wrapped with ``traced()``.
+Each of those calls gets its own profiler, and the results are merged into
+the cycle's profile.
+
+On Python 3.12+ cProfile is built on sys.monitoring, which allows only one
+active profiler per process: enabling a second one raises ValueError. There
+``traced()`` is a no-op, so only the cycle thread is profiled and time spent
+in fetch workers and the sender shows up as waiting, not as their functions.
+
+``toggle()`` (bound to SIGUSR1) switches sampling on or off in a running
+process. If PROFILE_EVERY is 0, switching on profiles every cycle.
+"""
+import cProfile
+import io
+import logging
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Frames kept per allocation traceback; more frames = more overhead
+TRACE_FRAMES = 5
+
+# Whether worker threads can run their own profiler next to the cycle's one
+# (not on 3.12+, where cProfile allows a single active profiler)
+PER_THREAD_PROFILING = sys.version_info < (3, 12)
+
+# Capture of the cycle currently being profiled (None when not sampling)
+_active: Optional['_Capture'] = None
+
+
+class _Capture:
+    """Profiles collected from every thread that worked on one cycle."""
+
+    def __init__(self):
+        self.main = cProfile.Profile()
+        self.extra: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def add(self, profile: cProfile.Profile) -> None:
+        with self._lock:
+            self.extra.append(profile)
+
+    def stats(self, stream) -> pstats.Stats:
+        stats = pstats.Stats(self.main, stream=stream)
+        with self._lock:
+            for profile in self.extra:
+                stats.add(profile)
+        return stats
+
+
+def traced(fn: Callable) -> Callable:
+    """Return ``fn`` wrapped to profile its thread while a cycle is being sampled.
+
+    Returns ``fn`` unchanged when no cycle is sampled or when the interpreter
+    cannot run per-thread profilers (see PER_THREAD_PROFILING).
+    """
+    capture = _active
+    if capture is None or not PER_THREAD_PROFILING:
+        return fn
+
+    @wraps(fn)
+    def run(*args, **kwargs):
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            capture.add(profile)
+
+    return run
+
+
+class CycleProfiler:
+    """Decides which cycles to sample and writes their reports."""
+
+    def __init__(self, settings):
+        self.every = max(int(settings.PROFILE_EVERY), 0)
+        self.enabled = self.every > 0
+        self.directory = Path(settings.PROFILE_DIR)
+        self.top = int(settings.PROFILE_TOP)
+        self.cycles = 0
+
+    def toggle(self) -> None:
+        """Switch sampling on/off (SIGUSR1)."""
+        self.enabled = not self.enabled
+        logger.info("Cycle profiling %s (every %d cycle(s))",
+                    'enabled' if self.enabled else 'disabled', self.every or 1)
+
+    def _should_sample(self) -> bool:
+        self.cycles += 1
+        return self.enabled and (self.cycles - 1) % (self.every or 1) == 0
+
+    @contextmanager
+    def cycle(self) -> Iterator[None]:
+        """Profile the enclosed cycle if it is one of the sampled ones."""
+        global _active
+        if not self._should_sample():
+            yield
+            return
+
+        capture = _Capture()
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(TRACE_FRAMES)
+        tracemalloc.reset_peak()
+        _active = capture
+        started = time.perf_counter()
+        capture.main.enable()
+        try:
+            yield
+        finally:
+            capture.main.disable()
+            _active = None
+            elapsed = time.perf_counter() - started
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            try:
+                self._write(capture, snapshot, elapsed, current, peak)
+            except OSError as e:
+                logger.warning("Could not write cycle profile: %s", e)
+
+    def _write(self, capture: _Capture, snapshot: tracemalloc.Snapshot,
+               elapsed: float, current: int, peak: int) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stem = self.directory / f"cycle-{time.strftime('%Y%m%d-%H%M%S')}-{self.cycles}"
+
+        report = io.StringIO()
+        report.write(f"Cycle {self.cycles}: {elapsed:.2f}s wall, "
+                     f"{len(capture.extra) + 1} profiled thread task(s)\n")
+        report.write(f"Traced memory: {current / 1024:.0f} KiB at end, {peak / 1024:.0f} KiB peak\n\n")
+        stats = capture.stats(report)
+        stats.dump_stats(f"{stem}.prof")
+        report.write(f"Top {self.top} functions by cumulative time\n")
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+
+        report.write(f"\nTop {self.top} allocation sites (live at end of cycle)\n")
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        ))
+        for stat in snapshot.statistics('lineno')[:self.top]:
+            frame = stat.traceback[0]
+            report.write(f"  {stat.size / 1024:9.1f} KiB {stat.count:8d} blocks  "
+                         f"{frame.filename}:{frame.lineno}\n")
+
+        Path(f"{stem}.txt").write_text(report.getvalue(), encoding='utf-8')
+        logger.info("Cycle profile written to %s.prof / .txt", stem)
@@ -0,0 +1,64 @@
+"""
+Story ranking: which stories get the limited Telegram sends of a cycle.
+
+Each deduplicated story is scored as the product of four factors:
+
+- recency     ``0.5 ** (age / RANK_HALF_LIFE_HOURS)`` from ``published_ts``;
+              undated stories count as one half-life old
+- weight      the ``weight`` of the feed it came from (feeds.yaml, default 1);
+              digests take their best source's weight
+- coverage    ``1 + RANK_SOURCE_BOOST * log2(source_count)``, so a story that
+              several outlets carry beats a single report of the same age
+- trending    ``1 + RANK_TRENDING_BOOST * trend`` for an optional trending
+              detector returning ``trend`` in [0, 1] (0 without one)
+
+``select`` then picks the best stories with a heap: at most ``per_category``
+per category channel and, when ``budget`` is given, at most ``budget`` in
+total. Building the heap is O(n) and each pick O(log n), so ranking a whole
+cycle is cheap next to fetching it.
+"""
+import heapq
+import math
+import time
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from src.utils.article import ArticleRecord
+
+Story = Tuple[str, ArticleRecord]  # (category, article)
+
+
+class StoryRanker:
+    """Scores stories and selects the top ones per category or under a shared budget."""
+
+    def __init__(self, settings, trending=None):
+        self.settings = settings
+        # Anything with ``trend(article) -> float in [0, 1]``
+        self.trending = trending
+
+    def score(self, article: ArticleRecord, weight: float = 1.0, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        half_life = self.settings.RANK_HALF_LIFE_HOURS * 3600
+        published = article.get('published_ts') or 0.0
+        age = max(now - published, 0.0) if published else half_life
+        recency = 0.5 ** (age / half_life) if half_life > 0 else 1.0
+        coverage = 1 + self.settings.RANK_SOURCE_BOOST * math.log2(max(article.get('source_count', 1), 1))
+        trend = self.trending.trend(article) if self.trending is not None else 0.0
+        return recency * weight * coverage * (1 + self.settings.RANK_TRENDING_BOOST * trend)
+
+    def select(self, stories: Iterable[Story], per_category: int, budget: Optional[int] = None,
+               weight: Callable[[ArticleRecord], float] = lambda article: 1.0) -> List[Story]:
+        """The stories to send, best first."""
+        now = time.time()
+        heap = [(-self.score(article, weight(article), now), i, category, article)
+                for i, (category, article) in enumerate(stories)]
+        heapq.heapify(heap)
+        limit = len(heap) if budget is None else budget
+        taken = {}
+        chosen: List[Story] = []
+        while heap and len(chosen) < limit:
+            _, _, category, article = heapq.heappop(heap)
+            if taken.get(category, 0) >= per_category:
+                continue
+            taken[category] = taken.get(category, 0) + 1
+            chosen.append((category, article))
+        return chosen
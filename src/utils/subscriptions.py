@@ -0,0 +1,222 @@
+"""
+Keyword / regex subscriptions routed to their own channels.
+
+A subscription (``subscriptions:`` in feeds.yaml) sends every article that
+matches one of its keywords or patterns to its channel, whatever category
+the article came from. All subscriptions are compiled together into one
+Aho-Corasick automaton, so an article is matched in a single pass over its
+lower-cased title and description. The cost per article depends on the
+length of its text, not on how many subscriptions exist.
+
+- Keywords match whole words or phrases, case-insensitively. A trailing
+  ``*`` turns a keyword into a prefix: ``drone*`` matches "drones".
+- Patterns are regexes, searched case-insensitively in the original text;
+  ``(?-i:\bAI\b)`` makes a pattern (or part of it) case-sensitive. A
+  literal that every match must contain is extracted from each pattern and
+  goes into the same automaton. ``LLM[- ]inference`` is only tried when
+  "inference" occurs. Patterns with no such literal (alternations, classes
+  only) run on every article.
+"""
+import re
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Shortest regex literal worth prefiltering on
+MIN_LITERAL = 3
+
+
+class _Automaton:
+    """Aho-Corasick automaton over lower-cased strings."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, object]]] = [[]]
+
+    def add(self, word: str, value) -> None:
+        state = 0
+        for ch in word:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(word), value))
+
+    def build(self) -> None:
+        """Compute failure links (breadth-first) and merge outputs along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int, object]]:
+        """Yield ``(start, end, value)`` for every occurrence of every word."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, value in out[state]:
+                yield i + 1 - length, i + 1, value
+
+
+# Hex digits following \x, \u and \U
+_ESCAPE_ARGS = {'x': 2, 'u': 4, 'U': 8}
+
+
+def required_literal(pattern: str) -> Optional[str]:
+    """
+    The longest run of literal characters every match of ``pattern`` contains.
+
+    Conservative: only characters outside groups and classes count, an atom
+    made optional by ``?``, ``*`` or ``{0,...}`` is dropped, and alternations
+    or verbose patterns return None (no prefilter).
+    """
+    if '|' in pattern or '(?x' in pattern:
+        return None
+    runs: List[str] = []
+    run: List[str] = []
+    depth = 0
+    i = 0
+
+    def flush():
+        if run:
+            runs.append(''.join(run))
+            run.clear()
+
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == '\\':
+            nxt = pattern[i + 1:i + 2]
+            i += 2
+            if nxt and not nxt.isalnum():
+                if depth == 0:
+                    run.append(nxt)
+            else:
+                # \d, \w, \b ... are not literals; skip the argument of \x41,
+                # \u00e9, \N{...} and octal or backreference digits too
+                flush()
+                if nxt in _ESCAPE_ARGS:
+                    i += _ESCAPE_ARGS[nxt]
+                elif nxt == 'N' and pattern[i:i + 1] == '{':
+                    end = pattern.find('}', i)
+                    i = end + 1 if end >= 0 else len(pattern)
+                elif nxt.isdigit():
+                    while i < len(pattern) and pattern[i].isdigit():
+                        i += 1
+        elif ch == '[':
+            flush()
+            i += 1
+            if pattern[i:i + 1] == '^':
+                i += 1
+            if pattern[i:i + 1] == ']':
+                i += 1  # a leading ']' is a member, not the end of the class
+            while i < len(pattern) and pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+            i += 1
+        elif ch in '()':
+            flush()
+            depth += 1 if ch == '(' else -1
+            i += 1
+        elif ch in '.^$':
+            flush()
+            i += 1
+        elif ch in '*?+{':
+            end = pattern.find('}', i) if ch == '{' else i
+            optional = ch in '*?' or (ch == '{' and pattern[i + 1:i + 2] in ('0', ','))
+            if optional and run:
+                run.pop()
+            flush()
+            i = (end if end >= 0 else i) + 1
+        else:
+            if depth == 0:
+                run.append(ch)
+            i += 1
+    flush()
+    best = max(runs, key=len, default='')
+    return best.lower() if len(best) >= MIN_LITERAL else None
+
+
+def _normalize(text: str) -> str:
+    return ' '.join(text.lower().split())
+
+
+class SubscriptionEngine:
+    """Matches articles against every subscription in one pass."""
+
+    def __init__(self, subscriptions: Iterable, category_names: Optional[Dict[str, str]] = None):
+        """
+        ``subscriptions`` are ``SubscriptionConfig``s. ``category_names``
+        maps category keys to the display names the pipeline uses.
+        """
+        category_names = category_names or {}
+        self.subscriptions = [s for s in subscriptions if s.enabled and s.channel]
+        # Per subscription: category names it is limited to (None = all)
+        self._categories = [
+            frozenset(category_names.get(c, c) for c in s.categories) or None
+            for s in self.subscriptions
+        ]
+        self._regexes: List[Tuple[int, 're.Pattern']] = []
+        self._unfiltered: List[int] = []
+        self._automaton = _Automaton()
+        for index, sub in enumerate(self.subscriptions):
+            for keyword in sub.keywords:
+                keyword = _normalize(keyword)
+                prefix = keyword.endswith('*')
+                keyword = keyword.rstrip('*').rstrip()
+                if keyword:
+                    self._automaton.add(keyword, (True, index, prefix))
+            for pattern in sub.patterns:
+                rx = len(self._regexes)
+                self._regexes.append((index, re.compile(pattern, re.IGNORECASE)))
+                literal = required_literal(pattern)
+                if literal:
+                    # The automaton scans normalized text: collapse whitespace the same way
+                    self._automaton.add(re.sub(r'\s+', ' ', literal), (False, rx, False))
+                else:
+                    self._unfiltered.append(rx)
+        self._automaton.build()
+
+    @classmethod
+    def from_config(cls, config) -> 'SubscriptionEngine':
+        names = {key: cat.name for key, cat in config.categories.items()}
+        return cls(config.subscriptions.values(), names)
+
+    def __len__(self) -> int:
+        return len(self.subscriptions)
+
+    def match(self, article, category: Optional[str] = None) -> List:
+        """Subscriptions (in config order) that ``article`` from ``category`` matches."""
+        if not self.subscriptions:
+            return []
+        raw = f"{article.get('title') or ''} {article.get('description') or ''}"
+        # Keywords and prefilter literals see normalized text; patterns the original
+        text = _normalize(raw)
+        hits = set()
+        candidates = set(self._unfiltered)
+        for start, end, (is_keyword, index, prefix) in self._automaton.iter(text):
+            if not is_keyword:
+                candidates.add(index)
+            elif index not in hits and (start == 0 or not text[start - 1].isalnum()) \
+                    and (prefix or end == len(text) or not text[end].isalnum()):
+                hits.add(index)
+        for rx in candidates:
+            index, regex = self._regexes[rx]
+            if index not in hits and self._allowed(index, category) and regex.search(raw):
+                hits.add(index)
+        return [self.subscriptions[i] for i in sorted(hits) if self._allowed(i, category)]
+
+    def _allowed(self, index: int, category: Optional[str]) -> bool:
+        allowed = self._categories[index]
+        return allowed is None or category is None or category in allowed
@@ -0,0 +1,228 @@
+"""
+Trending-story detection over a sliding window of count-min sketches.
+
+Every new article (after the seen-filter) is reduced to a few features of
+its title:
+
+- words     lower-cased, stopwords and short words dropped (``w:kernel``)
+- entities  runs of capitalised words (``e:james webb``)
+- story     a 2-token min-hash of the title's words (``s:comet|webb``).
+            Titles sharing most of their words usually share it, so it
+            counts one story told by several outlets.
+
+Each feature is counted in the count-min sketch of the current time bucket
+(TRENDING_BUCKET_SECONDS). The window keeps the last TRENDING_BUCKETS
+sketches and reuses the oldest one when time moves on, so memory is fixed
+(buckets x depth x width counters) however many articles pass. A sketch
+update or estimate costs ``depth`` counter reads per bucket, so each
+article costs O(1) whatever the archive holds.
+
+A feature is *rising* when it was seen at least TRENDING_MIN_COUNT times in
+the last TRENDING_RECENT_BUCKETS buckets, and its per-bucket rate there is at
+least TRENDING_GROWTH times its (add-one smoothed) rate in the older buckets.
+``trend(article)`` turns the growth of an article's strongest feature into
+a 0-1 signal for ``StoryRanker``. ``rising()`` lists the top features from
+a small fixed-size candidate table, since a sketch cannot enumerate its keys.
+The table keeps each candidate's recent count, refreshed when the feature
+is seen and when the window slides, in a min-heap: a full table evicts its
+weakest candidate in O(log n) instead of re-estimating every candidate.
+"""
+import hashlib
+import heapq
+import re
+import threading
+import time
+from array import array
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+_WORD = re.compile(r"[^\W\d_][\w'-]*", re.UNICODE)
+_ENTITY = re.compile(r"\b[A-Z][\w'-]*(?:\s+(?:of\s+|the\s+)?[A-Z][\w'-]*)*")
+_STOPWORDS = frozenset("""
+a an and are as at be but by for from has have how in into is it its new news of on or over
+says said that the their this to up was what when where which who why will with after about
+more than just now out you your our not no can could would should may might all one two
+""".split())
+
+
+def _hash(key: str) -> Tuple[int, int]:
+    h = int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+    return h & 0xFFFFFFFF, (h >> 32) | 1
+
+
+def features(title: str) -> List[str]:
+    """The words, entities and story fingerprint counted for a title"""
+    words = [w for w in (m.group().lower() for m in _WORD.finditer(title))
+             if len(w) > 2 and w not in _STOPWORDS]
+    keys = {f'w:{w}' for w in words}
+    for match in _ENTITY.finditer(title):
+        entity = match.group()
+        # A lone capitalised first word is just the start of the sentence
+        if ' ' in entity or match.start() > 0:
+            if entity.lower() not in _STOPWORDS:
+                keys.add(f'e:{entity.lower()}')
+    if len(set(words)) >= 2:
+        keys.add('s:' + '|'.join(sorted(sorted(set(words), key=_hash)[:2])))
+    return sorted(keys)
+
+
+class CountMinSketch:
+    """``depth`` rows of ``width`` counters; estimates never undercount."""
+
+    def __init__(self, width: int, depth: int):
+        self.width = width
+        self.depth = depth
+        self.counts = array('I', bytes(4 * width * depth))
+
+    def _cells(self, hashed: Tuple[int, int]) -> List[int]:
+        h1, h2 = hashed
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, hashed: Tuple[int, int]) -> None:
+        # Conservative update: only the smallest counters grow, which keeps
+        # the overestimate from collisions low
+        cells = self._cells(hashed)
+        lowest = min(self.counts[c] for c in cells)
+        for c in cells:
+            if self.counts[c] == lowest:
+                self.counts[c] = lowest + 1
+
+    def estimate(self, hashed: Tuple[int, int]) -> int:
+        return min(self.counts[c] for c in self._cells(hashed))
+
+    def clear(self) -> None:
+        self.counts = array('I', bytes(4 * self.width * self.depth))
+
+
+class TrendingDetector:
+    """Sliding-window counts of title features, with the fast risers exposed."""
+
+    def __init__(self, settings, now: Optional[float] = None):
+        self.settings = settings
+        self.bucket_seconds = settings.TRENDING_BUCKET_SECONDS
+        self._buckets = deque(
+            (CountMinSketch(settings.TRENDING_SKETCH_WIDTH, settings.TRENDING_SKETCH_DEPTH)
+             for _ in range(settings.TRENDING_BUCKETS)),
+            maxlen=settings.TRENDING_BUCKETS,
+        )
+        self._current = self._bucket_index(time.time() if now is None else now)
+        self._recent_buckets = self._slice_recent()
+        # Feature -> hash for a bounded set of candidates with recent activity
+        self._candidates: Dict[str, Tuple[int, int]] = {}
+        # Their recent counts, and a min-heap of (count, feature) over them.
+        # Outdated heap entries are skipped when popped
+        self._counts: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+        self._lock = threading.Lock()
+
+    def _bucket_index(self, now: float) -> int:
+        return int(now // self.bucket_seconds)
+
+    def _advance(self, now: float) -> None:
+        index = self._bucket_index(now)
+        steps = min(index - self._current, len(self._buckets))
+        for _ in range(max(steps, 0)):
+            # The oldest sketch becomes the new current one
+            oldest = self._buckets.popleft()
+            oldest.clear()
+            self._buckets.append(oldest)
+        self._current = max(self._current, index)
+        if steps > 0:
+            # Recent counts shrink as buckets leave the recent window
+            self._recent_buckets = self._slice_recent()
+            self._counts = {key: self._recent(hashed) for key, hashed in self._candidates.items()}
+            self._rebuild_heap()
+
+    def _slice_recent(self) -> List[CountMinSketch]:
+        size = len(self._buckets)
+        return list(islice(self._buckets, max(size - self.settings.TRENDING_RECENT_BUCKETS, 0), size))
+
+    def observe(self, article, now: Optional[float] = None) -> None:
+        """Count an incoming article's title features in the current bucket"""
+        keys = features(article.get('title') or '')
+        now = time.time() if now is None else now
+        with self._lock:
+            self._advance(now)
+            current = self._buckets[-1]
+            for key in keys:
+                hashed = _hash(key)
+                current.add(hashed)
+                count = self._recent(hashed)
+                if key in self._candidates:
+                    self._set_count(key, count)
+                elif count >= self.settings.TRENDING_MIN_COUNT:
+                    self._admit(key, hashed, count)
+
+    def _admit(self, key: str, hashed: Tuple[int, int], count: int) -> None:
+        if len(self._candidates) >= self.settings.TRENDING_CANDIDATES:
+            if not self._candidates:
+                return
+            # Evict the candidate with the least recent activity
+            weakest, weakest_count = self._weakest()
+            if weakest_count >= count:
+                return
+            del self._candidates[weakest]
+            del self._counts[weakest]
+        self._candidates[key] = hashed
+        self._set_count(key, count)
+
+    def _set_count(self, key: str, count: int) -> None:
+        self._counts[key] = count
+        heapq.heappush(self._heap, (count, key))
+        if len(self._heap) > 4 * max(len(self._counts), 16):
+            self._rebuild_heap()  # mostly outdated entries
+
+    def _weakest(self) -> Tuple[str, int]:
+        heap = self._heap
+        while self._counts.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        count, key = heap[0]
+        return key, count
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(count, key) for key, count in self._counts.items()]
+        heapq.heapify(self._heap)
+
+    def _recent(self, hashed: Tuple[int, int]) -> int:
+        return sum(sketch.estimate(hashed) for sketch in self._recent_buckets)
+
+    def _growth(self, hashed: Tuple[int, int], buckets: Optional[List[CountMinSketch]] = None
+                ) -> Tuple[int, float]:
+        """Recent count and recent-vs-older per-bucket rate ratio of a feature"""
+        buckets = list(self._buckets) if buckets is None else buckets
+        split = len(buckets) - self.settings.TRENDING_RECENT_BUCKETS
+        recent = sum(sketch.estimate(hashed) for sketch in buckets[split:])
+        older = sum(sketch.estimate(hashed) for sketch in buckets[:split])
+        recent_rate = recent / max(len(buckets) - split, 1)
+        older_rate = (older + 1) / max(split, 1)
+        return recent, recent_rate / older_rate
+
+    def trend(self, article, now: Optional[float] = None) -> float:
+        """0 unless a feature is rising; 0.5 at TRENDING_GROWTH, approaching 1 above it"""
+        threshold = self.settings.TRENDING_GROWTH
+        best = 0.0
+        with self._lock:
+            self._advance(time.time() if now is None else now)
+            buckets = list(self._buckets)
+            for key in features(article.get('title') or ''):
+                recent, growth = self._growth(_hash(key), buckets)
+                if recent >= self.settings.TRENDING_MIN_COUNT and growth >= threshold:
+                    best = max(best, 1 - threshold / (2 * growth))
+        return best
+
+    def rising(self, limit: int = 10, now: Optional[float] = None) -> List[Tuple[str, int, float]]:
+        """``(feature, recent count, growth)`` of the fastest rising candidates"""
+        with self._lock:
+            self._advance(time.time() if now is None else now)
+            found = []
+            buckets = list(self._buckets)
+            for key, hashed in list(self._candidates.items()):
+                recent, growth = self._growth(hashed, buckets)
+                if recent < self.settings.TRENDING_MIN_COUNT:
+                    del self._candidates[key]  # went quiet
+                    del self._counts[key]
+                elif growth >= self.settings.TRENDING_GROWTH:
+                    found.append((key, recent, round(growth, 2)))
+        found.sort(key=lambda item: (item[2], item[1]), reverse=True)
+        return found[:limit]
@@ -0,0 +1,63 @@
+"""Tests for the full-text article archive"""
+import tempfile
+import unittest
+from pathlib import Path
+from src.utils.archive import ArticleArchive, match_expression
+
+
+class TestArticleArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.archive = ArticleArchive(Path(self.tmp.name) / 'archive.db')
+
+    def tearDown(self):
+        self.archive.close()
+        self.tmp.cleanup()
+
+    def test_bulk_add_ignores_known_urls(self):
+        articles = [{'title': 'Rust 2.0 released', 'url': 'https://a.com/1'},
+                    {'title': 'Mars rover finds ice', 'url': 'https://b.com/2'},
+                    {'title': 'No url'}]
+        self.assertEqual(self.archive.add('Technology', articles), 2)
+        self.assertEqual(self.archive.add('Technology', articles[:1]), 0)
+        self.assertEqual(self.archive.stats()['articles'], 2)
+
+    def test_search_ranks_title_hits_first(self):
+        self.archive.add('Technology', [
+            {'title': 'Chip shortage eases', 'description': 'Quantum vendors mentioned', 'url': 'https://a.com/1'},
+            {'title': 'Quantum computer milestone', 'description': 'Qubits', 'url': 'https://b.com/2'},
+        ])
+        hits = self.archive.search('quantum')
+        self.assertEqual([h['url'] for h in hits], ['https://b.com/2', 'https://a.com/1'])
+        self.assertEqual(hits[0]['source'], 'b.com')
+        self.assertEqual([h['url'] for h in self.archive.search('qubit*')], ['https://b.com/2'])
+        self.assertEqual(self.archive.search('quantum', category='Science'), [])
+
+    def test_recency_filter(self):
+        self.archive.add('Science', [{'title': 'Old eclipse story', 'url': 'https://a.com/old'}], now=1000)
+        self.archive.add('Science', [
+            {'title': 'New eclipse story', 'url': 'https://a.com/new', 'published_ts': 5000},
+            {'title': 'Backdated eclipse story', 'url': 'https://a.com/late', 'published_ts': 1500},
+        ], now=5000)
+        self.assertEqual([h['url'] for h in self.archive.search('eclipse', since=4000)], ['https://a.com/new'])
+        self.assertEqual(self.archive.search('eclipse', since=9000), [])
+
+    def test_prune_and_compact(self):
+        self.archive.add('Science', [{'title': f'Story {i}', 'url': f'https://a.com/{i}'} for i in range(50)],
+                         now=1000)
+        self.archive.add('Science', [{'title': 'Story fresh', 'url': 'https://a.com/fresh'}], now=100000)
+        self.assertEqual(self.archive.prune(older_than_days=1, now=100000), 50)
+        self.archive.compact()
+        self.assertEqual([h['url'] for h in self.archive.search('story')], ['https://a.com/fresh'])
+        self.assertTrue(self.archive.maintenance_due(3600))
+        self.archive.maintain(retention_days=0)
+        self.assertFalse(self.archive.maintenance_due(3600))
+
+    def test_match_expression_quotes_terms(self):
+        self.assertEqual(match_expression('C++ "AND" drone*'), '"C" "AND" "drone"*')
+        self.assertEqual(match_expression('!!'), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
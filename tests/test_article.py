@@ -0,0 +1,54 @@
+"""Tests for the compact article record"""
+import unittest
+from src.utils.article import ArticleRecord, canonical_url
+
+
+class TestArticleRecord(unittest.TestCase):
+
+    def test_dict_compatible_access(self):
+        article = ArticleRecord(title='Rust 2.0', url='https://www.example.com/rust')
+        self.assertEqual(article['title'], 'Rust 2.0')
+        self.assertEqual(article.get('source_count', 1), 1)
+        self.assertEqual(article.get('merged_urls', ['fallback']), ['fallback'])
+        self.assertNotIn('merged_urls', article)
+        self.assertIsNone(article.get('category'))
+        self.assertEqual(ArticleRecord.of(article.to_dict()), article)
+        self.assertFalse(hasattr(article, '__dict__'))
+
+    def test_setitem_resets_derived_keys(self):
+        article = ArticleRecord(title='  Mixed Case ', url='https://www.a.com/x')
+        self.assertEqual(article.normalized_title, 'mixed case')
+        self.assertEqual(article.host, 'a.com')
+        article['url'] = 'https://b.org/y'
+        self.assertEqual(article.host, 'b.org')
+        with self.assertRaises(KeyError):
+            article['category'] = 'Tech'
+
+    def test_hosts_are_interned(self):
+        a = ArticleRecord(url='https://news.example.com/1')
+        b = ArticleRecord(url='https://news.example.com/2')
+        self.assertIs(a.host, b.host)
+
+    def test_canonical_url_strips_tracking(self):
+        self.assertEqual(
+            canonical_url('HTTPS://Example.com/story/?utm_source=rss&id=7&fbclid=x#top'),
+            'https://example.com/story?id=7',
+        )
+
+    def test_digest(self):
+        members = [
+            ArticleRecord(title='Chip race', url='https://www.ars.com/1', description='Short', author='A'),
+            ArticleRecord(title='Chip race', url='https://verge.com/1', description='Much longer'),
+            ArticleRecord(title='Chip race', url='https://ars.com/2'),
+        ]
+        digest = ArticleRecord.digest(members)
+        self.assertEqual(digest['title'], 'Chip race')
+        self.assertEqual(digest['url'], 'https://www.ars.com/1')
+        self.assertEqual(digest['description'], 'Much longer')
+        self.assertEqual(digest['author'], 'ars.com, verge.com')
+        self.assertEqual(digest['source_count'], 3)
+        self.assertEqual(len(digest['merged_urls']), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
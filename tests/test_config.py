@@ -0,0 +1,143 @@
+"""Tests for configuration validation and hot reload"""
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from pydantic import ValidationError
+from src.config.feeds import parse_config
+from src.config.manager import ConfigChange, ConfigManager
+from src.config.settings import Settings
+from src.config.table import category_sources, category_table
+from src.scrapers.registry import ScraperRegistry
+
+BASE = """
+categories:
+  tech:
+    name: Technology
+    feeds:
+      - https://a.example/rss
+  science:
+    name: Science
+    feeds:
+      - https://b.example/rss
+"""
+
+
+class TestConfigValidation(unittest.TestCase):
+
+    def test_rejects_non_http_feed(self):
+        with self.assertRaises(ValidationError):
+            parse_config({'categories': {'tech': {'feeds': ['ftp://a.example/rss']}}})
+
+    def test_rejects_unknown_setting(self):
+        with self.assertRaises(ValidationError):
+            parse_config({'settings': {'NOT_A_SETTING': 1}})
+
+    def test_rejects_setting_that_needs_a_restart(self):
+        for name in ('FEED_FETCH_WORKERS', 'ENABLE_AI_NEWS', 'LOG_LEVEL'):
+            with self.subTest(name=name), self.assertRaises(ValidationError):
+                parse_config({'settings': {name: 1}})
+
+    def test_settings_coerced_to_attribute_type(self):
+        config = parse_config({'settings': {'SCRAPE_INTERVAL': '15', 'ENABLE_LLM_DEDUP': 'false'}})
+        self.assertEqual(config.settings['SCRAPE_INTERVAL'], 15)
+        self.assertIs(config.settings['ENABLE_LLM_DEDUP'], False)
+
+
+class TestCategoryTable(unittest.TestCase):
+
+    def test_plain_table_matches_validated_config(self):
+        validated = ConfigManager(Settings()).config.categories
+        table = category_table()
+        self.assertEqual(set(table), set(validated))
+        for key, category in validated.items():
+            self.assertEqual(category_sources(table[key]), category.sources)
+            self.assertEqual((table[key]['name'], table[key]['channel']), (category.name, category.channel))
+
+    def test_import_does_not_load_pydantic(self):
+        out = subprocess.run(
+            [sys.executable, '-c', "import sys, src.main; print('pydantic' in sys.modules)"],
+            cwd=Path(__file__).resolve().parent.parent, capture_output=True, text=True, check=True,
+        ).stdout
+        self.assertEqual(out.strip(), 'False')
+
+
+class TestConfigManager(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'feeds.yaml'
+        self.path.write_text(BASE)
+        self.settings = Settings()
+        self.manager = ConfigManager(self.settings, self.path)
+        self.changes = []
+        self.manager.subscribe(lambda config, change: self.changes.append(change))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text):
+        self.path.write_text(text)
+        # Make sure the mtime moves even on coarse-grained filesystems
+        mtime = self.path.stat().st_mtime + 5
+        os.utime(self.path, (mtime, mtime))
+
+    def test_invalid_file_keeps_current_config(self):
+        before = self.manager.config
+        self.write(BASE.replace('https://a.example/rss', 'not-a-url'))
+        self.assertTrue(self.manager.changed_on_disk())
+        self.assertFalse(self.manager.reload())
+        self.assertIs(self.manager.config, before)
+        self.assertFalse(self.manager.changed_on_disk())
+        self.assertEqual(self.changes, [])
+
+    def test_reload_reports_changed_categories(self):
+        self.write(BASE.replace('https://b.example/rss', 'https://c.example/rss')
+                   + "  ai:\n    name: AI\n")
+        self.assertTrue(self.manager.reload())
+        change = self.changes[0]
+        self.assertEqual(change.added, {'ai'})
+        self.assertEqual(change.changed, {'science'})
+        self.assertEqual(change.removed, set())
+        self.assertIn('TELEGRAM_CHANNELS', change.settings)
+        self.assertIn('AI', self.settings.TELEGRAM_CHANNELS)
+
+    def test_unchanged_file_is_not_reapplied(self):
+        self.write(BASE)
+        self.assertFalse(self.manager.reload())
+        self.assertEqual(self.changes, [])
+
+    def test_setting_override_applied_and_restored(self):
+        default = self.settings.MAX_SENDS_PER_CATEGORY
+        self.write(BASE + "settings:\n  MAX_SENDS_PER_CATEGORY: 2\n")
+        self.manager.reload()
+        self.assertEqual(self.settings.MAX_SENDS_PER_CATEGORY, 2)
+        self.assertIn('MAX_SENDS_PER_CATEGORY', self.changes[-1].settings)
+
+        self.write(BASE)
+        self.manager.reload()
+        self.assertEqual(self.settings.MAX_SENDS_PER_CATEGORY, default)
+
+    def test_registry_update_keeps_unchanged_scrapers(self):
+        registry = ScraperRegistry(self.manager.config.categories, self.settings)
+        tech, science = registry['tech'], registry['science']
+        self.write(BASE.replace('https://b.example/rss', 'https://c.example/rss'))
+        self.manager.reload()
+        registry.update(self.manager.config.categories)
+        self.assertIs(registry['tech'], tech)
+        self.assertIsNot(registry['science'], science)
+        self.assertEqual(registry['science'].sources, ['https://c.example/rss'])
+
+
+class TestConfigChange(unittest.TestCase):
+
+    def test_no_difference_is_falsy(self):
+        config = parse_config({'categories': {'tech': {'feeds': ['https://a.example/rss']}}})
+        self.assertFalse(ConfigChange(config, config))
+        self.assertEqual(str(ConfigChange(config, config)), 'no changes')
+
+
+if __name__ == '__main__':
+    unittest.main()
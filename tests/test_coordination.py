@@ -0,0 +1,127 @@
+"""Tests for distributed-mode shard leases and the shared sent history"""
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+import sqlalchemy as sa
+from src.config.settings import Settings
+from src.utils.coordination import SentLedger, ShardCoordinator, shard_of
+
+
+def make_settings(**overrides):
+    s = Settings()
+    s.SHARD_COUNT = 8
+    s.LEASE_TTL = 30
+    s.WORKER_ID = ''
+    for name, value in overrides.items():
+        setattr(s, name, value)
+    return s
+
+
+class CoordinationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = sa.create_engine(f"sqlite:///{Path(self.tmp.name) / 'workers.db'}")
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+
+class TestShardCoordinator(CoordinationTestCase):
+
+    def test_single_worker_takes_every_shard(self):
+        worker = ShardCoordinator(self.engine, make_settings(), worker_id='a')
+        self.assertEqual(worker.heartbeat(now=1000), set(range(8)))
+        self.assertTrue(worker.owns('https://example.com/feed'))
+
+    def test_shards_rebalance_when_a_worker_joins(self):
+        a = ShardCoordinator(self.engine, make_settings(), worker_id='a')
+        b = ShardCoordinator(self.engine, make_settings(), worker_id='b')
+        a.heartbeat(now=1000)
+        self.assertEqual(b.heartbeat(now=1001), set())  # nothing free yet
+        a.heartbeat(now=1002)                            # gives back its surplus
+        b.heartbeat(now=1003)
+        self.assertEqual(len(a.owned), 4)
+        self.assertEqual(len(b.owned), 4)
+        self.assertFalse(a.owned & b.owned)
+
+    def test_expired_leases_are_reassigned(self):
+        a = ShardCoordinator(self.engine, make_settings(), worker_id='a')
+        b = ShardCoordinator(self.engine, make_settings(), worker_id='b')
+        a.heartbeat(now=1000)
+        # a stops heartbeating; after its leases and liveness lapse b takes all
+        self.assertEqual(b.heartbeat(now=1000 + 31), set(range(8)))
+
+    def test_release_frees_shards_immediately(self):
+        a = ShardCoordinator(self.engine, make_settings(), worker_id='a')
+        b = ShardCoordinator(self.engine, make_settings(), worker_id='b')
+        a.heartbeat(now=1000)
+        a.release()
+        self.assertEqual(b.heartbeat(now=1001), set(range(8)))
+
+    def test_shard_of_is_stable(self):
+        self.assertEqual(shard_of('https://a.com/rss', 64), shard_of('https://a.com/rss', 64))
+        self.assertLess(shard_of('https://a.com/rss', 64), 64)
+
+
+class TestSentLedger(CoordinationTestCase):
+
+    def test_each_url_is_claimed_once_across_workers(self):
+        a = SentLedger(self.engine, 'a')
+        b = SentLedger(self.engine, 'b')
+        self.assertEqual(a.claim('Tech', ['https://x.com/1', 'https://x.com/2']),
+                         {'https://x.com/1', 'https://x.com/2'})
+        self.assertEqual(b.claim('Tech', ['https://x.com/2', 'https://x.com/3']), {'https://x.com/3'})
+        # Same URL in another category is a separate send
+        self.assertEqual(b.claim('Science', ['https://x.com/1']), {'https://x.com/1'})
+
+    def test_concurrent_claims_have_one_winner(self):
+        ledgers = [SentLedger(self.engine, f'w{i}') for i in range(4)]
+        urls = [f'https://x.com/{i}' for i in range(50)]
+        won = []
+        lock = threading.Lock()
+
+        def claim(ledger):
+            got = ledger.claim('Tech', urls)
+            with lock:
+                won.extend(got)
+
+        threads = [threading.Thread(target=claim, args=(ledger,)) for ledger in ledgers]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertCountEqual(won, urls)
+
+    def test_stale_undelivered_claims_are_taken_over(self):
+        a = SentLedger(self.engine, 'a', claim_ttl=600)
+        b = SentLedger(self.engine, 'b', claim_ttl=600)
+        a.claim('Tech', ['https://x.com/1', 'https://x.com/2'], now=1000)
+        a.mark_delivered('Tech', ['https://x.com/1'])
+        # a died before sending x.com/2: b may retry it once the claim is stale
+        self.assertEqual(b.claim('Tech', ['https://x.com/1', 'https://x.com/2'], now=1500), set())
+        self.assertEqual(b.claim('Tech', ['https://x.com/1', 'https://x.com/2'], now=1601), {'https://x.com/2'})
+        self.assertEqual(a.claim('Tech', ['https://x.com/2'], now=1700), set())
+
+    def test_prune_drops_old_rows(self):
+        ledger = SentLedger(self.engine, 'a')
+        ledger.claim('Tech', ['https://x.com/old'], now=1000)
+        ledger.claim('Tech', ['https://x.com/new'], now=1000 + 20 * 86400)
+        self.assertEqual(ledger.prune(30, now=1000 + 31 * 86400), 1)
+        self.assertEqual(ledger.prune(0.001, now=1000 + 31 * 86400 + 60), 0)  # pruned within the hour
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(sa.text('SELECT url FROM sent_history')).scalars().all(),
+                             ['https://x.com/new'])
+
+    def test_mark_delivered(self):
+        ledger = SentLedger(self.engine, 'a')
+        ledger.claim('Tech', ['https://x.com/1'])
+        ledger.mark_delivered('Tech', ['https://x.com/1'])
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(sa.text('SELECT delivered FROM sent_history')).scalar(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+"""Tests for the database manager's bulk writes and pool settings"""
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from src.utils.db import Article, DatabaseManager, article_rows, insert_ignore
+
+
+class TestDatabaseManager(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(f"sqlite:///{Path(self.tmp.name) / 'test.db'}")
+        self.db.create_tables()
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_upsert_articles_skips_known_urls(self):
+        articles = [{'title': f'Story {i}', 'url': f'https://a.com/{i}'} for i in range(25)]
+        self.db.settings.DB_BATCH_SIZE = 10  # several statements per call
+        try:
+            self.assertEqual(self.db.upsert_articles('Technology', articles), 25)
+            self.assertEqual(self.db.upsert_articles('Technology', articles[20:] + [
+                {'title': 'New', 'url': 'https://b.com/1', 'published_ts': 1700000000}]), 1)
+        finally:
+            self.db.settings.DB_BATCH_SIZE = 1000
+        with self.db.get_session() as session:
+            self.assertEqual(session.query(Article).count(), 26)
+            new = session.query(Article).filter_by(url='https://b.com/1').one()
+            self.assertEqual(new.published_date.year, 2023)
+
+    def test_article_rows_fit_the_columns(self):
+        rows = list(article_rows('Science', [
+            {'title': 'x' * 400, 'url': 'https://a.com/1'},
+            {'title': 'Duplicate', 'url': 'https://a.com/1'},
+            {'title': 'Too long', 'url': 'https://a.com/' + 'y' * 600},
+            {'title': 'No url'},
+        ]))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(len(rows[0]['title']), 255)
+
+    def test_insert_ignore_rejects_other_dialects(self):
+        engine = SimpleNamespace(dialect=SimpleNamespace(name='mysql'))
+        with self.assertRaises(ValueError):
+            insert_ignore(engine, Article)
+
+    def test_pool_options(self):
+        self.assertEqual(self.db._engine_options(), {'echo': False})
+        self.db.database_url = 'postgresql://u:p@db:5432/automonitor'
+        options = self.db._engine_options()
+        self.assertEqual(options['pool_size'], self.db.settings.DB_POOL_SIZE)
+        self.assertTrue(options['pool_pre_ping'])
+
+
+if __name__ == '__main__':
+    unittest.main()
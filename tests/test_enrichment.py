@@ -0,0 +1,90 @@
+"""Tests for Open Graph enrichment of articles about to be sent"""
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.config.settings import Settings
+from src.scrapers.enrichment import ArticleEnricher, read_head_meta
+from src.utils.article import ArticleRecord
+
+HEAD = b"""<!doctype html><html><head>
+<title>A story</title>
+<meta property="og:image" content="/images/story.jpg">
+<meta property="og:description" content="  The full summary of the story,
+ spread over two lines.  ">
+<meta name="description" content="Shorter summary">
+</head><body>"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    body_bytes = 0
+
+    def do_GET(self):
+        if self.path == '/slow':
+            time.sleep(0.5)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.end_headers()
+        self.wfile.write(HEAD)
+        try:
+            # A large body the enricher should stop reading at <body>
+            for _ in range(200):
+                time.sleep(0.005)
+                self.wfile.write(b'<p>' + b'x' * 8192 + b'</p>')
+                type(self).body_bytes += 8192
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class TestArticleEnricher(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.settings = Settings()
+        self.enricher = ArticleEnricher(self.settings)
+
+    def tearDown(self):
+        self.enricher.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_head_meta_is_read_until_body(self):
+        meta = read_head_meta([HEAD, b'<meta property="og:title" content="late">'], 1 << 20)
+        self.assertEqual(meta['og:image'], '/images/story.jpg')
+        self.assertEqual(meta['description'], 'Shorter summary')
+        self.assertNotIn('og:title', meta)
+
+    def test_fills_missing_image_and_short_description(self):
+        article = ArticleRecord(title='A story', url=f'{self.base}/story', description='Short.')
+        self.assertEqual(self.enricher.enrich([article], timeout=5), 1)
+        self.assertEqual(article['image'], f'{self.base}/images/story.jpg')
+        self.assertEqual(article['description'], 'The full summary of the story, spread over two lines.')
+        self.assertLess(_Handler.body_bytes, 200 * 8192)
+
+    def test_complete_articles_are_not_fetched(self):
+        article = ArticleRecord(title='A story', url=f'{self.base}/story',
+                                image='https://cdn.example/a.jpg', description='x' * 300)
+        self.assertFalse(self.enricher.wants(article))
+        self.assertEqual(self.enricher.enrich([article], timeout=5), 0)
+
+    def test_slow_pages_are_cached_for_the_next_cycle(self):
+        url = f'{self.base}/slow'
+        first = ArticleRecord(title='A story', url=url)
+        started = time.monotonic()
+        self.assertEqual(self.enricher.enrich([first], timeout=0.1), 0)
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertIsNone(first['image'])
+
+        time.sleep(0.8)
+        second = ArticleRecord(title='A story', url=url)
+        self.assertEqual(self.enricher.enrich([second], timeout=0), 1)  # from the cache
+        self.assertTrue(second['image'])
+
+
+if __name__ == '__main__':
+    unittest.main()
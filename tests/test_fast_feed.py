@@ -0,0 +1,108 @@
+"""Tests for the streaming lxml feed parser"""
+import calendar
+import unittest
+import feedparser
+from src.scrapers.fast_feed import FeedFormatError, StreamingFeedParser, parse_date
+
+RSS = b"""<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"
+     xmlns:dc="http://purl.org/dc/elements/1.1/"
+     xmlns:content="http://purl.org/rss/1.0/modules/content/">
+<channel><title>Example</title><ttl>30</ttl>
+""" + b''.join(b"""<item>
+  <title>Story %d &amp; more</title>
+  <link>https://example.com/%d</link>
+  <description><![CDATA[<p>Body <img src="https://img.example.com/%d.jpg"></p>]]></description>
+  <dc:creator>Reporter</dc:creator>
+  <pubDate>Mon, 01 Jan 2024 %02d:00:00 +0100</pubDate>
+  <media:content url="https://img.example.com/%d.png" medium="image"/>
+</item>
+""" % (i, i, i, i % 24, i) for i in range(200)) + b"</channel></rss>"
+
+ATOM = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+<title>Example</title><updated>2024-01-01T12:00:00Z</updated>
+<entry>
+  <title type="html">Atom &lt;b&gt;story&lt;/b&gt;</title>
+  <link rel="alternate" href="https://example.com/a1"/>
+  <link rel="enclosure" type="image/jpeg" href="https://img.example.com/a1.jpg"/>
+  <author><name>Writer</name></author>
+  <updated>2024-01-01T12:00:00Z</updated>
+  <content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml">Inline <b>markup</b></div></content>
+</entry>
+</feed>"""
+
+
+def chunked(data, size=100):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestStreamingFeedParser(unittest.TestCase):
+
+    def test_rss_fields_match_feedparser(self):
+        entries = StreamingFeedParser(5, 1 << 20).parse(chunked(RSS))
+        reference = feedparser.parse(RSS).entries
+        self.assertEqual(len(entries), 5)
+        for fast, slow in zip(entries, reference):
+            self.assertEqual(fast['title'], slow['title'])
+            self.assertEqual(fast['link'], slow['link'])
+            self.assertEqual(fast['author'], slow['author'])
+            self.assertEqual(fast.media_content[0]['url'], slow.media_content[0]['url'])
+            self.assertEqual(calendar.timegm(fast['published_parsed']),
+                             calendar.timegm(slow['published_parsed']))
+        self.assertIn('<img', entries[0]['summary'])
+
+    def test_stops_after_max_entries(self):
+        parser = StreamingFeedParser(2, 1 << 20)
+        chunks = iter(chunked(RSS, 16384))
+        parser.parse(chunks)
+        self.assertTrue(parser.stopped_early)
+        self.assertLess(parser.bytes_read, len(RSS))
+        self.assertEqual(parser.ttl, '30')
+
+    def test_byte_cap(self):
+        parser = StreamingFeedParser(1000, 1024)  # checked after each 16 KiB piece
+        entries = parser.parse(chunked(RSS))
+        self.assertTrue(parser.stopped_early)
+        self.assertLess(len(entries), 200)
+        self.assertLess(parser.bytes_read, len(RSS))
+
+    def test_atom_entry(self):
+        (entry,) = StreamingFeedParser(5, 1 << 20).parse([ATOM])
+        self.assertEqual(entry['title'], 'Atom <b>story</b>')
+        self.assertEqual(entry['link'], 'https://example.com/a1')
+        self.assertEqual(entry['author'], 'Writer')
+        self.assertEqual(entry.enclosures[0]['href'], 'https://img.example.com/a1.jpg')
+        self.assertIn('<b', entry['content'][0]['value'])
+        self.assertEqual(calendar.timegm(entry['updated_parsed']), 1704110400)
+
+    def test_relative_links_are_resolved(self):
+        atom = (b'<feed xmlns="http://www.w3.org/2005/Atom" xml:base="/news/">'
+                b'<entry><title>A</title><link href="a1"/></entry>'
+                b'<entry xml:base="https://cdn.example.org/"><title>B</title><link href="b1"/></entry></feed>')
+        entries = StreamingFeedParser(5, 1 << 20, base_url='https://example.com/feed.xml').parse([atom])
+        self.assertEqual([e['link'] for e in entries],
+                         ['https://example.com/news/a1', 'https://cdn.example.org/b1'])
+        rss = (b'<rss><channel><item><title>C</title><link>/c1</link>'
+               b'<enclosure url="img/c1.jpg" type="image/jpeg"/></item></channel></rss>')
+        (entry,) = StreamingFeedParser(5, 1 << 20, base_url='https://example.com/feeds/rss').parse([rss])
+        self.assertEqual(entry['link'], 'https://example.com/c1')
+        self.assertEqual(entry.enclosures[0]['href'], 'https://example.com/feeds/img/c1.jpg')
+
+    def test_unsupported_documents_fall_back(self):
+        rdf = b'<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"></rdf:RDF>'
+        for body in (rdf, b'<rss><channel><item><title>&nbsp;</title></item></channel></rss>', b''):
+            with self.subTest(body=body[:20]):
+                parser = StreamingFeedParser(5, 1 << 20)
+                with self.assertRaises(FeedFormatError):
+                    parser.parse([body])
+                self.assertEqual(parser.consumed, body)
+
+    def test_parse_date_formats(self):
+        self.assertEqual(calendar.timegm(parse_date('Mon, 01 Jan 2024 12:00:00 GMT')), 1704110400)
+        self.assertEqual(calendar.timegm(parse_date('2024-01-01T13:00:00+01:00')), 1704110400)
+        self.assertIsNone(parse_date(''))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""Tests for feed body digests and the unchanged-feed short-circuit"""
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+import feedparser
+from src.config.feeds import CategoryConfig
+from src.config.settings import Settings
+from src.scrapers.feed_scraper import FeedScraper
+from src.utils import metrics
+from src.utils.feed_digest import FeedDigest, feed_digest
+from src.utils.feed_scheduler import FeedScheduler
+
+RSS = """<?xml version="1.0"?>
+<!-- generated in {elapsed}s -->
+<rss version="2.0"><channel>
+<title>Example</title>
+<lastBuildDate>{built}</lastBuildDate>
+<pubDate>{built}</pubDate>
+<item><title>{title}</title><link>https://example.com/1</link>
+<pubDate>Mon, 01 Jan 2024 10:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+
+def render(built='Mon, 01 Jan 2024 12:00:00 GMT', elapsed='0.01', title='First story'):
+    return RSS.format(built=built, elapsed=elapsed, title=title).encode()
+
+
+class TestFeedDigest(unittest.TestCase):
+
+    def test_volatile_parts_are_ignored(self):
+        self.assertEqual(feed_digest([render()]),
+                         feed_digest([render(built='Tue, 02 Jan 2024 08:00:00 GMT', elapsed='1.5')]))
+        self.assertNotEqual(feed_digest([render()]), feed_digest([render(title='Second story')]))
+
+    def test_item_dates_are_content(self):
+        changed = render().replace(b'10:00:00', b'11:00:00')
+        self.assertNotEqual(feed_digest([render()]), feed_digest([changed]))
+
+    def test_chunking_does_not_change_the_digest(self):
+        body = render()
+        expected = feed_digest([body])
+        for size in (1, 3, 7, 64):
+            with self.subTest(size=size):
+                digest = FeedDigest()
+                for i in range(0, len(body), size):
+                    digest.update(body[i:i + size])
+                self.assertEqual(digest.hexdigest(), expected)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        body = render(built=f'request {self.requests}')  # no validators, new build date
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestUnchangedFeedShortCircuit(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/rss'
+        settings = Settings()
+        self.scraper = FeedScraper(CategoryConfig(key='tech', name='Technology', feeds=(self.url,)), settings)
+        self.scraper.scheduler = FeedScheduler(settings, Path(self.tmp.name) / 'schedule.json')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def test_second_poll_skips_parsing(self):
+        self.scraper.settings.FEED_FAST_PARSE = False
+        with patch('feedparser.parse', wraps=feedparser.parse) as parse:
+            self.assertEqual(len(self.scraper.extract_articles_from_feed(self.url)), 1)
+            self.assertEqual(self.scraper.extract_articles_from_feed(self.url), [])
+        self.assertEqual(parse.call_count, 1)
+        self.assertTrue(self.scraper.scheduler.state(self.url).digest)
+
+    def test_streaming_parser_digest_short_circuits(self):
+        self.assertEqual(len(self.scraper.extract_articles_from_feed(self.url)), 1)
+        self.assertEqual(self.scraper.extract_articles_from_feed(self.url), [])
+        self.assertEqual(metrics.FEED_UNCHANGED.value(feed=self.url), 1)
+
+if __name__ == '__main__':
+    unittest.main()
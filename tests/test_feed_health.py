@@ -0,0 +1,143 @@
+"""Tests for per-feed circuit breakers and the cycle deadline"""
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from collections import deque
+from unittest.mock import MagicMock, patch
+from src.config.settings import Settings
+from src.pipeline import StreamingPipeline
+from src.scrapers.tech_scraper import TechScraper
+from src.utils.feed_health import FeedHealth, CLOSED, OPEN, HALF_OPEN
+from src.utils.feed_scheduler import FeedScheduler
+
+
+class TestFeedHealth(unittest.TestCase):
+    """Tests for FeedHealth state transitions"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        settings = Settings()
+        settings.FEED_FAILURE_THRESHOLD = 2
+        settings.FEED_BASE_BACKOFF = 100
+        settings.FEED_MAX_BACKOFF = 350
+        self.health = FeedHealth(settings, Path(self.tmp.name) / 'health.json')
+        self.url = 'https://dead.example/rss'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_opens_after_threshold(self):
+        now = 1000.0
+        self.health.record_failure(self.url, 'timeout', now=now)
+        self.assertEqual(self.health.status(self.url, now), CLOSED)
+        self.health.record_failure(self.url, 'timeout', now=now)
+        self.assertEqual(self.health.status(self.url, now), OPEN)
+        self.assertFalse(self.health.allow(self.url, now + 50))
+        self.assertEqual(self.health.status(self.url, now + 101), HALF_OPEN)
+
+    def test_backoff_doubles_and_caps(self):
+        now = 1000.0
+        for _ in range(2):
+            self.health.record_failure(self.url, 'x', now=now)
+        self.assertEqual(self.health.state(self.url).open_until, now + 100)
+        self.health.record_failure(self.url, 'x', now=now)
+        self.assertEqual(self.health.state(self.url).open_until, now + 200)
+        self.health.record_failure(self.url, 'x', now=now)
+        self.assertEqual(self.health.state(self.url).open_until, now + 350)
+
+    def test_success_closes_circuit(self):
+        for _ in range(3):
+            self.health.record_failure(self.url, 'x')
+        self.health.record_success(self.url, 0.2)
+        self.assertEqual(self.health.status(self.url), CLOSED)
+
+    def test_state_persists(self):
+        for _ in range(2):
+            self.health.record_failure(self.url, 'x')
+        self.health.save()
+        reloaded = FeedHealth(Settings(), self.health.state_file)
+        self.assertEqual(reloaded.state(self.url).consecutive_failures, 2)
+
+    def test_snapshot_while_new_feeds_are_recorded(self):
+        done = threading.Event()
+
+        def record():
+            for i in range(5000):
+                self.health.record_success(f'https://feed{i}.example/rss')
+            done.set()
+
+        writer = threading.Thread(target=record)
+        writer.start()
+        while not done.is_set():
+            self.health.snapshot()  # must not see the dict change size
+        writer.join()
+        self.assertEqual(len(self.health.snapshot()), 5000)
+
+    def test_failed_feed_is_not_due_while_its_circuit_is_open(self):
+        scraper = TechScraper()
+        scraper.health = self.health
+        scraper.scheduler = FeedScheduler(Settings(), Path(self.tmp.name) / 'schedule.json')
+        session = MagicMock()
+        session.get.side_effect = ConnectionError('refused')
+        with patch('src.scrapers.base_scraper.get_session', return_value=session):
+            scraper.extract_articles_from_feed(self.url)
+            self.assertFalse(scraper.scheduler.is_due(self.url))  # retried after FEED_MIN_INTERVAL
+            scraper.extract_articles_from_feed(self.url)
+        self.assertFalse(self.health.allow(self.url))
+        self.assertGreaterEqual(scraper.scheduler.next_due([self.url]), self.health.state(self.url).open_until)
+
+
+class TestCycleDeadline(unittest.TestCase):
+    """Feeds outstanding at the deadline are dropped, finished ones kept"""
+
+    def test_slow_feed_dropped_at_deadline(self):
+        def fake_extract(self, url, commits=None):
+            if 'slow' in url:
+                time.sleep(0.5)
+            return [{'title': url, 'url': url}]
+
+        with patch.object(TechScraper, 'extract_articles_from_feed', fake_extract):
+            scraper = TechScraper()
+            scraper.sources = ['https://fast.example/rss', 'https://slow.example/rss']
+            articles = scraper.scrape(deadline=time.monotonic() + 0.2)
+
+        self.assertEqual([a['url'] for a in articles], ['https://fast.example/rss'])
+
+    def test_feed_that_never_meets_the_deadline_backs_off_and_trips_its_breaker(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings = Settings()
+        settings.FEED_FAILURE_THRESHOLD = 2
+        settings.FEED_BASE_BACKOFF = 600
+        settings.DEDUP_WINDOW_SECONDS = 0.05
+        url = 'https://slow.example/rss'
+
+        def slow_fetch(self, feed_url, commits=None):
+            time.sleep(0.3)
+            return []
+
+        scraper = TechScraper()
+        scraper.sources = [url]
+        scraper.health = FeedHealth(settings, Path(tmp.name) / 'health.json')
+        scraper.scheduler = FeedScheduler(settings, Path(tmp.name) / 'schedule.json')
+        def run_cycle():
+            StreamingPipeline({'tech': scraper}, MagicMock(), MagicMock(), settings,
+                              {'Technology': deque()}).run(deadline=time.monotonic() + 0.05)
+
+        with patch.object(TechScraper, '_fetch_and_parse_feed', slow_fetch):
+            self.assertEqual(scraper.due_sources(), [url])
+            run_cycle()
+            self.assertEqual(scraper.due_sources(), [])  # backed off, not polled again at once
+            # Once FEED_MIN_INTERVAL has passed it is cut off again
+            scraper.scheduler.state(url).next_due = 0
+            run_cycle()
+            time.sleep(0.4)  # the late results arrive; they must not close the circuit
+
+        self.assertEqual(scraper.health.status(url), OPEN)
+        self.assertGreaterEqual(scraper.scheduler.next_due([url]), scraper.health.state(url).open_until)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""Tests for the adaptive per-feed polling scheduler"""
+import tempfile
+import unittest
+from pathlib import Path
+from src.config.settings import Settings
+from src.utils.feed_scheduler import FeedScheduler, cache_hint_seconds, estimate_cadence
+
+
+class TestCadenceHelpers(unittest.TestCase):
+    """Unit tests for cadence and cache-hint helpers"""
+
+    def test_estimate_cadence_median_gap(self):
+        self.assertEqual(estimate_cadence([100, 160, 220, 700]), 60)
+
+    def test_estimate_cadence_needs_two_entries(self):
+        self.assertIsNone(estimate_cadence([100]))
+
+    def test_cache_hint_max_age(self):
+        self.assertEqual(cache_hint_seconds({'Cache-Control': 'public, max-age=900'}), 900)
+
+    def test_cache_hint_rss_ttl(self):
+        self.assertEqual(cache_hint_seconds({}, ttl_minutes='30'), 1800)
+
+    def test_no_cache_ignored(self):
+        self.assertIsNone(cache_hint_seconds({'Cache-Control': 'no-cache, max-age=0'}))
+
+
+class TestFeedScheduler(unittest.TestCase):
+    """Tests for FeedScheduler interval decisions"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.settings = Settings()
+        self.settings.SCRAPE_INTERVAL = 3600
+        self.settings.FEED_MIN_INTERVAL = 120
+        self.settings.FEED_MAX_INTERVAL = 21600
+        self.scheduler = FeedScheduler(self.settings, Path(self.tmp.name) / 'schedule.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_unknown_feed_is_due(self):
+        self.assertTrue(self.scheduler.is_due('https://a.com/rss'))
+
+    def test_fast_feed_polled_often(self):
+        now = 1_000_000.0
+        entries = [now - i * 300 for i in range(20)]  # one entry every 5 minutes
+        interval = self.scheduler.record('https://fast.com/rss', {}, entries, now=now)
+        self.assertEqual(interval, 150)
+        self.assertFalse(self.scheduler.is_due('https://fast.com/rss', now + 60))
+        self.assertTrue(self.scheduler.is_due('https://fast.com/rss', now + 151))
+
+    def test_idle_feed_backs_off_to_max(self):
+        url = 'https://slow.com/rss'
+        now = 1_000_000.0
+        entries = [now - 86400]
+        for _ in range(30):
+            interval = self.scheduler.record(url, {}, entries, now=now)
+        self.assertEqual(interval, self.settings.FEED_MAX_INTERVAL)
+
+    def test_undated_feed_with_changing_content_keeps_its_interval(self):
+        url = 'https://undated.com/rss'
+        now = 1_000_000.0
+        for poll in range(30):
+            interval = self.scheduler.record(url, {}, [0.0, 0.0], now=now, digest=f'body-{poll}')
+        self.assertEqual(interval, self.settings.SCRAPE_INTERVAL)
+        for _ in range(30):
+            interval = self.scheduler.record(url, {}, [0.0], now=now, digest='body-29')
+        self.assertEqual(interval, self.settings.FEED_MAX_INTERVAL)
+
+    def test_cache_header_delays_poll(self):
+        now = 1_000_000.0
+        entries = [now - i * 60 for i in range(10)]
+        interval = self.scheduler.record(
+            'https://cached.com/rss', {'Cache-Control': 'max-age=1800'}, entries, now=now
+        )
+        self.assertEqual(interval, 1800)
+
+    def test_validators_become_conditional_headers(self):
+        url = 'https://etag.com/rss'
+        self.scheduler.record(url, {'ETag': '"abc"', 'Last-Modified': 'Mon, 01 Jan 2026 00:00:00 GMT'}, [])
+        headers = self.scheduler.conditional_headers(url)
+        self.assertEqual(headers['If-None-Match'], '"abc"')
+        self.assertIn('If-Modified-Since', headers)
+
+    def test_state_persists(self):
+        now = 1_000_000.0
+        self.scheduler.record('https://a.com/rss', {}, [now, now - 600], now=now)
+        self.scheduler.save()
+        reloaded = FeedScheduler(self.settings, self.scheduler.state_file)
+        self.assertEqual(reloaded.state('https://a.com/rss').cadence, 600)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Tests for the queue-based logging backend"""
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from src.config.settings import Settings
+from src.utils import logger as log_module
+
+
+def make_settings(tmp, **overrides):
+    s = Settings()
+    s.LOG_FILE = str(Path(tmp) / 'automonitor.log')
+    s.LOG_LEVEL = 'INFO'
+    s.LOG_FORMAT = 'text'
+    s.LOG_ROTATE_WHEN = ''
+    s.LOG_MAX_BYTES = 10 * 1024 * 1024
+    s.LOG_BACKUP_COUNT = 2
+    for name, value in overrides.items():
+        setattr(s, name, value)
+    return s
+
+
+class TestLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        log_module.shutdown_logging()
+
+    def tearDown(self):
+        log_module.shutdown_logging()
+        self.tmp.cleanup()
+
+    def emit(self, settings, *messages):
+        log_module.configure_logging(settings)
+        logger = logging.getLogger('src.test_logger')
+        for msg in messages:
+            logger.info(msg)
+        log_module.shutdown_logging()  # drains the queue
+
+    def test_handlers_installed_once(self):
+        settings = make_settings(self.tmp.name)
+        log_module.configure_logging(settings)
+        log_module.configure_logging(settings)
+        log_module.setup_logger('src.a')
+        log_module.setup_logger('src.b')
+        queue_handlers = [h for h in logging.getLogger().handlers
+                          if isinstance(h, logging.handlers.QueueHandler)]
+        self.assertEqual(len(queue_handlers), 1)
+        self.assertEqual(logging.getLogger('src.a').handlers, [])
+
+    def test_json_lines(self):
+        settings = make_settings(self.tmp.name, LOG_FORMAT='json')
+        self.emit(settings, 'hello %s')
+        line = Path(settings.LOG_FILE).read_text().strip().splitlines()[-1]
+        entry = json.loads(line)
+        self.assertEqual(entry['msg'], 'hello %s')
+        self.assertEqual(entry['level'], 'INFO')
+        self.assertEqual(entry['logger'], 'src.test_logger')
+
+    def test_size_rotation_bounds_disk_usage(self):
+        settings = make_settings(self.tmp.name, LOG_MAX_BYTES=500)
+        self.emit(settings, *['x' * 100 for _ in range(50)])
+        files = sorted(p.name for p in Path(self.tmp.name).iterdir())
+        self.assertEqual(files, ['automonitor.log', 'automonitor.log.1', 'automonitor.log.2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
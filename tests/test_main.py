@@ -0,0 +1,84 @@
+"""Tests for the AutoMonitor run loop"""
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+from src.main import AutoMonitor
+
+_tmp = tempfile.TemporaryDirectory()
+
+
+def make_monitor():
+    with patch('src.main.TelegramClient') as mock_client_cls:
+        mock_client_cls.return_value = MagicMock()
+        monitor = AutoMonitor()
+    monitor.settings.SCHEDULER_JITTER = 0
+    # Keep persisted state out of data/
+    monitor.scheduler.state_file = Path(_tmp.name) / 'feed_schedule.json'
+    monitor.health.state_file = Path(_tmp.name) / 'feed_health.json'
+    return monitor
+
+
+class TestRunLoop(unittest.TestCase):
+    """Tests for cycle scheduling and the overlap guard"""
+
+    def test_overlapping_cycle_is_skipped(self):
+        monitor = make_monitor()
+        with patch.object(monitor, '_run_cycle') as run_cycle:
+            monitor._cycle_lock.acquire()
+            try:
+                monitor.run_scrapers()
+            finally:
+                monitor._cycle_lock.release()
+            run_cycle.assert_not_called()
+
+            monitor.run_scrapers()
+            run_cycle.assert_called_once()
+
+    def test_cycle_due_during_a_reload_waits_for_it(self):
+        monitor = make_monitor()
+        with patch.object(monitor, '_run_cycle') as run_cycle:
+            monitor._cycle_lock.acquire()
+            monitor._applying_config.set()
+            cycle = threading.Thread(target=monitor.run_scrapers)
+            cycle.start()
+            time.sleep(0.05)
+            run_cycle.assert_not_called()
+            monitor._cycle_lock.release()
+            monitor._applying_config.clear()
+            cycle.join(timeout=5)
+            run_cycle.assert_called_once()
+
+    def test_next_cycle_delay_is_bounded(self):
+        monitor = make_monitor()
+        with patch.object(monitor.scheduler, 'next_due', return_value=0):
+            self.assertEqual(monitor._seconds_until_next_cycle(), 1.0)
+        with patch.object(monitor.scheduler, 'next_due', return_value=float('inf')):
+            self.assertEqual(monitor._seconds_until_next_cycle(), monitor.settings.FEED_MAX_INTERVAL)
+
+    def test_stop_requested_ends_cycle_early(self):
+        monitor = make_monitor()
+        monitor._stopping.set()
+        scraper = MagicMock()
+        monitor.scrapers = {'tech': scraper}
+        monitor.run_scrapers()
+        scraper.extract_articles_from_feed.assert_not_called()
+
+
+    def test_flush_leaves_shared_resources_to_a_cycle_still_running(self):
+        monitor = make_monitor()
+        monitor.archive, monitor.enricher = MagicMock(), MagicMock()
+        with patch('src.main.SENT_CACHE_FILE', Path(_tmp.name) / 'sent_cache.json'):
+            monitor.flush(cycle_running=True)
+            monitor.archive.close.assert_not_called()
+            monitor.enricher.close.assert_not_called()
+            self.assertTrue(monitor.health.state_file.exists())
+            monitor.flush()
+        monitor.archive.close.assert_called_once()
+        monitor.enricher.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
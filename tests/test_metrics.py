@@ -0,0 +1,54 @@
+"""Tests for the in-process metrics registry and /metrics endpoint"""
+import tempfile
+import unittest
+from pathlib import Path
+from src.config.settings import Settings
+from src.utils.feed_health import FeedHealth
+from src.utils.metrics import Registry, create_app, health_collector
+
+
+class TestRegistry(unittest.TestCase):
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        hist = registry.histogram('fetch_seconds', 'Fetch latency', ['feed'], buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            hist.observe(value, feed='a')
+        text = registry.render()
+        self.assertIn('# TYPE fetch_seconds histogram', text)
+        self.assertIn('fetch_seconds_bucket{feed="a",le="0.1"} 1', text)
+        self.assertIn('fetch_seconds_bucket{feed="a",le="1"} 3', text)
+        self.assertIn('fetch_seconds_bucket{feed="a",le="+Inf"} 4', text)
+        self.assertIn('fetch_seconds_count{feed="a"} 4', text)
+        self.assertIn('fetch_seconds_sum{feed="a"} 4.25', text)
+
+    def test_counter_labels_escaped(self):
+        registry = Registry()
+        counter = registry.counter('bytes_total', 'Bytes', ['feed'])
+        counter.inc(10, feed='https://x.example/?q="a"')
+        counter.inc(5, feed='https://x.example/?q="a"')
+        self.assertIn('bytes_total{feed="https://x.example/?q=\\"a\\""} 15', registry.render())
+
+    def test_health_snapshot_exported(self):
+        settings = Settings()
+        settings.FEED_FAILURE_THRESHOLD = 1
+        with tempfile.TemporaryDirectory() as tmp:
+            health = FeedHealth(settings, Path(tmp) / 'health.json')
+        health.record_failure('https://dead.example/rss', 'timeout', 5.0)
+        registry = Registry()
+        registry.register_collector(health_collector(health))
+        text = registry.render()
+        self.assertIn('automonitor_feed_circuit_state{feed="https://dead.example/rss"} 2', text)
+        self.assertIn('automonitor_feed_consecutive_failures{feed="https://dead.example/rss"} 1', text)
+
+    def test_metrics_endpoint(self):
+        registry = Registry()
+        registry.gauge('up', 'Up').set(1)
+        response = create_app(registry).test_client().get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        self.assertIn(b'up 1', response.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
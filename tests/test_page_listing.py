@@ -0,0 +1,136 @@
+"""Tests for HTML listing pages scraped with CSS selectors"""
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+from pydantic import ValidationError
+from src.config.feeds import CategoryConfig, PageSelectors
+from src.config.settings import Settings
+from src.scrapers.feed_scraper import FeedScraper
+from src.scrapers.page_listing import PageListing, parse_page
+from src.utils.feed_scheduler import FeedScheduler
+
+ITEM = """<li class="story">
+  <a class="headline" href="/news/{n}">  Story
+     number {n} </a>
+  <p class="teaser">Teaser for story {n}.</p>
+  <img src="/img/{n}.jpg">
+  <time datetime="2024-01-0{n}T10:00:00Z">January {n}</time>
+</li>"""
+
+SELECTORS = PageSelectors(item='li.story', link='a.headline', description='.teaser',
+                          image='img', date='time')
+
+
+def render(*numbers):
+    items = '\n'.join(ITEM.format(n=n) for n in numbers)
+    return (f'<html><head><title>Newsroom</title></head>'
+            f'<body><nav><a href="/">Home</a></nav><ul>{items}</ul></body></html>').encode()
+
+
+class TestPageListing(unittest.TestCase):
+
+    def test_extracts_fields_with_absolute_urls(self):
+        listing = PageListing(SELECTORS)
+        articles = listing.extract(parse_page(render(1, 2), 'https://example.com/newsroom'), 10)
+        self.assertEqual([a['url'] for a in articles],
+                         ['https://example.com/news/1', 'https://example.com/news/2'])
+        first = articles[0]
+        self.assertEqual(first['title'], 'Story number 1')
+        self.assertEqual(first['description'], 'Teaser for story 1.')
+        self.assertEqual(first['image'], 'https://example.com/img/1.jpg')
+        self.assertEqual(first['published'], '2024-01-01T10:00:00Z')
+        self.assertEqual(first['published_ts'], 1704103200.0)
+
+    def test_only_new_items_are_extracted(self):
+        listing = PageListing(SELECTORS)
+        first = listing.extract(parse_page(render(1, 2), 'https://example.com/'), 10)
+        self.assertEqual(len(first), 2)
+        listing.remember(listing.extracted)
+        with patch.object(listing, '_article', wraps=listing._article) as detail:
+            articles = listing.extract(parse_page(render(3, 1, 2), 'https://example.com/'), 10)
+        self.assertEqual([a['url'] for a in articles], ['https://example.com/news/3'])
+        self.assertEqual(detail.call_count, 1)
+        self.assertEqual(listing.items, 3)
+
+    def test_items_over_the_limit_wait_for_the_next_poll(self):
+        listing = PageListing(SELECTORS)
+        document = parse_page(render(1, 2, 3), 'https://example.com/')
+        first = listing.extract(document, 2)
+        self.assertEqual(len(first), 2)
+        listing.remember(listing.extracted)
+        self.assertEqual([a['url'] for a in listing.extract(document, 2)], ['https://example.com/news/3'])
+
+    def test_invalid_selector_is_rejected(self):
+        with self.assertRaises(ValidationError):
+            PageSelectors(item='li[')
+        with self.assertRaises(ValidationError):
+            CategoryConfig(key='x', name='X', feeds=({'url': 'https://example.com', 'page': {'link': 'a'}},))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    pages = [render(1, 2)]
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        body = self.pages[min(self.requests, len(self.pages)) - 1]
+        etag = f'"{hash(body)}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPageScraping(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/newsroom'
+        settings = Settings()
+        feeds = ({'url': self.url, 'page': SELECTORS.model_dump()},)
+        self.scraper = FeedScraper(CategoryConfig(key='tech', name='Technology', feeds=feeds), settings)
+        self.scraper.scheduler = FeedScheduler(settings, Path(self.tmp.name) / 'schedule.json')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def test_polls_are_conditional_and_incremental(self):
+        _Handler.requests = 0
+        _Handler.pages = [render(1, 2), render(1, 2), render(3, 1, 2)]
+        first = self.scraper.extract_articles_from_feed(self.url)
+        self.assertEqual([a['url'] for a in first], [f'{self.url[:-9]}/news/1', f'{self.url[:-9]}/news/2'])
+        with patch('src.scrapers.base_scraper.parse_page') as parse:
+            self.assertEqual(self.scraper.extract_articles_from_feed(self.url), [])  # 304
+        parse.assert_not_called()
+        third = self.scraper.extract_articles_from_feed(self.url)
+        self.assertEqual([a['title'] for a in third], ['Story number 3'])
+        self.assertTrue(self.scraper.scheduler.state(self.url).etag)
+
+    def test_unchanged_body_is_not_parsed(self):
+        _Handler.requests = 0
+        _Handler.pages = [render(1)]
+        self.assertEqual(len(self.scraper.extract_articles_from_feed(self.url)), 1)
+        self.scraper.scheduler.state(self.url).etag = None  # as if the server sent none
+        with patch('src.scrapers.base_scraper.parse_page') as parse:
+            self.assertEqual(self.scraper.extract_articles_from_feed(self.url), [])
+        parse.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,279 @@
+"""Tests for the streaming scrape-to-delivery pipeline"""
+import time
+import unittest
+from collections import deque
+from unittest.mock import MagicMock
+from src.config.feeds import SubscriptionConfig
+from src.config.settings import Settings
+from src.pipeline import StreamingPipeline
+from src.utils.deduplicator import ArticleDeduplicator
+from src.utils.subscriptions import SubscriptionEngine
+
+
+class FakeScraper:
+    """Minimal scraper: fixed articles per feed, optional per-feed delay"""
+
+    def __init__(self, category, feeds, delays=None):
+        self.category = category
+        self.feeds = feeds
+        self.sources = list(feeds)
+        self.delays = delays or {}
+        # Feeds whose deferred state updates were applied, and those cut off
+        self.committed = []
+        self.cutoffs = []
+
+    def due_sources(self):
+        return list(self.sources)
+
+    def extract_articles_from_feed(self, url, commits=None):
+        time.sleep(self.delays.get(url, 0))
+        if commits is not None:
+            commits.append(lambda: self.committed.append(url))
+        return self.feeds[url]
+
+    def record_cutoff(self, url):
+        self.cutoffs.append(url)
+
+
+def make_settings():
+    s = Settings()
+    s.ENABLE_LLM_DEDUP = False
+    s.OPENAI_API_KEY = ''
+    s.DEDUP_SIMILARITY_THRESHOLD = 0.9
+    s.DEDUP_WINDOW_SECONDS = 0.05
+    s.MAX_SENDS_PER_CATEGORY = 5
+    return s
+
+
+def make_client():
+    client = MagicMock()
+    client.prepare_article.side_effect = lambda category, article: (-100, article['title'])
+    client.deliver.return_value = True
+    return client
+
+
+class TestStreamingPipeline(unittest.TestCase):
+
+    def run_pipeline(self, scrapers, sent_urls=None, settings=None, deadline=None):
+        settings = settings or make_settings()
+        client = make_client()
+        sent_urls = sent_urls or {s.category: deque(maxlen=500) for s in scrapers.values()}
+        pipeline = StreamingPipeline(
+            scrapers, ArticleDeduplicator(settings), client, settings, sent_urls
+        )
+        sent = pipeline.run(deadline)
+        return sent, client, sent_urls
+
+    def test_new_articles_are_sent_and_remembered(self):
+        scraper = FakeScraper('Technology', {
+            'f1': [{'title': 'Quantum chip unveiled', 'url': 'https://a.com/1'}],
+            'f2': [{'title': 'Rust 2.0 released today', 'url': 'https://b.com/2'}],
+        })
+        sent, client, sent_urls = self.run_pipeline({'tech': scraper})
+        self.assertEqual(sent, {'Technology': 2})
+        self.assertIn('https://a.com/1', sent_urls['Technology'])
+        self.assertIn('https://b.com/2', sent_urls['Technology'])
+
+    def test_recently_sent_and_cross_feed_duplicates_filtered(self):
+        scraper = FakeScraper('Technology', {
+            'f1': [{'title': 'Old story', 'url': 'https://a.com/old'},
+                   {'title': 'Fresh story', 'url': 'https://a.com/new'}],
+            'f2': [{'title': 'Fresh story', 'url': 'https://a.com/new'}],
+        })
+        sent_urls = {'Technology': deque(['https://a.com/old'], maxlen=500)}
+        sent, client, _ = self.run_pipeline({'tech': scraper}, sent_urls)
+        self.assertEqual(sent, {'Technology': 1})
+
+    def test_same_story_in_window_is_merged(self):
+        scraper = FakeScraper('Science', {
+            'f1': [{'title': 'Mars water ice confirmed', 'url': 'https://a.com/1'}],
+            'f2': [{'title': 'Mars water ice confirmed', 'url': 'https://b.com/1'}],
+        })
+        sent, client, sent_urls = self.run_pipeline({'science': scraper})
+        self.assertEqual(sent, {'Science': 1})
+        self.assertEqual(len(sent_urls['Science']), 2)
+
+    def test_send_cap_marks_overflow_as_sent(self):
+        articles = [{'title': f'Distinct headline number {i} about topic {i * 7}',
+                     'url': f'https://a.com/{i}'} for i in range(8)]
+        settings = make_settings()
+        settings.DEDUP_SIMILARITY_THRESHOLD = 1.01  # never merge
+        sent, client, sent_urls = self.run_pipeline(
+            {'ai': FakeScraper('AI & Machine Learning', {'f1': articles})}, settings=settings
+        )
+        self.assertEqual(sent, {'AI & Machine Learning': 5})
+        self.assertEqual(len(sent_urls['AI & Machine Learning']), 8)
+
+    def test_fast_feed_delivered_before_slow_feed_returns(self):
+        scraper = FakeScraper('Technology', {
+            'fast': [{'title': 'Fast news', 'url': 'https://a.com/fast'}],
+            'slow': [{'title': 'Slow news', 'url': 'https://a.com/slow'}],
+        }, delays={'slow': 0.6})
+        started = time.monotonic()
+        delivered_at = {}
+        settings = make_settings()
+        client = make_client()
+
+        def deliver(channel_id, category, article, text):
+            delivered_at[article['url']] = time.monotonic() - started
+            return True
+        client.deliver.side_effect = deliver
+
+        sent_urls = {'Technology': deque(maxlen=500)}
+        StreamingPipeline({'tech': scraper}, ArticleDeduplicator(settings), client,
+                          settings, sent_urls).run()
+        self.assertLess(delivered_at['https://a.com/fast'], 0.5)
+        self.assertGreaterEqual(delivered_at['https://a.com/slow'], 0.6)
+
+    def test_deadline_drops_outstanding_feeds(self):
+        scraper = FakeScraper('Technology', {
+            'fast': [{'title': 'Fast news', 'url': 'https://a.com/fast'}],
+            'slow': [{'title': 'Slow news', 'url': 'https://a.com/slow'}],
+        }, delays={'slow': 1.0})
+        sent, client, sent_urls = self.run_pipeline(
+            {'tech': scraper}, deadline=time.monotonic() + 0.3
+        )
+        self.assertEqual(sent, {'Technology': 1})
+        self.assertNotIn('https://a.com/slow', sent_urls['Technology'])
+        # The dropped feed's validators / schedule are left as they were
+        time.sleep(1)
+        self.assertEqual(scraper.committed, ['fast'])
+        self.assertEqual(scraper.cutoffs, ['slow'])
+
+    def test_worker_polls_owned_feeds_and_sends_only_claimed_articles(self):
+        scraper = FakeScraper('Technology', {
+            'mine': [{'title': 'Quantum chip unveiled', 'url': 'https://a.com/1'},
+                     {'title': 'Rust 2.0 released today', 'url': 'https://a.com/2'}],
+            'theirs': [{'title': 'Mars water ice confirmed', 'url': 'https://b.com/1'}],
+        })
+        ledger = MagicMock()
+        # Another worker already claimed https://a.com/2
+        ledger.claim.side_effect = lambda category, urls: {u for u in urls if u != 'https://a.com/2'}
+        settings = make_settings()
+        client = make_client()
+        sent_urls = {'Technology': deque(maxlen=500)}
+        sent = StreamingPipeline(
+            {'tech': scraper}, ArticleDeduplicator(settings), client, settings, sent_urls,
+            owns=lambda src: src == 'mine', ledger=ledger,
+        ).run()
+        self.assertEqual(sent, {'Technology': 1})
+        self.assertEqual([c.args[2]['url'] for c in client.deliver.call_args_list], ['https://a.com/1'])
+        ledger.mark_delivered.assert_called_once_with('Technology', ['https://a.com/1'])
+
+    def test_worker_settles_claims_of_stories_it_does_not_send(self):
+        scraper = FakeScraper('Technology', {
+            'f1': [{'title': 'Quantum chip unveiled', 'url': 'https://a.com/1'},
+                   {'title': 'Rust 2.0 released today', 'url': 'https://a.com/2'}],
+        })
+        ledger = MagicMock()
+        ledger.claim.side_effect = lambda category, urls: set(urls)
+        settings = make_settings()
+        settings.MAX_SENDS_PER_CATEGORY = 1
+        settings.RANKING = 'off'
+        StreamingPipeline({'tech': scraper}, ArticleDeduplicator(settings), make_client(), settings,
+                          {'Technology': deque(maxlen=500)}, ledger=ledger).run()
+        self.assertCountEqual([c.args for c in ledger.mark_delivered.call_args_list],
+                              [('Technology', ['https://a.com/1']), ('Technology', ['https://a.com/2'])])
+
+    def test_new_articles_are_archived_per_feed(self):
+        scraper = FakeScraper('Technology', {
+            'f1': [{'title': 'Old story', 'url': 'https://a.com/old'},
+                   {'title': 'Fresh story', 'url': 'https://a.com/new'}],
+        })
+        settings = make_settings()
+        archive = MagicMock()
+        sent_urls = {'Technology': deque(['https://a.com/old'], maxlen=500)}
+        StreamingPipeline({'tech': scraper}, ArticleDeduplicator(settings), make_client(), settings,
+                          sent_urls, archive=archive).run()
+        archive.add.assert_called_once()
+        category, articles = archive.add.call_args.args
+        self.assertEqual((category, [a['url'] for a in articles]), ('Technology', ['https://a.com/new']))
+
+    def test_only_stories_about_to_be_sent_are_enriched(self):
+        scraper = FakeScraper('Technology', {
+            'f1': [{'title': 'Kernel release notes', 'url': 'https://a.com/1'},
+                   {'title': 'Quarterly chip earnings', 'url': 'https://a.com/2'}],
+        })
+        settings = make_settings()
+        settings.MAX_SENDS_PER_CATEGORY = 1
+        enricher = MagicMock()
+        enricher.enrich.return_value = 0
+        StreamingPipeline({'tech': scraper}, ArticleDeduplicator(settings), make_client(), settings,
+                          {'Technology': deque(maxlen=500)}, enricher=enricher).run()
+        stories, timeout = enricher.enrich.call_args.args
+        self.assertEqual([a['url'] for a in stories], ['https://a.com/1'])
+        self.assertLessEqual(timeout, settings.ENRICH_TIMEOUT)
+
+    def test_ranking_sends_the_best_stories_first(self):
+        now = time.time()
+        scraper = FakeScraper('Technology', {
+            'f1': [{'title': 'Old chip story', 'url': 'https://a.com/old', 'published_ts': now - 86400}],
+            'f2': [{'title': 'New kernel story', 'url': 'https://b.com/new', 'published_ts': now - 60},
+                   {'title': 'Undated rumour', 'url': 'https://b.com/undated'}],
+        })
+        settings = make_settings()
+        settings.MAX_SENDS_PER_CATEGORY = 2
+        sent, client, sent_urls = self.run_pipeline({'tech': scraper}, settings=settings)
+        self.assertEqual([c.args[2]['url'] for c in client.deliver.call_args_list],
+                         ['https://b.com/new', 'https://b.com/undated'])
+        self.assertIn('https://a.com/old', sent_urls['Technology'])
+
+    def test_global_ranking_shares_one_budget(self):
+        now = time.time()
+        scrapers = {
+            'tech': FakeScraper('Technology', {'f1': [
+                {'title': f'Tech story {i}', 'url': f'https://a.com/{i}', 'published_ts': now - i * 3600}
+                for i in range(3)]}),
+            'science': FakeScraper('Science', {'f2': [
+                {'title': 'Fresh comet sighting', 'url': 'https://b.com/1', 'published_ts': now - 1800}]}),
+        }
+        settings = make_settings()
+        settings.RANKING = 'global'
+        settings.MAX_SENDS_PER_CYCLE = 2
+        sent, client, _ = self.run_pipeline(scrapers, settings=settings)
+        self.assertEqual(sent, {'Technology': 1, 'Science': 1})
+        self.assertEqual([c.args[2]['url'] for c in client.deliver.call_args_list],
+                         ['https://a.com/0', 'https://b.com/1'])
+
+    def test_new_articles_feed_the_trending_detector(self):
+        scraper = FakeScraper('Technology', {
+            'f1': [{'title': 'Old story', 'url': 'https://a.com/old'},
+                   {'title': 'Fresh story', 'url': 'https://a.com/new'}],
+        })
+        settings = make_settings()
+        trending = MagicMock()
+        trending.trend.return_value = 0.0
+        trending.rising.return_value = []
+        sent_urls = {'Technology': deque(['https://a.com/old'], maxlen=500)}
+        StreamingPipeline({'tech': scraper}, ArticleDeduplicator(settings), make_client(), settings,
+                          sent_urls, trending=trending).run()
+        self.assertEqual([c.args[0]['url'] for c in trending.observe.call_args_list], ['https://a.com/new'])
+        trending.trend.assert_called()
+
+    def test_subscription_matches_are_routed_to_their_channels(self):
+        scraper = FakeScraper('Technology', {
+            'f1': [{'title': 'Open LLM beats benchmarks', 'url': 'https://a.com/1'},
+                   {'title': 'Rust 2.0 released today', 'url': 'https://a.com/2'}],
+        })
+        subscriptions = SubscriptionEngine([
+            SubscriptionConfig(key='ai', channel=-200, keywords=('llm',)),
+            SubscriptionConfig(key='same', channel=-100, keywords=('llm',)),  # the category channel
+        ])
+        settings = make_settings()
+        client = make_client()
+        client.prepare_article.side_effect = lambda category, article, channel_id=None: (
+            channel_id or -100, article['title'])
+        sent_urls = {'Technology': deque(maxlen=500)}
+        pipeline = StreamingPipeline(
+            {'tech': scraper}, ArticleDeduplicator(settings), client, settings, sent_urls,
+            subscriptions=subscriptions,
+        )
+        self.assertEqual(pipeline.run(), {'Technology': 2})
+        deliveries = sorted((c.args[0], c.args[2]['url']) for c in client.deliver.call_args_list)
+        self.assertEqual(deliveries, [(-200, 'https://a.com/1'), (-100, 'https://a.com/1'),
+                                      (-100, 'https://a.com/2')])
+        self.assertEqual(pipeline.routed, {'ai': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Tests for sampled per-cycle profiling"""
+import pstats
+import tempfile
+import threading
+import tracemalloc
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from src.config.settings import Settings
+from src.utils import profiling
+from src.utils.profiling import CycleProfiler, traced
+
+
+def make_profiler(tmp, every):
+    s = Settings()
+    s.PROFILE_EVERY = every
+    s.PROFILE_DIR = str(Path(tmp) / 'profiles')
+    s.PROFILE_TOP = 10
+    return CycleProfiler(s)
+
+
+def busy_worker():
+    return sum(i * i for i in range(20000))
+
+
+class TestCycleProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_cycles(self, profiler, n):
+        for _ in range(n):
+            with profiler.cycle():
+                worker = threading.Thread(target=traced(busy_worker))
+                worker.start()
+                worker.join()
+
+    def test_writes_prof_and_report_including_worker_threads(self):
+        profiler = make_profiler(self.tmp.name, every=1)
+        self.run_cycles(profiler, 1)
+
+        profs = list(Path(profiler.directory).glob('*.prof'))
+        reports = list(Path(profiler.directory).glob('*.txt'))
+        self.assertEqual(len(profs), 1)
+        self.assertEqual(len(reports), 1)
+        if profiling.PER_THREAD_PROFILING:
+            functions = {name for _, _, name in pstats.Stats(str(profs[0])).stats}
+            self.assertIn('busy_worker', functions)
+        report = reports[0].read_text(encoding='utf-8')
+        self.assertIn('allocation sites', report)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_samples_every_nth_cycle(self):
+        profiler = make_profiler(self.tmp.name, every=3)
+        self.run_cycles(profiler, 7)  # cycles 1, 4 and 7
+        self.assertEqual(len(list(Path(profiler.directory).glob('*.prof'))), 3)
+
+    def test_workers_run_unprofiled_where_profilers_are_exclusive(self):
+        profiler = make_profiler(self.tmp.name, every=1)
+        with patch.object(profiling, 'PER_THREAD_PROFILING', False):
+            with profiler.cycle():
+                self.assertIs(traced(busy_worker), busy_worker)
+        self.assertEqual(len(list(Path(profiler.directory).glob('*.prof'))), 1)
+
+    def test_off_by_default_and_toggled_at_runtime(self):
+        profiler = make_profiler(self.tmp.name, every=0)
+        self.run_cycles(profiler, 2)
+        self.assertFalse(Path(profiler.directory).exists())
+        self.assertIs(traced(busy_worker), busy_worker)
+
+        profiler.toggle()
+        self.run_cycles(profiler, 2)
+        profiler.toggle()
+        self.run_cycles(profiler, 2)
+        self.assertEqual(len(list(Path(profiler.directory).glob('*.prof'))), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""Tests for story scoring and top-k selection"""
+import time
+import unittest
+from src.config.settings import Settings
+from src.utils.article import ArticleRecord
+from src.utils.ranking import StoryRanker
+
+
+class _Trending:
+    def trend(self, article):
+        return 1.0 if 'comet' in article['title'].lower() else 0.0
+
+
+class TestStoryRanker(unittest.TestCase):
+
+    def setUp(self):
+        self.settings = Settings()
+        self.settings.RANK_HALF_LIFE_HOURS = 6
+        self.now = time.time()
+
+    def story(self, title, hours_old, source_count=1):
+        return ArticleRecord(title=title, url=f'https://example.com/{title}',
+                             published_ts=self.now - hours_old * 3600, source_count=source_count)
+
+    def test_score_factors(self):
+        ranker = StoryRanker(self.settings)
+        fresh = ranker.score(self.story('a', 0), now=self.now)
+        self.assertAlmostEqual(ranker.score(self.story('a', 6), now=self.now), fresh / 2)
+        self.assertAlmostEqual(ranker.score(self.story('a', 0), weight=2, now=self.now), fresh * 2)
+        self.assertAlmostEqual(ranker.score(self.story('a', 0, source_count=4), now=self.now),
+                               fresh * (1 + 2 * self.settings.RANK_SOURCE_BOOST))
+
+    def test_trending_hook_lifts_a_story(self):
+        ranker = StoryRanker(self.settings, trending=_Trending())
+        stories = [('Science', self.story('Quiet lab news', 1)), ('Science', self.story('Comet seen', 3))]
+        chosen = ranker.select(stories, per_category=1)
+        self.assertEqual([a['title'] for _, a in chosen], ['Comet seen'])
+
+    def test_select_respects_category_cap_and_budget(self):
+        ranker = StoryRanker(self.settings)
+        stories = [('Tech', self.story(f't{i}', i)) for i in range(5)] + [('AI', self.story('a0', 2.5))]
+        chosen = ranker.select(stories, per_category=2)
+        self.assertEqual([a['title'] for _, a in chosen], ['t0', 't1', 'a0'])
+        chosen = ranker.select(stories, per_category=5, budget=3)
+        self.assertEqual([a['title'] for _, a in chosen], ['t0', 't1', 't2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
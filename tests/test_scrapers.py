@@ -6,6 +6,9 @@ from src.scrapers.science_scraper import ScienceScraper
 from src.scrapers.ai_scraper import AIScraper
 from src.scrapers.military_scraper import MilitaryScraper
 from src.config.settings import Settings
+from src.config.feeds import parse_categories, default_categories
+from src.scrapers.feed_scraper import FeedScraper
+from src.scrapers.registry import ScraperRegistry
 from src.utils.deduplicator import ArticleDeduplicator, _title_similarity
 
 
@@ -252,5 +255,47 @@ class TestMilitaryScraper(unittest.TestCase):
         self.assertIsInstance(articles, list)
 
 
+class TestFeedRegistry(unittest.TestCase):
+    """Tests for the declarative feeds.yaml registry"""
+
+    RAW = {
+        'categories': {
+            'sports': {
+                'name': 'Sports',
+                'channel': -100123,
+                'emoji': '⚽',
+                'feeds': [
+                    'https://a.example/rss',
+                    {'url': 'https://b.example/rss', 'timeout': 3, 'max_articles': 5},
+                    {'url': 'https://c.example/rss', 'enabled': False},
+                ],
+            },
+            'finance': {'name': 'Finance', 'enabled': False, 'feeds': ['https://d.example/rss']},
+        }
+    }
+
+    def test_bundled_file_declares_all_categories(self):
+        categories = default_categories()
+        self.assertEqual(set(categories), {'tech', 'science', 'ai', 'military'})
+        self.assertEqual(categories['tech'].sources, Settings.TECH_NEWS_SOURCES)
+
+    def test_parse_feed_options(self):
+        sports = parse_categories(self.RAW)['sports']
+        self.assertEqual(sports.sources, ['https://a.example/rss', 'https://b.example/rss'])
+        self.assertEqual(sports.channel, -100123)
+        self.assertEqual(sports.feeds[1].timeout, 3)
+        self.assertEqual(sports.label, 'Sports')
+
+    def test_registry_is_lazy_and_skips_disabled(self):
+        registry = ScraperRegistry(parse_categories(self.RAW), Settings())
+        self.assertEqual(list(registry), ['sports'])
+        self.assertEqual(registry._scrapers, {})
+        self.assertEqual(registry.all_sources(), ['https://a.example/rss', 'https://b.example/rss'])
+        scraper = registry['sports']
+        self.assertIsInstance(scraper, FeedScraper)
+        self.assertIs(registry['sports'], scraper)
+        self.assertEqual(scraper.category, 'Sports')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,102 @@
+"""Tests for keyword / regex subscriptions"""
+import os
+import unittest
+from unittest.mock import patch
+from pydantic import ValidationError
+from src.config.feeds import SubscriptionConfig, parse_config
+from src.utils.subscriptions import SubscriptionEngine, required_literal
+
+
+def sub(key, channel=-1, **filters):
+    return SubscriptionConfig(key=key, channel=channel, **filters)
+
+
+class TestSubscriptionEngine(unittest.TestCase):
+
+    def test_keywords_match_whole_words_and_prefixes(self):
+        engine = SubscriptionEngine([
+            sub('ai', keywords=('AI', 'machine learning')),
+            sub('drones', channel=-2, keywords=('drone*',)),
+        ])
+        titles = {
+            'New AI chip': ['ai'],
+            'Said the chair': [],                      # "ai" inside a word
+            'Advances in Machine   Learning': ['ai'],  # whitespace normalized
+            'Delivery drones take off': ['drones'],
+            'AI-guided drone swarms': ['ai', 'drones'],
+        }
+        for title, expected in titles.items():
+            with self.subTest(title=title):
+                self.assertEqual([s.key for s in engine.match({'title': title})], expected)
+
+    def test_patterns_are_prefiltered_by_their_literal(self):
+        engine = SubscriptionEngine([
+            sub('llm', patterns=(r'LLM[- ]inference',)),
+            sub('cve', channel=-2, patterns=(r'CVE-\d{4}-\d+',)),
+            sub('any', channel=-3, patterns=(r'(quantum|fusion) leap',)),
+        ])
+        self.assertEqual([s.key for s in engine.match({'title': 'Faster LLM-inference'})], ['llm'])
+        self.assertEqual([s.key for s in engine.match({'description': 'Fixes cve-2024-1234'})], ['cve'])
+        self.assertEqual([s.key for s in engine.match({'title': 'A fusion leap'})], ['any'])
+        self.assertEqual(engine.match({'title': 'Inference costs drop'}), [])
+
+    def test_patterns_see_the_original_text(self):
+        engine = SubscriptionEngine([
+            sub('ai', patterns=(r'(?-i:\bAI\b)',)),
+            sub('spaced', channel=-2, patterns=(r'GPU  shortage',)),
+            sub('lines', channel=-3, patterns=(r'(?m)^Update:',)),
+        ])
+        self.assertEqual([s.key for s in engine.match({'title': 'New AI chips'})], ['ai'])
+        self.assertEqual(engine.match({'title': 'Ai Weiwei opens a show'}), [])
+        self.assertEqual([s.key for s in engine.match({'title': 'The GPU  shortage'})], ['spaced'])
+        self.assertEqual(engine.match({'title': 'The GPU shortage'}), [])
+        article = {'title': 'Outage', 'description': 'Intro\nUpdate: fixed'}
+        self.assertEqual([s.key for s in engine.match(article)], ['lines'])
+
+    def test_required_literal(self):
+        self.assertEqual(required_literal(r'LLM[- ]inference'), 'inference')
+        self.assertEqual(required_literal(r'CVE-\d+'), 'cve-')
+        self.assertEqual(required_literal(r'colou?r scheme'), 'r scheme')
+        self.assertIsNone(required_literal(r'(foo|bar)baz'))
+        self.assertEqual(required_literal(r'\d+ GB'), ' gb')
+        self.assertIsNone(required_literal(r'\d+ G'))  # too short to be worth it
+
+    def test_required_literal_skips_escape_arguments_and_class_members(self):
+        self.assertEqual(required_literal(r'\x41I chips'), 'i chips')
+        self.assertEqual(required_literal(r'\u00e9clair'), 'clair')
+        self.assertEqual(required_literal(r'\N{LATIN SMALL LETTER E WITH ACUTE}clair'), 'clair')
+        self.assertEqual(required_literal(r'\101I chips'), 'i chips')
+        self.assertEqual(required_literal(r'[^]]launch'), 'launch')
+        self.assertEqual(required_literal(r'[]x]launch'), 'launch')
+        engine = SubscriptionEngine([sub('chips', patterns=(r'\x41I chips',))])
+        self.assertEqual([s.key for s in engine.match({'title': 'New AI chips'})], ['chips'])
+
+    def test_category_restriction_and_inactive_subscriptions(self):
+        engine = SubscriptionEngine([
+            sub('sci', keywords=('mars',), categories=('science',)),
+            sub('off', keywords=('mars',), enabled=False),
+            sub('nochannel', channel=0, keywords=('mars',)),
+        ], category_names={'science': 'Science'})
+        self.assertEqual(len(engine), 1)
+        self.assertEqual([s.key for s in engine.match({'title': 'Mars rover'}, 'Science')], ['sci'])
+        self.assertEqual(engine.match({'title': 'Mars rover'}, 'Technology'), [])
+
+
+class TestSubscriptionConfig(unittest.TestCase):
+
+    def test_parse_resolves_channel_env(self):
+        raw = {'subscriptions': {'ai': {'channel_env': 'AI_CHANNEL', 'keywords': 'LLM'}}}
+        with patch.dict(os.environ, {'AI_CHANNEL': '-100123'}):
+            config = parse_config(raw)
+        self.assertEqual(config.subscriptions['ai'].channel, -100123)
+        self.assertEqual(config.subscriptions['ai'].keywords, ('LLM',))
+
+    def test_invalid_subscriptions_rejected(self):
+        with self.assertRaises(ValidationError):
+            parse_config({'subscriptions': {'empty': {'channel': -1}}})
+        with self.assertRaises(ValidationError):
+            parse_config({'subscriptions': {'bad': {'channel': -1, 'patterns': ['(unclosed']}}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""Tests for TelegramClient delivery against the local fake Bot API"""
+import unittest
+from unittest.mock import patch
+from benchmarks.fake_telegram import FakeTelegramServer
+from src.config.settings import Settings
+from src.telegram.client import TelegramClient
+
+
+class TestTelegramDelivery(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeTelegramServer(token='test-token', chat_rate=0, global_rate=0).start()
+        self.addCleanup(self.server.shutdown)
+
+    def make_client(self, **overrides):
+        settings = Settings()
+        settings.TELEGRAM_BOT_TOKEN = 'test-token'
+        settings.TELEGRAM_API_BASE = self.server.base_url
+        for name, value in overrides.items():
+            setattr(settings, name, value)
+        client = TelegramClient(settings)
+        self.assertTrue(client._bot_ready())
+        return client
+
+    def test_delivers_photo_and_text_through_api_base(self):
+        client = self.make_client()
+        article = {'title': 'Chip news', 'url': 'https://a.com/1', 'image': 'https://a.com/1.jpg'}
+        self.assertTrue(client.deliver(-100, 'Technology', article, 'caption'))
+        self.assertTrue(client.deliver(-100, 'Technology', {'title': 'No image'}, 'text'))
+        sent = list(self.server.messages[-100].values())
+        self.assertIn('photo', sent[0])
+        self.assertEqual(sent[1]['text'], 'text')
+
+    def test_rate_limit_retried_after_retry_after(self):
+        self.server.chat_rate = 1
+        client = self.make_client()
+        with patch('src.telegram.client.time.sleep') as sleep:
+            # Second send in the same second is answered with 429 retry_after=1;
+            # once "slept", the bucket refills on the next real attempt
+            sleep.side_effect = lambda s: self.server._chat_buckets[-100].take(-1)
+            client._send_message(-100, 'first')
+            client._send_message(-100, 'second')
+        sleep.assert_called_once_with(1.0)
+        self.assertEqual(self.server.sent_count(), 2)
+        self.assertEqual(self.server.stats['429'], 1)
+
+    def test_long_retry_after_gives_up(self):
+        self.server.chat_rate = 0.01  # next slot in ~100s
+        client = self.make_client(TELEGRAM_MAX_RETRY_AFTER=30)
+        client._send_message(-100, 'first')
+        with patch('src.telegram.client.time.sleep') as sleep:
+            self.assertFalse(client.deliver(-100, 'Technology', {'title': 't'}, 'second'))
+        sleep.assert_not_called()
+
+    def test_server_errors_retried_with_backoff(self):
+        client = self.make_client(TELEGRAM_MAX_RETRIES=2)
+        self.server.error_rate = 1.0
+        with patch('src.telegram.client.time.sleep') as sleep:
+            self.assertFalse(client.deliver(-100, 'Technology', {'title': 't'}, 'text'))
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [0.5, 1.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Tests for count-min sketch trending detection"""
+import unittest
+from src.config.settings import Settings
+from src.utils.article import ArticleRecord
+from src.utils.trending import CountMinSketch, TrendingDetector, _hash, features
+
+START = 1_700_000_000 // 1800 * 1800  # a bucket boundary
+
+
+def article(title):
+    return ArticleRecord(title=title, url='https://example.com/' + title.replace(' ', '-'))
+
+
+class TestTrending(unittest.TestCase):
+
+    def setUp(self):
+        self.settings = Settings()
+        self.settings.TRENDING_BUCKET_SECONDS = 1800
+        self.settings.TRENDING_BUCKETS = 6
+        self.settings.TRENDING_RECENT_BUCKETS = 1
+        self.settings.TRENDING_MIN_COUNT = 3
+        self.settings.TRENDING_GROWTH = 3
+        self.detector = TrendingDetector(self.settings, now=START)
+
+    def test_sketch_never_undercounts(self):
+        sketch = CountMinSketch(width=64, depth=3)
+        counts = {f'key{i}': i % 7 + 1 for i in range(200)}
+        for key, count in counts.items():
+            for _ in range(count):
+                sketch.add(_hash(key))
+        for key, count in counts.items():
+            self.assertGreaterEqual(sketch.estimate(_hash(key)), count)
+
+    def test_features(self):
+        keys = features('James Webb telescope spots a comet')
+        self.assertIn('w:comet', keys)
+        self.assertIn('e:james webb', keys)
+        self.assertNotIn('w:a', keys)
+        self.assertEqual(len([k for k in keys if k.startswith('s:')]), 1)
+
+    def test_burst_is_rising_and_steady_term_is_not(self):
+        for bucket in range(5):
+            now = START + bucket * 1800
+            for i in range(3):
+                self.detector.observe(article(f'Markets report {bucket} {i}'), now=now)
+        now = START + 5 * 1800
+        for outlet in ('BBC', 'Reuters', 'AP', 'NPR'):
+            self.detector.observe(article(f'Comet outburst stuns astronomers says {outlet}'), now=now)
+            self.detector.observe(article(f'Markets report late {outlet}'), now=now)
+
+        rising = [key for key, _, _ in self.detector.rising(now=now)]
+        self.assertIn('w:comet', rising)
+        self.assertNotIn('w:markets', rising)
+        self.assertGreaterEqual(self.detector.trend(article('Comet outburst lights up sky'), now=now), 0.5)
+        self.assertEqual(self.detector.trend(article('Markets report today'), now=now), 0.0)
+
+    def test_full_candidate_table_evicts_the_weakest(self):
+        self.settings.TRENDING_CANDIDATES = 2
+        detector = TrendingDetector(self.settings, now=START)
+        for word, count in (('comet', 6), ('eclipse', 3), ('nebula', 4)):
+            for _ in range(count):
+                detector.observe(article(word.title()), now=START)
+        self.assertEqual(set(detector._candidates), {'w:comet', 'w:nebula'})
+        # Counts leave the recent window as it slides; a newcomer then wins
+        later = START + 1800
+        for _ in range(3):
+            detector.observe(article('Eclipse'), now=later)
+        self.assertIn('w:eclipse', detector._candidates)
+
+    def test_window_slides_with_fixed_memory(self):
+        for _ in range(5):
+            self.detector.observe(article('Comet outburst stuns astronomers'), now=START)
+        sizes = [len(sketch.counts) for sketch in self.detector._buckets]
+        later = START + self.settings.TRENDING_BUCKETS * 1800
+        self.assertEqual(self.detector.trend(article('Comet outburst'), now=later), 0.0)
+        self.assertEqual(self.detector.rising(now=later), [])
+        self.assertEqual([len(sketch.counts) for sketch in self.detector._buckets], sizes)
+
+
+if __name__ == '__main__':
+    unittest.main()